@@ -0,0 +1,155 @@
+# File: adaptive_rate.py
+# Purpose: Adapt RateLimiter throughput to the real plan limit using AIMD feedback
+
+import threading
+from collections import deque
+
+def largest_cost(limiter):
+    """
+    Return the cost of the most expensive call a limiter knows about
+    
+    Args:
+        limiter (RateLimiter): Limiter with a costs table and default cost
+    
+    Returns:
+        float: Largest of the registered costs and the default cost
+    """
+    return max([limiter.default_cost, *limiter.costs.values()])
+
+class AdaptiveRateController:
+    """
+    Additive-increase / multiplicative-decrease controller for a RateLimiter
+    
+    While responses are healthy and the limiter is the bottleneck, the
+    allowed rate grows by `increase` per time frame elapsed. A 429 response, or a
+    p95 latency rising above `latency_threshold` times the best p95 seen,
+    cuts the rate by `decrease_factor`. Cuts are spaced by `cooldown`
+    seconds so a burst of 429s from many threads counts as one signal.
+    
+    The rate never drops below min_rate, which is at least the limiter's
+    most expensive registered method, so every single call the limiter
+    accepted before a cut is still admitted (more slowly) after it. A batch
+    costs the sum of its calls and may exceed the floor, so batch_rpc sizes
+    chunks against min_rate (see capacity_floor).
+    
+    Usage:
+        limiter = RateLimiter(max_calls=300, time_frame=60, engine="gcra")
+        controller = AdaptiveRateController(limiter, max_rate=1000)
+        set_default_limiter(limiter)  # Toolkit functions now report results
+    """
+    def __init__(self, limiter, min_rate=1, max_rate=None, increase=1, decrease_factor=0.5,
+                 latency_window=100, latency_threshold=2.0, cooldown=1.0):
+        """
+        Initialize the controller and attach it to a limiter
+        
+        Args:
+            limiter (RateLimiter): Limiter whose max_calls is adjusted
+            min_rate (float): Lowest allowed max_calls (raised to the limiter's
+                largest method cost if that is higher)
+            max_rate (float): Highest allowed max_calls (None for no ceiling)
+            increase (float): Additive increase per time frame while healthy and saturated
+            decrease_factor (float): Multiplier applied to the rate on congestion
+            latency_window (int): Number of latency samples per p95 evaluation
+            latency_threshold (float): p95 growth over the baseline that counts as congestion
+            cooldown (float): Minimum seconds between two decreases
+        """
+        self.limiter = limiter
+        self.min_rate = max(min_rate, largest_cost(limiter))
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease_factor = decrease_factor
+        self.latency_window = latency_window
+        self.latency_threshold = latency_threshold
+        self.cooldown = cooldown
+        
+        self.rate = float(limiter.max_calls)
+        self.latencies = deque(maxlen=latency_window)  # Samples for the next p95
+        self.p95 = None  # Most recent p95 latency
+        self.baseline_p95 = None  # Lowest p95 observed
+        self.last_decrease = float("-inf")
+        self.last_update = None  # Time of the last success seen
+        self.lock = threading.Lock()
+        
+        limiter.controller = self
+    
+    @property
+    def current_rate(self):
+        """float: Currently allowed calls (or cost units) per time frame"""
+        return self.rate
+    
+    def on_success(self, latency=None):
+        """
+        Record a healthy response
+        
+        Args:
+            latency (float): Response time in seconds, if measured
+        """
+        with self.lock:
+            if latency is not None:
+                self.latencies.append(latency)
+                if len(self.latencies) == self.latency_window:
+                    if self._latency_rising():
+                        self._decrease()
+                        return
+            
+            now = self.limiter.clock.time()
+            elapsed = 0 if self.last_update is None else now - self.last_update
+            self.last_update = now
+            # Only grow while the limiter is what holds callers back
+            if self.limiter.wait_time() > 0:
+                elapsed = min(elapsed, self.limiter.time_frame)
+                self._set_rate(self.rate + self.increase * elapsed / self.limiter.time_frame)
+    
+    def on_throttle(self):
+        """Record a 429 response"""
+        with self.lock:
+            self._decrease()
+    
+    def _latency_rising(self):
+        """Compute the p95 of the full sample window and compare it with the baseline"""
+        samples = sorted(self.latencies)
+        self.latencies.clear()
+        self.p95 = samples[int(0.95 * (len(samples) - 1))]
+        if self.baseline_p95 is None or self.p95 < self.baseline_p95:
+            self.baseline_p95 = self.p95
+        return self.p95 > self.baseline_p95 * self.latency_threshold
+    
+    def _decrease(self):
+        """Cut the rate multiplicatively, at most once per cooldown"""
+        now = self.limiter.clock.time()
+        if now - self.last_decrease < self.cooldown:
+            return
+        self.last_decrease = now
+        self._set_rate(self.rate * self.decrease_factor)
+    
+    def _set_rate(self, rate):
+        """Clamp the rate and apply it to the limiter"""
+        rate = max(self.min_rate, rate)
+        if self.max_rate is not None:
+            rate = min(self.max_rate, rate)
+        self.rate = rate
+        self.limiter.set_rate(rate)
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    from rate_limiter import RateLimiter
+    
+    # Simulate a plan that really allows 50 calls/s while we start at 10 calls/s
+    plan_limit = 50
+    clock = VirtualClock()
+    limiter = RateLimiter(max_calls=10, time_frame=1, engine="gcra", clock=clock)
+    controller = AdaptiveRateController(limiter, max_rate=200, increase=5)
+    
+    window_start = clock.time()
+    window_calls = 0
+    for second in range(10):
+        end = clock.time() + 1
+        while clock.time() < end:
+            limiter.wait_if_needed()
+            now = clock.time()
+            if now - window_start >= 1:
+                window_start, window_calls = now, 0
+            window_calls += 1
+            limiter.record_result(latency=0.05, throttled=window_calls > plan_limit)
+        print(f"Second {second+1}: allowed rate {controller.current_rate:.1f} calls/s")
@@ -1,33 +1,43 @@
 # File: alchemy_api_debug.py
 # Purpose: Implement Alchemy API debugging tools with error handling and retry logic
 
-import os
 import time
-import requests
 import logging
-import random
-from requests.exceptions import RequestException, HTTPError, Timeout, ConnectionError
-from web3 import Web3
-from dotenv import load_dotenv
-
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("alchemy_api.log"),
-        logging.StreamHandler()
-    ]
-)
+from config import get_config, setup_logging, wei_to_ether
+from rate_limiter import throttle, report_result
+from retry_budget import default_retry_budget
+from retry_policy import RetryPolicy
+from hedging import get_default_hedger
+from circuit_breaker import classify_error, error_status, get_breaker
+from deadline import DeadlineExceeded, resolve_deadline, request_timeout
+from batch_rpc import build_batch, batch_call_chunked
+from micro_batcher import MicroBatcher
+from network_registry import get_client, fan_out
+from response_cache import get_default_cache, resolve_block
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+# Logging is configured by the application (or by the __main__ block when run directly)
 logger = logging.getLogger("alchemy_api")
 
-# Load environment variables
-load_dotenv()
-ALCHEMY_API_KEY = os.getenv('ALCHEMY_API_KEY')
-ALCHEMY_URL = f"https://eth-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}"
+def __getattr__(name):
+    """Resolve the legacy module globals from the shared configuration on first access"""
+    if name == "ALCHEMY_API_KEY":
+        return get_config().api_key
+    if name == "ALCHEMY_URL":
+        return get_client().rpc_url
+    if name == "w3":
+        return get_client().web3
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# Micro-batcher used by get_eth_balance, set by enable_balance_batching()
+_balance_batcher = None
 
-# Initialize Web3
-w3 = Web3(Web3.HTTPProvider(ALCHEMY_URL))
+def _response_text(error):
+    """Return the body of a failed response for debug logs (aiohttp errors only carry a message)"""
+    try:
+        return error.response.text
+    except Exception:
+        return getattr(error, "message", "")
 
 def handle_alchemy_error(error, endpoint):
     """
@@ -40,126 +50,366 @@ def handle_alchemy_error(error, endpoint):
     Returns:
         bool: True if backoff is needed, False otherwise
     """
-    if isinstance(error, HTTPError):
-        status_code = error.response.status_code
-        if status_code == 403:
-            logger.error(f"API authorization error (403): Check API key and permissions - {endpoint}")
-            logger.debug(f"Response content: {error.response.text}")
-        elif status_code == 429:
-            logger.warning(f"Rate limit reached (429): Implement backoff strategy - {endpoint}")
-            logger.debug(f"Response content: {error.response.text}")
-            # Return signal to backoff
-            return True
-        elif status_code >= 500:
-            logger.error(f"Alchemy server error ({status_code}): Retry later - {endpoint}")
-            logger.debug(f"Response content: {error.response.text}")
-            # Return signal to backoff
-            return True
-        else:
-            logger.error(f"HTTP error ({status_code}): {error} - {endpoint}")
-    elif isinstance(error, Timeout):
+    category = classify_error(error)
+    status_code = error_status(error)
+    
+    if category == "auth":
+        logger.error(f"API authorization error (403): Check API key and permissions - {endpoint}")
+        logger.debug(f"Response content: {_response_text(error)}")
+    elif category == "rate_limit":
+        logger.warning(f"Rate limit reached (429): Implement backoff strategy - {endpoint}")
+        logger.debug(f"Response content: {_response_text(error)}")
+        # Let an adaptive limiter cut its rate
+        report_result(throttled=True)
+        # Return signal to backoff
+        return True
+    elif category == "server":
+        logger.error(f"Alchemy server error ({status_code}): Retry later - {endpoint}")
+        logger.debug(f"Response content: {_response_text(error)}")
+        # Return signal to backoff
+        return True
+    elif category == "client":
+        logger.error(f"HTTP error ({status_code}): {error} - {endpoint}")
+    elif category == "timeout":
         logger.error(f"Request timeout: {error} - {endpoint}")
         return True
-    elif isinstance(error, ConnectionError):
+    elif category == "connection":
         logger.error(f"Connection error: {error} - {endpoint}")
         return True
-    elif isinstance(error, RequestException):
+    elif category == "request":
         logger.error(f"Request exception: {error} - {endpoint}")
         return True
+    elif category == "deadline":
+        logger.error(f"Deadline exceeded: {error} - {endpoint}")
     else:
         logger.error(f"Unknown error: {error} - {endpoint}")
     
     return False
 
-def get_eth_balance(address, max_retries=5):
+def _get_balance(client, address, block, timeout):
+    """
+    Send one eth_getBalance request over the network's pool
+    
+    Args:
+        client (NetworkClient): Client of the network to query
+        address (str): Address to check
+        block (str or int): Block tag, number or hash
+        timeout (float): Request timeout in seconds
+        
+    Returns:
+        int: Balance in wei
+        
+    Raises:
+        requests.exceptions.RequestException: If the request fails
+        ValueError: If the node answers with a JSON-RPC error
+    """
+    block_param = hex(block) if isinstance(block, int) else block
+    payload = build_batch([("eth_getBalance", [address, block_param])])[0]
+    response = client.transport.post(client.rpc_url, json=payload, timeout=timeout)
+    response.raise_for_status()
+    result = response.json()
+    if "error" in result:
+        raise ValueError(f"JSON-RPC error: {result['error']}")
+    return int(result["result"], 16)
+
+def _refresh_head(cache, client, block, timeout, deadline):
+    """
+    Fetch the network's head block if the cache cannot yet tell whether a block is final
+    
+    Best effort: a failure only means results read at the block expire after
+    one block time instead of being kept.
+    
+    Args:
+        cache (ResponseCache): The response cache
+        client (NetworkClient): Client of the network to query
+        block (str or int): Resolved block the caller is about to read at
+        timeout (float): Request timeout in seconds
+        deadline (Deadline): Overall deadline, or None
+    """
+    if not cache.head_is_stale(client.network, block):
+        return
+    payload = build_batch([("eth_blockNumber", [])])[0]
+    try:
+        throttle("eth_blockNumber")
+        response = client.transport.post(client.rpc_url, json=payload, timeout=request_timeout(timeout, deadline))
+        response.raise_for_status()
+        cache.observe_head(client.network, response.json()["result"])
+    except Exception as e:
+        logger.warning(f"Could not fetch the head block of {client.network}: {e}")
+
+def _throttled_get_balance(client, address, block, timeout, deadline):
+    """Wait for the rate limiter, then fetch a balance with the time left before the deadline"""
+    throttle("eth_getBalance")
+    return _get_balance(client, address, block, request_timeout(timeout, deadline))
+
+def get_eth_balance(address, max_retries=5, hedge=False, deadline=None, network=None, block="latest", timeout=30):
     """
     Get ETH balance with error handling and retry mechanism
     
     Args:
         address (str): Ethereum address to check
         max_retries (int): Maximum number of retry attempts
+        hedge (bool): Send a duplicate request if the first one is unusually slow
+        deadline (Deadline or float): Overall deadline in seconds, including
+            retries (an enclosing deadline_scope also applies)
+        network (str): Alchemy network (default: the configured network)
+        block (str or int): Block tag, number or hash to read the balance at
+        timeout (float): Per-attempt request timeout, shrunk to fit the deadline
+        
+    Balances are served from the response cache while valid: one block
+    time for "latest", indefinitely for finalized blocks. Before reading
+    at a block number, the head is fetched if the cache's is out of date.
+        
+    When balance batching is enabled (see enable_balance_batching), hedge
+    is off, no network is given and the block is "latest", the call joins
+    a JSON-RPC batch with concurrent calls and the batch's own per-element
+    retry applies instead of max_retries.
         
     Returns:
-        float: ETH balance in ether units
+        Decimal: ETH balance in ether units
         
     Raises:
-        Exception: If all retries fail
+        MissingAPIKeyError: If no API key is configured
+        CircuitOpenError: If the eth_getBalance circuit is open
+        DeadlineExceeded: If the balance cannot be fetched before the deadline
+        Exception: If all retries fail or the shared retry budget is exhausted
     """
     endpoint = f"eth_getBalance - {address}"
     retries = 0
-    base_delay = 1
+    policy = RetryPolicy(max_retries=max_retries, base_delay=1, max_delay=30)
+    deadline = resolve_deadline(deadline)
+    client = get_client(network)
+    
+    # Repeated reads of the same balance at the same block cost no quota
+    cache = get_default_cache()
+    cache_key = cache.make_key(client.network, "eth_getBalance", [address], block) if cache else None
+    if cache_key:
+        found, balance = cache.lookup(cache_key)
+        if found:
+            return balance
+        with client.scope():
+            _refresh_head(cache, client, resolve_block(block), timeout, deadline)
     
-    while retries <= max_retries:
+    batcher = _balance_batcher
+    if batcher is not None and not hedge and network is None and block == "latest":
         try:
-            balance = w3.eth.get_balance(address)
-            return Web3.from_wei(balance, 'ether')
-            
-        except Exception as e:
-            # Handle error and check if backoff is needed
-            need_backoff = handle_alchemy_error(e, endpoint)
-            
-            retries += 1
-            if retries > max_retries:
-                logger.error(f"Maximum retries reached ({max_retries}): {address}")
+            balance = batcher.load(address, timeout=deadline.remaining() if deadline else None)
+        except FutureTimeoutError:
+            raise DeadlineExceeded(f"Deadline exceeded: {endpoint}")
+        if cache_key:
+            cache.store(cache_key, balance)
+        return balance
+    
+    breaker = get_breaker(client.breaker_name("eth_getBalance"))
+    # Throttle with the network's own limiter, if it has one
+    with client.scope():
+        while retries <= max_retries:
+            # Fail fast instead of retrying into a provider outage
+            breaker.before_call()
+            try:
+                if not hedge:
+                    # Wait for the rate limiter, if one is set
+                    throttle("eth_getBalance")
+                if deadline:
+                    deadline.check(endpoint)
+                start_time = time.time()
+                if hedge:
+                    # Each attempt, the hedge included, waits for and is charged to the rate limiter
+                    balance = get_default_hedger().call("eth_getBalance", _throttled_get_balance, client, address, block,
+                                                        timeout, deadline)
+                else:
+                    # The HTTP timeout never reaches past the deadline
+                    balance = _get_balance(client, address, block, request_timeout(timeout, deadline))
+                report_result(latency=time.time() - start_time)
+                default_retry_budget.record_success()
+                breaker.record_success()
+                balance = wei_to_ether(balance)
+                if cache_key:
+                    cache.store(cache_key, balance)
+                return balance
+                
+            except DeadlineExceeded as e:
+                handle_alchemy_error(e, endpoint)
+                breaker.record_error(e)
                 raise
-            
-            if need_backoff:
-                # Calculate backoff delay (with jitter)
-                delay = min(30, base_delay * (2 ** (retries - 1)))
-                jitter = random.uniform(0, 0.1 * delay)
-                sleep_time = delay + jitter
                 
-                logger.info(f"Backing off for {sleep_time:.2f} seconds, retry {retries}/{max_retries}")
-                time.sleep(sleep_time)
-            else:
-                # For errors that don't need backoff, retry immediately
-                logger.info(f"Retrying immediately {retries}/{max_retries}")
+            except Exception as e:
+                # Handle error and check if backoff is needed
+                need_backoff = handle_alchemy_error(e, endpoint)
+                breaker.record_error(e)
+                
+                retries += 1
+                if retries > max_retries:
+                    logger.error(f"Maximum retries reached ({max_retries}): {address}")
+                    raise
+                
+                # Retries share a fleet-wide budget so they cannot amplify an outage
+                if not default_retry_budget.try_spend():
+                    logger.error(f"Retry budget exhausted, not retrying: {address}")
+                    raise
+                
+                if need_backoff:
+                    # Honor the server's Retry-After hint if any, else exponential backoff with jitter
+                    sleep_time = policy.delay_for(retries, e)
+                    if deadline and not deadline.allows(sleep_time):
+                        logger.error(f"Not retrying, backoff would miss the deadline: {address}")
+                        raise DeadlineExceeded(f"Deadline exceeded: {endpoint}") from e
+                    
+                    logger.info(f"Backing off for {sleep_time:.2f} seconds, retry {retries}/{max_retries}")
+                    time.sleep(sleep_time)
+                else:
+                    # For errors that don't need backoff, retry immediately
+                    logger.info(f"Retrying immediately {retries}/{max_retries}")
 
-def batch_get_eth_balances(addresses):
+def batch_get_eth_balances(addresses, timeout=30, deadline=None, max_retries=3, chunk_size=None, max_workers=8,
+                           network=None, block="latest"):
     """
     Batch get ETH balances for multiple addresses
     
+    Large address lists are split into chunks that are sent concurrently
+    under the rate limiter. Only the elements that failed with a transient
+    error, or were missing from the response, are resubmitted; balances
+    already received are kept. If a whole POST fails, its elements are
+    resubmitted as two smaller batches.
+    
     Args:
         addresses (list): List of Ethereum addresses
+        timeout (float): Request timeout in seconds, shrunk to fit the deadline
+        deadline (Deadline or float): Overall deadline in seconds
+            (an enclosing deadline_scope also applies)
+        max_retries (int): Maximum number of resubmission rounds
+        chunk_size (int): Addresses per batch (default: sized to the batch
+            limit, the worker count and the rate limiter's capacity)
+        max_workers (int): Maximum number of batches in flight
+        network (str): Alchemy network (default: the configured network)
+        block (str or int): Block tag, number or hash to read the balances at
+        
+    Addresses whose balance is in the response cache are not requested.
         
     Returns:
-        dict: Dictionary mapping addresses to balances
+        dict: Dictionary mapping addresses to balances (None where the
+            balance could not be fetched)
         
     Raises:
-        Exception: If the request fails
+        CircuitOpenError: If the eth_getBalance circuit is open
+        DeadlineExceeded: If the deadline passes before a request is sent
+        Exception: If every batch failed permanently or lost all its elements
     """
-    try:
-        # Prepare batch request
-        batch_payload = [
-            {
-                "jsonrpc": "2.0", 
-                "id": i, 
-                "method": "eth_getBalance", 
-                "params": [addr, "latest"]
-            } 
-            for i, addr in enumerate(addresses)
-        ]
-        
-        # Send batch request
-        response = requests.post(ALCHEMY_URL, json=batch_payload)
-        response.raise_for_status()  # Check for HTTP errors
-        results = response.json()
-        
-        # Process results
-        balances = {}
-        for i, addr in enumerate(addresses):
-            result = next((r for r in results if r["id"] == i), None)
-            if result and "result" in result:
-                balances[addr] = Web3.from_wei(int(result["result"], 16), 'ether')
-            else:
-                logger.warning(f"Could not get balance for address {addr}")
-                balances[addr] = None
+    deadline = resolve_deadline(deadline)
+    client = get_client(network)
+    cache = get_default_cache()
+    cached = {}
+    cache_keys = {}
+    if cache:
+        for addr in addresses:
+            cache_keys[addr] = cache.make_key(client.network, "eth_getBalance", [addr], block)
+            found, balance = cache.lookup(cache_keys[addr])
+            if found:
+                cached[addr] = balance
+        if len(cached) < len(cache_keys):
+            with client.scope():
+                _refresh_head(cache, client, resolve_block(block), timeout, deadline)
+    
+    missing = [addr for addr in dict.fromkeys(addresses) if addr not in cached]
+    block_param = hex(block) if isinstance(block, int) else block
+    calls = [("eth_getBalance", [addr, block_param]) for addr in missing]
+    with client.scope():
+        responses = batch_call_chunked(
+            client.rpc_url, calls,
+            chunk_size=chunk_size,
+            max_workers=max_workers,
+            timeout=timeout,
+            deadline=deadline,
+            session=client.session,
+            max_retries=max_retries,
+            breaker_name=client.breaker_name("eth_getBalance"),
+            error_handler=handle_alchemy_error,
+            endpoint="batch_get_eth_balances"
+        )
+    
+    # Process results
+    fetched = {}
+    for addr, result in zip(missing, responses):
+        if result and "result" in result:
+            fetched[addr] = wei_to_ether(int(result["result"], 16))
+            if cache:
+                cache.store(cache_keys[addr], fetched[addr])
+        else:
+            logger.warning(f"Could not get balance for address {addr}: {result.get('error') if result else 'no response'}")
+            fetched[addr] = None
+    
+    return {addr: cached[addr] if addr in cached else fetched[addr] for addr in addresses}
+
+def _load_balances(addresses):
+    """Load a micro-batch of balances; failed addresses get an exception instead of a balance"""
+    client = get_client()
+    calls = [("eth_getBalance", [addr, "latest"]) for addr in addresses]
+    # A merged batch can cost more than the limiter admits at once, so split it to fit
+    with client.scope():
+        responses = batch_call_chunked(
+            client.rpc_url, calls,
+            session=client.session,
+            breaker_name=client.breaker_name("eth_getBalance"),
+            error_handler=handle_alchemy_error,
+            endpoint="get_eth_balance (batched)"
+        )
+    
+    balances = []
+    for addr, result in zip(addresses, responses):
+        if result and "result" in result:
+            balances.append(wei_to_ether(int(result["result"], 16)))
+        else:
+            balances.append(Exception(f"Could not get balance for address {addr}: {result.get('error') if result else 'no response'}"))
+    return balances
+
+def get_balance_across_networks(address, networks=None, **kwargs):
+    """
+    Get an address's native balance on several networks concurrently
+    
+    Args:
+        address (str): Address to check
+        networks (list): Networks to query (default: network_registry.DEFAULT_NETWORKS)
+        **kwargs: Passed to get_eth_balance (max_retries, hedge, deadline)
         
-        return balances
+    Returns:
+        dict: Result containing a network -> balance mapping and per-network errors
+    """
+    outcome = fan_out(get_eth_balance, address, networks=networks, **kwargs)
+    return {
+        "success": outcome["success"],
+        "address": address,
+        "balances": outcome["results"],
+        "errors": outcome["errors"]
+    }
+
+def enable_balance_batching(max_batch_size=100, max_delay=0.005):
+    """
+    Coalesce concurrent get_eth_balance calls into JSON-RPC batches
+    
+    Calls on the configured network made from any thread within
+    `max_delay` seconds of each other, up to `max_batch_size` distinct
+    addresses, are merged; each caller still gets its own balance or error.
+    A merged batch costing more than the rate limiter's capacity is sent
+    as several smaller concurrent batches.
+    
+    Args:
+        max_batch_size (int): Most addresses per batch
+        max_delay (float): Longest time a call waits for others to join its batch
         
-    except Exception as e:
-        handle_alchemy_error(e, "batch_get_eth_balances")
-        raise
+    Returns:
+        MicroBatcher: The batcher now used by get_eth_balance
+    """
+    global _balance_batcher
+    disable_balance_batching()
+    _balance_batcher = MicroBatcher(_load_balances, max_batch_size=max_batch_size, max_delay=max_delay)
+    return _balance_batcher
+
+def disable_balance_batching():
+    """Send get_eth_balance calls one by one again"""
+    global _balance_batcher
+    batcher, _balance_batcher = _balance_batcher, None
+    if batcher is not None:
+        batcher.close()
 
 def main():
     """Main function demonstrating API error handling"""
@@ -183,4 +433,5 @@ def main():
         logger.error(f"Program execution error: {e}")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
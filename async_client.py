@@ -0,0 +1,644 @@
+# File: async_client.py
+# Purpose: Asyncio client mirroring the toolkit's network functions on one aiohttp session
+
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+
+import aiohttp
+
+from config import get_config, wei_to_ether
+from retry_budget import default_retry_budget
+from retry_policy import RetryPolicy, parse_retry_after, rate_limit_hint, is_rate_limited
+from circuit_breaker import classify_error, get_breaker, CircuitOpenError
+from deadline import DeadlineExceeded, resolve_deadline, request_timeout
+from batch_rpc import (build_batch, index_responses, is_retryable_rpc_error, chunk_size_for, split_to_fit,
+                       RETRYABLE_ERROR_CATEGORIES, DEFAULT_MAX_WORKERS)
+from response_cache import observe_head_block
+
+logger = logging.getLogger("alchemy_api")
+
+# IPFS gateways tried in order by resolve_ipfs_uri
+IPFS_GATEWAYS = ("https://ipfs.io/ipfs/", "https://cloudflare-ipfs.com/ipfs/")
+
+class RPCError(Exception):
+    """JSON-RPC error object returned for a request"""
+    def __init__(self, payload):
+        error = payload.get("error") or {}
+        super().__init__(f"JSON-RPC error {error.get('code')}: {error.get('message')}")
+        self.payload = payload
+        self.code = error.get("code")
+    
+    @property
+    def retryable(self):
+        """bool: True for rate limit and internal errors"""
+        return is_retryable_rpc_error(self.payload)
+
+def _retry_hint(error):
+    """Return the wait the server asked for with a failed request, if any"""
+    if isinstance(error, aiohttp.ClientResponseError) and error.headers:
+        return parse_retry_after(error.headers.get("Retry-After"))
+    if isinstance(error, RPCError):
+        return rate_limit_hint(error.payload)
+    return None
+
+# Errors the NFT functions return in their result dict, as the sync versions do
+# (ValueError: undecodable JSON body, KeyError: a response missing an expected field)
+RESULT_ERRORS = (DeadlineExceeded, CircuitOpenError, aiohttp.ClientError, asyncio.TimeoutError, RPCError,
+                 ValueError, KeyError)
+
+def _is_retryable(error):
+    """Check whether a failed request is worth retrying"""
+    if isinstance(error, RPCError):
+        return error.retryable
+    return classify_error(error) in RETRYABLE_ERROR_CATEGORIES
+
+class AsyncAlchemyClient:
+    """
+    Non-blocking counterparts of the toolkit's network functions
+    
+    All requests share one aiohttp.ClientSession whose connector caps open
+    connections, so thousands of coroutines can have requests in flight in
+    one thread. Retries, the shared retry budget, circuit breakers and
+    deadlines behave as in the blocking functions; rate limiting uses an
+    optional AsyncRateLimiter.
+    
+    Usage:
+        async with AsyncAlchemyClient() as client:
+            balance = await client.get_eth_balance(address)
+    """
+    def __init__(self, api_key=None, network="eth-mainnet", limit=1000, limit_per_host=1000, limiter=None,
+                 rpc_url=None, nft_url=None):
+        """
+        Initialize the client
+        
+        Args:
+            api_key (str): Alchemy API key (default: the shared configuration's key)
+            network (str): Alchemy network, e.g. "eth-mainnet"
+            limit (int): Maximum open connections in total
+            limit_per_host (int): Maximum open connections per host
+            limiter (AsyncRateLimiter): Limiter awaited before each request (None for no limit)
+            rpc_url (str): JSON-RPC endpoint (default: derived from network and api_key)
+            nft_url (str): NFT API base URL (default: derived from network and api_key)
+        """
+        api_key = api_key or get_config().api_key
+        self.network = network
+        self.rpc_url = rpc_url or f"https://{network}.g.alchemy.com/v2/{api_key}"
+        self.nft_url = nft_url or f"https://{network}.g.alchemy.com/nft/v2/{api_key}"
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.limiter = limiter
+        self._session = None
+    
+    def _get_session(self):
+        """Return the shared session, creating it inside the running event loop"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Close the session and its pooled connections"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+    
+    async def __aenter__(self):
+        self._get_session()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def _request(self, method, url, request, timeout, deadline, **kwargs):
+        """
+        Wait for the limiter, then send one HTTP request
+        
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            request (str, dict or list): Method name or JSON-RPC payload, used for the limiter cost
+            timeout (float): Request timeout, shrunk to fit the deadline
+            deadline (Deadline): Deadline for the request, if any
+            **kwargs: Passed to aiohttp (params, json)
+        
+        Returns:
+            tuple: (content type, body bytes)
+        
+        Raises:
+            aiohttp.ClientResponseError: For HTTP error statuses
+        """
+        if self.limiter is not None and request is not None:
+            await self.limiter.acquire_for(request)
+        client_timeout = aiohttp.ClientTimeout(total=request_timeout(timeout, deadline))
+        async with self._get_session().request(method, url, timeout=client_timeout, **kwargs) as response:
+            body = await response.read()
+            if response.status >= 400:
+                raise aiohttp.ClientResponseError(
+                    response.request_info, response.history, status=response.status,
+                    message=body[:200].decode("utf-8", "replace"), headers=response.headers
+                )
+            return response.content_type, body
+    
+    async def _json(self, method, url, request, timeout, deadline, **kwargs):
+        """Send one request and decode its JSON body"""
+        _, body = await self._request(method, url, request, timeout, deadline, **kwargs)
+        return json.loads(body)
+    
+    async def _with_retries(self, breaker_name, endpoint, attempt, max_retries, base_delay, deadline):
+        """
+        Run attempt() until it succeeds, retrying transient failures with backoff
+        
+        Args:
+            breaker_name (str): Circuit breaker guarding the endpoint
+            endpoint (str): Description used in log messages
+            attempt (callable): Coroutine function performing one attempt
+            max_retries (int): Maximum number of retries
+            base_delay (float): Initial backoff in seconds
+            deadline (Deadline): Overall deadline, if any
+        
+        Returns:
+            The result of the first successful attempt
+        
+        Raises:
+            CircuitOpenError: If the circuit is open
+            DeadlineExceeded: If another attempt cannot finish before the deadline
+            Exception: The last error once retrying stops
+        """
+        policy = RetryPolicy(max_retries=max_retries, base_delay=base_delay, max_delay=30)
+        breaker = get_breaker(breaker_name)
+        retries = 0
+        while True:
+            # Fail fast instead of retrying into a provider outage
+            breaker.before_call()
+            try:
+                result = await attempt()
+            except DeadlineExceeded as e:
+                breaker.record_error(e)
+                raise
+            except Exception as e:
+                breaker.record_error(e)
+                if not _is_retryable(e):
+                    raise
+                retries += 1
+                if retries > max_retries:
+                    logger.error(f"Maximum retries reached ({max_retries}): {e} - {endpoint}")
+                    raise
+                # Retries share a fleet-wide budget so they cannot amplify an outage
+                if not default_retry_budget.try_spend():
+                    logger.error(f"Retry budget exhausted, not retrying: {e} - {endpoint}")
+                    raise
+                delay = policy.delay_for(retries, hint=_retry_hint(e))
+                if deadline and not deadline.allows(delay):
+                    raise DeadlineExceeded(f"Deadline exceeded: {endpoint}") from e
+                logger.info(f"Retrying {endpoint} in {delay:.2f} seconds, retry {retries}/{max_retries}: {e}")
+                await asyncio.sleep(delay)
+            else:
+                default_retry_budget.record_success()
+                breaker.record_success()
+                return result
+    
+    async def _rpc(self, method, params, timeout, deadline):
+        """Send one JSON-RPC call and return its result"""
+        payload = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        data = await self._json("POST", self.rpc_url, payload, timeout, deadline, json=payload)
+        if "error" in data:
+            raise RPCError(data)
+        if method == "eth_blockNumber":
+            # Every fetched head moves the response cache's finalized block up
+            observe_head_block(self.network, data["result"])
+        return data["result"]
+    
+    async def get_eth_balance(self, address, max_retries=5, timeout=30, deadline=None):
+        """
+        Get ETH balance with error handling and retry mechanism
+        
+        Args:
+            address (str): Ethereum address to check
+            max_retries (int): Maximum number of retry attempts
+            timeout (float): Per-attempt request timeout, shrunk to fit the deadline
+            deadline (Deadline or float): Overall deadline in seconds, including
+                retries (an enclosing deadline_scope also applies)
+        
+        Returns:
+            Decimal: ETH balance in ether units
+        
+        Raises:
+            CircuitOpenError: If the eth_getBalance circuit is open
+            DeadlineExceeded: If the balance cannot be fetched before the deadline
+            Exception: If all retries fail or the shared retry budget is exhausted
+        """
+        deadline = resolve_deadline(deadline)
+        result = await self._with_retries(
+            f"{self.network}/eth_getBalance", f"eth_getBalance - {address}",
+            lambda: self._rpc("eth_getBalance", [address, "latest"], timeout, deadline),
+            max_retries, 1, deadline
+        )
+        return wei_to_ether(int(result, 16))
+    
+    async def _batch_call(self, calls, timeout, deadline, max_retries, breaker_name, endpoint):
+        """Async counterpart of batch_rpc.batch_call (per-element retry, halving failed POSTs, per-POST retry budget)"""
+        breaker = get_breaker(breaker_name)
+        policy = RetryPolicy(max_retries=max_retries, base_delay=1, max_delay=30)
+        requests_by_id = dict(enumerate(build_batch(calls)))
+        responses = {}
+        chunks = [list(requests_by_id)] if requests_by_id else []
+        retries = 0
+        last_error = None
+        
+        while chunks:
+            retry_ids = []
+            split_chunks = []
+            hint = None
+            stopped = False
+            
+            queue = deque(chunks)
+            while queue:
+                chunk = queue.popleft()
+                # The limiter's capacity may have shrunk since the chunk was sized
+                pieces = split_to_fit(chunk, requests_by_id, self.limiter) if self.limiter is not None else [chunk]
+                if len(pieces) > 1:
+                    logger.info(f"Splitting a batch of {len(chunk)} calls into {len(pieces)} to fit the rate limit - {endpoint}")
+                    queue.extendleft(reversed(pieces))
+                    continue
+                
+                unsent = len(chunk) + sum(len(c) for c in queue)
+                if retries and not default_retry_budget.try_spend():
+                    logger.error(f"Retry budget exhausted, {unsent} of {len(calls)} calls unsent - {endpoint}")
+                    stopped = True
+                    break
+                try:
+                    breaker.before_call()
+                except CircuitOpenError:
+                    if not responses:
+                        raise
+                    logger.error(f"Circuit open, {unsent} of {len(calls)} calls unsent - {endpoint}")
+                    stopped = True
+                    break
+                
+                batch_payload = [requests_by_id[i] for i in chunk]
+                try:
+                    results = await self._json("POST", self.rpc_url, batch_payload, timeout, deadline, json=batch_payload)
+                except DeadlineExceeded as e:
+                    breaker.record_error(e)
+                    raise
+                except Exception as e:
+                    breaker.record_error(e)
+                    logger.error(f"Batch request failed ({classify_error(e)}): {e} - {endpoint}")
+                    if not _is_retryable(e):
+                        raise
+                    last_error = e
+                    hint = _retry_hint(e)
+                    # Resubmit as two halves so an oversized batch or one bad element cannot sink the rest
+                    half = (len(chunk) + 1) // 2
+                    split_chunks.extend(part for part in (chunk[:half], chunk[half:]) if part)
+                    continue
+                default_retry_budget.record_success()
+                breaker.record_success()
+                
+                indexed, duplicates, missing, unexpected = index_responses(results, chunk)
+                if duplicates or unexpected:
+                    logger.warning(f"Ignoring {len(duplicates)} duplicate and {len(unexpected)} unknown response ids - {endpoint}")
+                for i, result in indexed.items():
+                    if is_retryable_rpc_error(result):
+                        retry_ids.append(i)
+                    else:
+                        responses[i] = result
+                retry_ids.extend(missing)
+                if is_rate_limited(results):
+                    hint = rate_limit_hint(results)
+            
+            if stopped:
+                break
+            chunks = split_chunks + ([retry_ids] if retry_ids else [])
+            if not chunks:
+                break
+            pending = sum(len(chunk) for chunk in chunks)
+            retries += 1
+            if retries > max_retries:
+                logger.error(f"Maximum retries reached ({max_retries}), {pending} of {len(calls)} calls unanswered - {endpoint}")
+                break
+            delay = policy.delay_for(retries, hint=hint)
+            if deadline and not deadline.allows(delay):
+                logger.error(f"Not retrying, backoff would miss the deadline, {pending} of {len(calls)} calls unanswered - {endpoint}")
+                break
+            await asyncio.sleep(delay)
+        
+        if chunks and not responses and last_error is not None:
+            raise last_error
+        return [responses.get(i) for i in range(len(calls))]
+    
+    async def batch_get_eth_balances(self, addresses, timeout=30, deadline=None, max_retries=3, chunk_size=None,
+                                     max_concurrency=DEFAULT_MAX_WORKERS):
+        """
+        Batch get ETH balances for multiple addresses
+        
+        Large address lists are split into chunks that are sent concurrently;
+        only failed or missing elements are resubmitted.
+        
+        Args:
+            addresses (list): List of Ethereum addresses
+            timeout (float): Request timeout in seconds, shrunk to fit the deadline
+            deadline (Deadline or float): Overall deadline in seconds
+                (an enclosing deadline_scope also applies)
+            max_retries (int): Maximum number of resubmission rounds per chunk
+            chunk_size (int): Addresses per batch (default: see batch_rpc.chunk_size_for)
+            max_concurrency (int): Maximum number of batches in flight
+        
+        Returns:
+            dict: Dictionary mapping addresses to balances (None where the
+                balance could not be fetched)
+        
+        Raises:
+            Exception: If every chunk failed
+        """
+        deadline = resolve_deadline(deadline)
+        calls = [("eth_getBalance", [addr, "latest"]) for addr in addresses]
+        chunk_size = chunk_size or chunk_size_for(calls, max_concurrency, limiter=self.limiter)
+        chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+        semaphore = asyncio.Semaphore(max_concurrency)
+        
+        async def run_chunk(chunk):
+            async with semaphore:
+                return await self._batch_call(chunk, timeout, deadline, max_retries,
+                                              f"{self.network}/eth_getBalance", "batch_get_eth_balances")
+        
+        outcomes = await asyncio.gather(*(run_chunk(chunk) for chunk in chunks), return_exceptions=True)
+        errors = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+        if chunks and len(errors) == len(chunks):
+            raise errors[0]
+        
+        responses = []
+        for chunk, outcome in zip(chunks, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Batch of {len(chunk)} calls failed: {outcome} - batch_get_eth_balances")
+                responses.extend([None] * len(chunk))
+            else:
+                responses.extend(outcome)
+        
+        balances = {}
+        for addr, result in zip(addresses, responses):
+            if result and "result" in result:
+                balances[addr] = wei_to_ether(int(result["result"], 16))
+            else:
+                logger.warning(f"Could not get balance for address {addr}")
+                balances[addr] = None
+        return balances
+    
+    async def get_nfts_for_owner(self, owner_address, page_size=100, max_pages=None, include_spam=False,
+                                 timeout=30, deadline=None):
+        """
+        Get all NFTs owned by an address, handling pagination and errors
+        
+        Args:
+            owner_address (str): The Ethereum address to query
+            page_size (int): Number of NFTs to fetch per page
+            max_pages (int): Maximum number of pages to fetch (None for all)
+            include_spam (bool): Whether to include spam NFTs
+            timeout (float): Per-page request timeout, shrunk to fit the deadline
+            deadline (Deadline or float): Overall deadline in seconds for all pages
+                and retries (an enclosing deadline_scope also applies)
+        
+        Returns:
+            dict: Result containing NFTs and status information
+        """
+        deadline = resolve_deadline(deadline)
+        url = f"{self.nft_url}/getNFTs"
+        params = {"owner": owner_address, "pageSize": page_size, "withMetadata": "true"}
+        if not include_spam:
+            params["excludeFilters[]"] = "SPAM"
+        
+        all_nfts = []
+        page_count = 0
+        next_page_key = None
+        try:
+            while True:
+                if next_page_key:
+                    params["pageKey"] = next_page_key
+                page_params = dict(params)
+                data = await self._with_retries(
+                    f"{self.network}/getNFTs", f"getNFTs - {owner_address}",
+                    lambda: self._json("GET", url, "getNFTs", timeout, deadline, params=page_params),
+                    5, 2, deadline
+                )
+                page_count += 1
+                all_nfts.extend(data.get("ownedNfts", []))
+                
+                next_page_key = data.get("pageKey")
+                if not next_page_key or (max_pages and page_count >= max_pages):
+                    break
+        except RESULT_ERRORS as e:
+            logger.error(f"[ERROR] Error retrieving NFTs: {e}")
+            return {
+                "success": False,
+                "error": _error_name(e),
+                "message": str(e),
+                "nfts": all_nfts,
+                "total": len(all_nfts),
+                "owner": owner_address,
+                "pages_fetched": page_count
+            }
+        
+        return {
+            "success": True,
+            "nfts": all_nfts,
+            "total": len(all_nfts),
+            "owner": owner_address,
+            "pages_fetched": page_count
+        }
+    
+    async def get_nft_metadata(self, contract_address, token_id, retry_count=3, retry_delay=1, timeout=10,
+                               deadline=None):
+        """
+        Get NFT metadata with error handling and retry mechanism
+        
+        Args:
+            contract_address (str): The NFT contract address
+            token_id (str): The NFT token ID
+            retry_count (int): Number of attempts
+            retry_delay (int): Initial delay between retries in seconds
+            timeout (float): Per-attempt request timeout, shrunk to fit the deadline
+            deadline (Deadline or float): Overall deadline in seconds, including
+                retries (an enclosing deadline_scope also applies)
+        
+        Returns:
+            dict: Result containing metadata and status information
+        """
+        deadline = resolve_deadline(deadline)
+        url = f"{self.nft_url}/getNFTMetadata"
+        params = {"contractAddress": contract_address, "tokenId": token_id, "refreshCache": "false"}
+        try:
+            metadata = await self._with_retries(
+                f"{self.network}/getNFTMetadata", f"getNFTMetadata - {contract_address}/{token_id}",
+                lambda: self._json("GET", url, "getNFTMetadata", timeout, deadline, params=params),
+                max(0, retry_count - 1), retry_delay, deadline
+            )
+        except aiohttp.ClientResponseError as e:
+            error = {400: "bad_request", 404: "not_found", 429: "rate_limit"}.get(e.status, "all_retries_failed")
+            return {
+                "success": False,
+                "error": error,
+                "message": str(e),
+                "contract_address": contract_address,
+                "token_id": token_id
+            }
+        except RESULT_ERRORS as e:
+            logger.error(f"[ERROR] Error retrieving NFT metadata: {e}")
+            return {
+                "success": False,
+                "error": _error_name(e),
+                "message": str(e),
+                "contract_address": contract_address,
+                "token_id": token_id
+            }
+        
+        if not metadata.get('metadata'):
+            logger.warning("[WARNING] NFT metadata may be incomplete, missing 'metadata' field")
+        return {
+            "success": True,
+            "metadata": metadata,
+            "contract_address": contract_address,
+            "token_id": token_id
+        }
+    
+    async def get_nft_transfers(self, owner_address, page_size=100, max_pages=1, timeout=30, deadline=None):
+        """
+        Get NFT transfer history for an address using alchemy_getAssetTransfers
+        
+        Args:
+            owner_address (str): The Ethereum address to query
+            page_size (int): Number of transfers to fetch per page
+            max_pages (int): Maximum number of pages to fetch
+            timeout (float): Per-page request timeout, shrunk to fit the deadline
+            deadline (Deadline or float): Overall deadline in seconds for all pages
+                (an enclosing deadline_scope also applies)
+        
+        Returns:
+            dict: Result containing transfers and status information
+        """
+        deadline = resolve_deadline(deadline)
+        all_transfers = []
+        page_count = 0
+        page_key = None
+        try:
+            while page_count < max_pages:
+                query = {
+                    "fromBlock": "0x0",
+                    "toBlock": "latest",
+                    "category": ["ERC721", "ERC1155"],
+                    "withMetadata": True,
+                    "excludeZeroValue": True,
+                    "maxCount": hex(page_size),
+                    "fromAddress": owner_address
+                }
+                if page_key:
+                    query["pageKey"] = page_key
+                result = await self._with_retries(
+                    f"{self.network}/alchemy_getAssetTransfers", f"alchemy_getAssetTransfers - {owner_address}",
+                    lambda: self._rpc("alchemy_getAssetTransfers", [query], timeout, deadline),
+                    3, 1, deadline
+                )
+                page_count += 1
+                all_transfers.extend(result["transfers"])
+                page_key = result.get("pageKey")
+                if not page_key:
+                    break
+        except RESULT_ERRORS as e:
+            logger.error(f"Request error: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "transfers": all_transfers,
+                "owner": owner_address,
+                "pages_fetched": page_count
+            }
+        
+        logger.info(f"Successfully fetched {len(all_transfers)} NFT transfers for {owner_address}")
+        return {
+            "success": True,
+            "transfers": all_transfers,
+            "total": len(all_transfers),
+            "owner": owner_address,
+            "pages_fetched": page_count
+        }
+    
+    async def resolve_ipfs_uri(self, ipfs_uri, timeout=15):
+        """
+        Resolve IPFS URI to get metadata, trying the next gateway on failure
+        
+        Args:
+            ipfs_uri (str): IPFS URI to resolve
+            timeout (int): Request timeout in seconds per gateway
+        
+        Returns:
+            dict or bytes: Resolved content (JSON or binary), or None
+        """
+        if not ipfs_uri:
+            logger.error("[ERROR] IPFS URI is empty")
+            return None
+        
+        if ipfs_uri.startswith("ipfs://"):
+            urls = [ipfs_uri.replace("ipfs://", gateway) for gateway in IPFS_GATEWAYS]
+        elif ipfs_uri.startswith("ipfs:/"):
+            urls = [ipfs_uri.replace("ipfs:/", gateway) for gateway in IPFS_GATEWAYS]
+        else:
+            urls = [ipfs_uri]
+        
+        for url in urls:
+            try:
+                content_type, body = await self._request("GET", url, None, timeout, resolve_deadline())
+                if content_type == "application/json":
+                    return json.loads(body)
+                return body
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.warning(f"[WARNING] Failed to resolve {url}: {e}")
+        logger.error(f"[ERROR] Failed to resolve IPFS URI: {ipfs_uri}")
+        return None
+    
+    async def test_alchemy_connection(self):
+        """
+        Tests the connection to the Alchemy JSON-RPC endpoint
+        
+        Returns:
+            dict: A dictionary containing connection status, latency, and error if any
+        """
+        start_time = time.time()
+        try:
+            block_number = await self._rpc("eth_blockNumber", [], 5, resolve_deadline())
+        except Exception as e:
+            return {"success": False, "error": str(e)}
+        return {
+            "success": True,
+            "latency": round((time.time() - start_time) * 1000, 2),
+            "block_number": int(block_number, 16)
+        }
+
+def _error_name(error):
+    """Map an exception to the error name used in result dicts"""
+    if isinstance(error, DeadlineExceeded):
+        return "deadline_exceeded"
+    if isinstance(error, CircuitOpenError):
+        return "circuit_open"
+    if isinstance(error, RPCError):
+        return "rpc_error"
+    if isinstance(error, (ValueError, KeyError)):
+        return "invalid_response"
+    return classify_error(error)
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        async with AsyncAlchemyClient() as client:
+            print(await client.test_alchemy_connection())
+            addresses = [
+                "0xd8dA6BF26964aF9D7eEd9e03E53415D37aA96045",
+                "0x00000000219ab540356cBB839Cbe05303d7705Fa",
+                "0xC02aaA39b223FE8D0A0e5C4F27eAD9083C756Cc2"
+            ]
+            balances = await asyncio.gather(*(client.get_eth_balance(address) for address in addresses))
+            for address, balance in zip(addresses, balances):
+                print(f"ETH balance for {address}: {balance}")
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    asyncio.run(demo())
@@ -0,0 +1,169 @@
+# File: async_rate_limiter.py
+# Purpose: Provide an asyncio rate limiter that never blocks the event loop
+
+import asyncio
+from collections import deque
+
+from clock import SYSTEM_CLOCK
+from rate_limiter import make_engine, request_cost
+
+class AsyncRateLimiter:
+    """
+    Asyncio counterpart of RateLimiter
+    
+    Waiting coroutines are queued in FIFO order and released by a single
+    drainer task, so thousands of tasks can share one budget with only one
+    pending timer and no busy-waiting.
+    
+    Usage:
+        limiter = AsyncRateLimiter(max_calls=300, time_frame=60)
+        async with limiter:
+            ...
+    """
+    def __init__(self, max_calls, time_frame, engine="sliding_window", costs=None, default_cost=1, clock=None):
+        """
+        Initialize the async rate limiter
+        
+        Args:
+            max_calls (int): Maximum number of calls (or cost units) allowed within the time frame
+            time_frame (float): Time frame in seconds
+            engine (str or object): Engine name or instance, as for RateLimiter
+            costs (dict): Optional mapping of method name to cost, used by cost_of()
+            default_cost (int): Cost of methods missing from the costs table
+            clock (object): Clock providing time() and async_sleep() (default: the system clock)
+        """
+        self.max_calls = max_calls
+        self.time_frame = time_frame
+        self.engine = make_engine(engine, max_calls, time_frame)
+        self.costs = costs or {}
+        self.default_cost = default_cost
+        self.clock = clock or SYSTEM_CLOCK
+        self._waiters = deque()  # (future, cost) of queued tasks, oldest first
+        self._drainer = None  # Task releasing queued waiters
+        self._loop = None  # Event loop the queue and drainer belong to
+    
+    def cost_of(self, request):
+        """
+        Return the cost of a request according to the costs table
+        
+        Args:
+            request (str, dict or list): Method name, JSON-RPC payload or batch
+            
+        Returns:
+            int: Cost of the request
+        """
+        return request_cost(request, self.costs, self.default_cost)
+    
+    def can_call(self, cost=1):
+        """
+        Check if an API call can be made right now, without waiting
+        
+        Args:
+            cost (int): Number of units the call consumes
+        
+        Returns:
+            bool: True if a call can be made, False otherwise
+        """
+        # Queued tasks go first to keep the order fair
+        if self._waiters:
+            return False
+        return self.engine.try_acquire(self.clock.time(), cost)
+    
+    def wait_time(self, cost=1):
+        """
+        Return the time to wait before the next call would be admitted
+        
+        Args:
+            cost (int): Number of units the call consumes
+        
+        Returns:
+            float: Time to wait in seconds
+        """
+        return self.engine.wait_time(self.clock.time(), cost)
+    
+    async def acquire(self, cost=1):
+        """
+        Wait for a slot without blocking the event loop
+        
+        Args:
+            cost (int): Number of units the call consumes, reserved atomically
+        
+        Returns:
+            float: The time waited in seconds
+        """
+        if cost > self.max_calls:
+            raise ValueError(f"Request cost {cost} exceeds rate limit capacity {self.max_calls}")
+        loop = asyncio.get_running_loop()
+        self._bind_loop(loop)
+        if self.can_call(cost):
+            return 0
+        
+        future = loop.create_future()
+        self._waiters.append((future, cost))
+        if self._drainer is None or self._drainer.done():
+            self._drainer = loop.create_task(self._drain())
+        
+        start = self.clock.time()
+        # Cancellation propagates to the caller; the drainer skips cancelled futures
+        await future
+        return self.clock.time() - start
+    
+    def _bind_loop(self, loop):
+        """Start a fresh queue and drainer when used from another event loop (e.g. a second asyncio.run())"""
+        if self._loop is loop:
+            return
+        # Waiters and the drainer of the previous loop can never be woken from this one
+        self._waiters = deque()
+        self._drainer = None
+        self._loop = loop
+    
+    async def _drain(self):
+        """Release queued waiters in order as slots become available"""
+        while self._waiters:
+            future, cost = self._waiters[0]
+            if future.done():
+                # The waiting task was cancelled
+                self._waiters.popleft()
+                continue
+            
+            now = self.clock.time()
+            if self.engine.try_acquire(now, cost):
+                self._waiters.popleft()
+                future.set_result(None)
+                continue
+            
+            await self.clock.async_sleep(self.engine.wait_time(now, cost))
+    
+    async def acquire_for(self, request):
+        """
+        Wait until a request can be made, charging its cost from the costs table
+        
+        Args:
+            request (str, dict or list): Method name, JSON-RPC payload or batch
+            
+        Returns:
+            float: The time waited in seconds
+        """
+        return await self.acquire(self.cost_of(request))
+    
+    async def __aenter__(self):
+        await self.acquire()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+# Example usage
+if __name__ == "__main__":
+    async def demo():
+        # 5 calls per 2 seconds shared by 12 concurrent tasks
+        limiter = AsyncRateLimiter(max_calls=5, time_frame=2, engine="gcra")
+        start = limiter.clock.time()
+        
+        async def call(i):
+            async with limiter:
+                print(f"Call {i+1}: made at {limiter.clock.time() - start:.2f}s")
+        
+        await asyncio.gather(*(call(i) for i in range(12)))
+    
+    asyncio.run(demo())
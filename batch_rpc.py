@@ -0,0 +1,418 @@
+# File: batch_rpc.py
+# Purpose: Send JSON-RPC batches with id-indexed response matching and per-element retry
+
+import math
+import time
+import logging
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from rate_limiter import throttle, report_result, current_limiter
+from retry_budget import default_retry_budget
+from retry_policy import RetryPolicy, RATE_LIMIT_ERROR_CODES, is_rate_limited
+from circuit_breaker import classify_error, get_breaker, CircuitOpenError
+from deadline import DeadlineExceeded, resolve_deadline, request_timeout
+from transport import http_post
+
+logger = logging.getLogger("alchemy_api")
+
+# JSON-RPC error codes worth retrying for a single batch element (rate limits and internal errors)
+RETRYABLE_RPC_ERROR_CODES = RATE_LIMIT_ERROR_CODES + (-32603, -32000)
+
+# Categories from classify_error() for which a failed batch POST is resubmitted
+RETRYABLE_ERROR_CATEGORIES = {"rate_limit", "server", "timeout", "connection", "request"}
+
+# Largest batch Alchemy accepts over HTTP
+MAX_BATCH_SIZE = 1000
+
+# Concurrent chunk requests by default
+DEFAULT_MAX_WORKERS = 8
+
+def build_batch(calls, start_id=0):
+    """
+    Build JSON-RPC request objects for a list of calls
+    
+    Args:
+        calls (list): (method, params) tuples
+        start_id (int): Id of the first request; ids increase by one
+    
+    Returns:
+        list: JSON-RPC request dicts
+    """
+    return [
+        {"jsonrpc": "2.0", "id": start_id + i, "method": method, "params": params}
+        for i, (method, params) in enumerate(calls)
+    ]
+
+def index_responses(results, expected_ids):
+    """
+    Index a batch response by id in a single pass
+    
+    Args:
+        results (list): Batch response body (a non-list body counts as no answers)
+        expected_ids (list): Ids of the requests that were sent
+    
+    Returns:
+        tuple: (responses, duplicates, missing, unexpected) where responses
+            maps id -> the first response element with that id, duplicates
+            and unexpected list ids answered twice or never asked for, and
+            missing lists expected ids without an answer, in request order
+    """
+    expected = set(expected_ids)
+    responses = {}
+    duplicates = []
+    unexpected = []
+    
+    for result in results if isinstance(results, list) else []:
+        if not isinstance(result, dict):
+            continue
+        response_id = result.get("id")
+        try:
+            known = response_id in expected
+        except TypeError:  # Unhashable id
+            known = False
+        if not known:
+            unexpected.append(response_id)
+        elif response_id in responses:
+            duplicates.append(response_id)
+        else:
+            responses[response_id] = result
+    
+    missing = [i for i in expected_ids if i not in responses]
+    return responses, duplicates, missing, unexpected
+
+def is_retryable_rpc_error(response):
+    """
+    Check whether a batch element failed with a transient JSON-RPC error
+    
+    Args:
+        response (dict): JSON-RPC response element
+    
+    Returns:
+        bool: True for rate limit and internal errors
+    """
+    error = response.get("error")
+    if not isinstance(error, dict):
+        return False
+    return error.get("code") in RETRYABLE_RPC_ERROR_CODES or is_rate_limited(response)
+
+def split_to_fit(chunk, requests_by_id, limiter=None):
+    """
+    Split a chunk of batch elements into pieces the limiter can admit
+    
+    A chunk sized before an adaptive controller cut the rate can cost more
+    than the current capacity; throttling it whole would raise ValueError.
+    
+    Args:
+        chunk (list): Request ids of the chunk, in order
+        requests_by_id (dict): Request id -> JSON-RPC request
+        limiter (RateLimiter or AsyncRateLimiter): Limiter to fit (default: the current limiter)
+    
+    Returns:
+        list: Consecutive pieces of the chunk, each costing at most max_calls
+            (a single element costing more is left on its own)
+    """
+    limiter = limiter or current_limiter()
+    if limiter is None:
+        return [chunk]
+    pieces = []
+    piece = []
+    piece_cost = 0
+    for i in chunk:
+        cost = limiter.cost_of(requests_by_id[i])
+        if piece and piece_cost + cost > limiter.max_calls:
+            pieces.append(piece)
+            piece = []
+            piece_cost = 0
+        piece.append(i)
+        piece_cost += cost
+    pieces.append(piece)
+    return pieces
+
+def _default_error_handler(error, endpoint):
+    """Log a failed batch POST and return True if it is worth resubmitting"""
+    category = classify_error(error)
+    if category == "rate_limit":
+        report_result(throttled=True)
+    logger.error(f"Batch request failed ({category}): {error} - {endpoint}")
+    return category in RETRYABLE_ERROR_CATEGORIES
+
+def batch_call(url, calls, timeout=30, deadline=None, max_retries=3, breaker_name=None,
+               error_handler=None, endpoint="batch_call", session=None):
+    """
+    Send a list of JSON-RPC calls as a batch, retrying only what failed
+    
+    Responses are matched to requests through an id index. Elements that
+    failed with a transient error or were missing from the response are
+    resubmitted; a batch whose whole POST failed is resubmitted as two
+    halves. Results already received are kept. Every resubmitted POST is
+    charged to the retry budget; once it runs out, or the circuit opens,
+    the calls not yet sent are left unanswered.
+    
+    Args:
+        url (str): JSON-RPC endpoint
+        calls (list): (method, params) tuples
+        timeout (float): Request timeout in seconds, shrunk to fit the deadline
+        deadline (Deadline or float): Overall deadline in seconds
+            (an enclosing deadline_scope also applies)
+        max_retries (int): Maximum number of resubmission rounds
+        breaker_name (str): Circuit breaker guarding the endpoint (None for none)
+        error_handler (callable): Called with (error, endpoint) when a POST fails;
+            returns True if the batch should be resubmitted
+        endpoint (str): Description used in log messages
+        session (requests.Session): Session to send with (default: the shared transport)
+    
+    Returns:
+        list: One JSON-RPC response element per call, in input order; None
+            where no answer was received
+    
+    Raises:
+        CircuitOpenError: If the circuit is open before any call was answered
+        DeadlineExceeded: If the deadline passes before a request is sent
+        Exception: If a POST fails permanently, or every element was lost
+            to failed POSTs
+    """
+    error_handler = error_handler or _default_error_handler
+    breaker = get_breaker(breaker_name) if breaker_name else None
+    policy = RetryPolicy(max_retries=max_retries, base_delay=1, max_delay=30)
+    deadline = resolve_deadline(deadline)
+    post = session.post if session is not None else http_post
+    
+    # Each request's id is its position in calls
+    requests_by_id = dict(enumerate(build_batch(calls)))
+    responses = {}
+    chunks = [list(requests_by_id)] if requests_by_id else []
+    retries = 0
+    last_error = None
+    
+    while chunks:
+        retry_ids = []  # Elements that failed transiently or were missing
+        split_chunks = []  # Halves of batches whose whole POST failed
+        round_error = None
+        round_response = None
+        stopped = False  # Budget exhausted or circuit opened mid-round
+        
+        queue = deque(chunks)
+        while queue:
+            chunk = queue.popleft()
+            # The rate may have been cut since the chunk was sized; send it in pieces that still fit
+            pieces = split_to_fit(chunk, requests_by_id)
+            if len(pieces) > 1:
+                logger.info(f"Splitting a batch of {len(chunk)} calls into {len(pieces)} to fit the rate limit - {endpoint}")
+                queue.extendleft(reversed(pieces))
+                continue
+            
+            unsent = len(chunk) + sum(len(c) for c in queue)
+            # Each resubmitted POST draws on the fleet-wide budget so retries cannot amplify an outage
+            if retries and not default_retry_budget.try_spend():
+                logger.error(f"Retry budget exhausted, {unsent} of {len(calls)} calls unsent - {endpoint}")
+                stopped = True
+                break
+            if breaker:
+                try:
+                    breaker.before_call()
+                except CircuitOpenError:
+                    if not responses:
+                        raise
+                    # Keep what was already answered rather than discarding it
+                    logger.error(f"Circuit open, {unsent} of {len(calls)} calls unsent - {endpoint}")
+                    stopped = True
+                    break
+            
+            batch_payload = [requests_by_id[i] for i in chunk]
+            try:
+                # Reserve the summed cost of the batch, then send it
+                throttle(batch_payload)
+                start_time = time.time()
+                response = post(url, json=batch_payload, timeout=request_timeout(timeout, deadline))
+                response.raise_for_status()
+                report_result(latency=time.time() - start_time)
+                default_retry_budget.record_success()
+                if breaker:
+                    breaker.record_success()
+                results = response.json()
+            
+            except DeadlineExceeded as e:
+                error_handler(e, endpoint)
+                if breaker:
+                    breaker.record_error(e)
+                raise
+            
+            except Exception as e:
+                need_retry = error_handler(e, endpoint)
+                if breaker:
+                    breaker.record_error(e)
+                if not need_retry:
+                    # e.g. 4xx: resubmitting the same request will not help
+                    raise
+                last_error = round_error = e
+                # Resubmit as two halves so an oversized batch or one bad element cannot sink the rest
+                half = (len(chunk) + 1) // 2
+                split_chunks.extend(part for part in (chunk[:half], chunk[half:]) if part)
+                continue
+            
+            indexed, duplicates, missing, unexpected = index_responses(results, chunk)
+            if duplicates:
+                logger.warning(f"Ignoring {len(duplicates)} duplicate response ids (e.g. {duplicates[0]}) - {endpoint}")
+            if unexpected:
+                logger.warning(f"Ignoring {len(unexpected)} responses with unknown ids (e.g. {unexpected[0]}) - {endpoint}")
+            
+            for i, result in indexed.items():
+                if is_retryable_rpc_error(result):
+                    retry_ids.append(i)
+                    round_response = response
+                else:
+                    responses[i] = result
+            retry_ids.extend(missing)
+            if is_rate_limited(results):
+                report_result(throttled=True)
+        
+        if stopped:
+            break
+        chunks = split_chunks + ([retry_ids] if retry_ids else [])
+        if not chunks:
+            break
+        
+        pending = sum(len(chunk) for chunk in chunks)
+        retries += 1
+        if retries > max_retries:
+            logger.error(f"Maximum retries reached ({max_retries}), {pending} of {len(calls)} calls unanswered - {endpoint}")
+            break
+        
+        # Honor the server's Retry-After or JSON-RPC hint if any, else exponential backoff
+        sleep_time = policy.delay_for(retries, round_error, round_response)
+        if deadline and not deadline.allows(sleep_time):
+            logger.error(f"Not retrying, backoff would miss the deadline, {pending} of {len(calls)} calls unanswered - {endpoint}")
+            break
+        
+        logger.info(f"Resubmitting {pending} of {len(calls)} calls in {sleep_time:.2f} seconds, retry {retries}/{max_retries} - {endpoint}")
+        time.sleep(sleep_time)
+    
+    # Every element was lost to failed POSTs: surface the error rather than a list of None
+    if chunks and not responses and last_error is not None:
+        raise last_error
+    
+    return [responses.get(i) for i in range(len(calls))]
+
+def capacity_floor(limiter):
+    """
+    Return the lowest capacity a limiter can be cut to
+    
+    Args:
+        limiter (RateLimiter or AsyncRateLimiter): The limiter
+    
+    Returns:
+        float: The attached controller's min_rate if lower than max_calls, else max_calls
+    """
+    controller = getattr(limiter, "controller", None)
+    if controller is None:
+        return limiter.max_calls
+    return min(limiter.max_calls, controller.min_rate)
+
+def chunk_size_for(calls, max_workers=DEFAULT_MAX_WORKERS, max_batch_size=MAX_BATCH_SIZE, limiter=None):
+    """
+    Choose a chunk size for sending calls as several concurrent batches
+    
+    Chunks are small enough to give every worker one, never exceed the
+    provider's batch limit, and never cost more than the rate limiter's
+    capacity (a batch is admitted as a whole). With an adaptive controller
+    attached, chunks are sized against the controller's floor, so they
+    still fit after the rate is cut.
+    
+    Args:
+        calls (list): (method, params) tuples
+        max_workers (int): Number of concurrent requests
+        max_batch_size (int): Largest batch the provider accepts
+        limiter (RateLimiter): Limiter whose capacity bounds a chunk's cost
+            (default: the current limiter)
+    
+    Returns:
+        int: Calls per chunk
+    """
+    size = min(max_batch_size, math.ceil(len(calls) / max(1, max_workers)))
+    limiter = limiter or current_limiter()
+    if limiter is not None and calls:
+        # Size by the most expensive method so any chunk fits the capacity
+        max_cost = max(limiter.cost_of(method) for method in {method for method, _ in calls})
+        size = min(size, int(capacity_floor(limiter) // max(1, max_cost)))
+    return max(1, size)
+
+def batch_call_chunked(url, calls, chunk_size=None, max_workers=DEFAULT_MAX_WORKERS, deadline=None,
+                       session=None, **kwargs):
+    """
+    Send a large list of JSON-RPC calls as concurrent batches
+    
+    Calls are split into chunks (see chunk_size_for), each chunk is sent
+    with batch_call on a worker thread over the shared pooled transport,
+    and the results are merged back in input order. Every chunk waits for
+    the current rate limiter, so throughput follows the available quota.
+    
+    Args:
+        url (str): JSON-RPC endpoint
+        calls (list): (method, params) tuples
+        chunk_size (int): Calls per batch (default: chosen by chunk_size_for)
+        max_workers (int): Maximum number of batches in flight
+        deadline (Deadline or float): Overall deadline in seconds
+            (an enclosing deadline_scope also applies)
+        session (requests.Session): Session to send with (default: the shared transport)
+        **kwargs: Passed on to batch_call (timeout, max_retries, breaker_name,
+            error_handler, endpoint)
+    
+    Returns:
+        list: One JSON-RPC response element per call, in input order; None
+            where no answer was received
+    
+    Raises:
+        Exception: The first chunk's error if every chunk failed
+    """
+    if not calls:
+        return []
+    chunk_size = chunk_size or chunk_size_for(calls, max_workers)
+    # Resolve once so all chunks share one deadline
+    deadline = resolve_deadline(deadline)
+    chunks = [calls[i:i + chunk_size] for i in range(0, len(calls), chunk_size)]
+    
+    if len(chunks) == 1:
+        return batch_call(url, calls, deadline=deadline, session=session, **kwargs)
+    
+    endpoint = kwargs.get("endpoint", "batch_call")
+    results = []
+    errors = []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="batch") as executor:
+        # Copy the context so fairness lanes and other context variables follow each chunk
+        futures = [
+            executor.submit(contextvars.copy_context().run, batch_call, url, chunk,
+                            deadline=deadline, session=session, **kwargs)
+            for chunk in chunks
+        ]
+        for chunk, future in zip(chunks, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                logger.error(f"Batch of {len(chunk)} calls failed: {e} - {endpoint}")
+                errors.append(e)
+                results.extend([None] * len(chunk))
+    
+    if len(errors) == len(chunks):
+        raise errors[0]
+    return results
+
+# Example usage
+if __name__ == "__main__":
+    batch = build_batch([("eth_blockNumber", []), ("eth_chainId", []), ("eth_gasPrice", [])])
+    answers = [
+        {"jsonrpc": "2.0", "id": 2, "result": "0x3b9aca00"},
+        {"jsonrpc": "2.0", "id": 0, "result": "0x1312d00"},
+        {"jsonrpc": "2.0", "id": 0, "result": "0x1312d00"},
+        {"jsonrpc": "2.0", "id": 7, "result": "0x1"}
+    ]
+    responses, duplicates, missing, unexpected = index_responses(answers, [request["id"] for request in batch])
+    print(f"Answered: {sorted(responses)}, duplicates: {duplicates}, missing: {missing}, unexpected: {unexpected}")
+    
+    from rate_limiter import RateLimiter
+    from compute_units import COMPUTE_UNIT_COSTS
+    calls = [("eth_getBalance", [f"0x{i:040x}", "latest"]) for i in range(100000)]
+    limiter = RateLimiter(max_calls=3300, time_frame=1, engine="gcra", costs=COMPUTE_UNIT_COSTS)
+    print(f"Chunk size for {len(calls)} balances: {chunk_size_for(calls)} "
+          f"(with a 3300 CU/s limiter: {chunk_size_for(calls, limiter=limiter)})")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Benchmark for the asyncio client
+# Sends thousands of concurrent eth_getBalance calls to a local JSON-RPC server with
+# artificial latency, once through AsyncAlchemyClient and once through a thread pool
+# using the pooled blocking transport, and compares throughput
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from async_client import AsyncAlchemyClient
+from transport import Transport
+
+def run_server(port, latency, ready):
+    """Serve eth_getBalance with a fixed delay per request (runs in a child process)"""
+    async def handle(request):
+        payload = await request.json()
+        await asyncio.sleep(latency)
+        return web.json_response({"jsonrpc": "2.0", "id": payload.get("id", 1), "result": "0xde0b6b3a7640000"})
+    
+    async def serve():
+        app = web.Application()
+        app.router.add_post("/", handle)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, "127.0.0.1", port, backlog=4096).start()
+        ready.set()
+        await asyncio.Event().wait()
+    
+    asyncio.run(serve())
+
+def free_port():
+    """Return a free local TCP port"""
+    import socket
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+async def run_async(url, addresses, connections):
+    """Fetch every balance concurrently from one event loop"""
+    async with AsyncAlchemyClient(rpc_url=url, network="benchmark", limit=connections,
+                                  limit_per_host=connections) as client:
+        start = time.perf_counter()
+        balances = await asyncio.gather(*(client.get_eth_balance(address, max_retries=0) for address in addresses))
+        elapsed = time.perf_counter() - start
+    assert all(balance == 1 for balance in balances)
+    return elapsed
+
+def run_threads(url, addresses, workers):
+    """Fetch every balance with a thread per in-flight request"""
+    transport = Transport(pool_maxsize=workers)
+    
+    def fetch(address):
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_getBalance", "params": [address, "latest"]}
+        response = transport.post(url, json=payload, timeout=30)
+        response.raise_for_status()
+        return int(response.json()["result"], 16)
+    
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        balances = list(executor.map(fetch, addresses))
+    elapsed = time.perf_counter() - start
+    transport.close()
+    assert all(balance == 10 ** 18 for balance in balances)
+    return elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Async client vs thread pool throughput benchmark")
+    parser.add_argument("--requests", type=int, default=5000, help="Balance lookups per run (default: 5000)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Server delay per request in seconds (default: 0.05)")
+    parser.add_argument("--connections", type=int, default=500, help="Async client connection limit (default: 500)")
+    parser.add_argument("--threads", type=int, default=64, help="Thread pool size (default: 64)")
+    args = parser.parse_args()
+    
+    port = free_port()
+    ready = multiprocessing.Event()
+    server = multiprocessing.Process(target=run_server, args=(port, args.latency, ready), daemon=True)
+    server.start()
+    ready.wait(10)
+    url = f"http://127.0.0.1:{port}/"
+    addresses = [f"0x{i:040x}" for i in range(args.requests)]
+    
+    try:
+        print(f"{args.requests} eth_getBalance calls, {args.latency * 1000:.0f} ms server latency")
+        print(f"{'client':>32} {'seconds':>9} {'calls/s':>9}")
+        results = {}
+        for name, run in ((f"thread pool ({args.threads} threads)", lambda: run_threads(url, addresses, args.threads)),
+                          (f"async client ({args.connections} conns)",
+                           lambda: asyncio.run(run_async(url, addresses, args.connections)))):
+            results[name] = run()
+            print(f"{name:>32} {results[name]:>9.3f} {args.requests / results[name]:>9.0f}")
+        thread_time, async_time = results.values()
+        print(f"Async client speedup: {thread_time / async_time:.1f}x")
+    finally:
+        server.terminate()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# Benchmark for matching JSON-RPC batch responses to requests
+# Compares the id index used by batch_rpc with the old per-address linear scan
+
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from batch_rpc import build_batch, index_responses
+
+BATCH_SIZES = [100, 1000, 2500, 5000, 10000]
+
+def make_responses(batch):
+    """Build a shuffled balance response for every request in the batch"""
+    responses = [{"jsonrpc": "2.0", "id": request["id"], "result": hex(random.randrange(10 ** 20))} for request in batch]
+    random.shuffle(responses)
+    return responses
+
+def linear_scan(results, ids):
+    """Match responses the way batch_get_eth_balances used to (O(n^2))"""
+    matched = {}
+    for i in ids:
+        result = next((r for r in results if r["id"] == i), None)
+        if result and "result" in result:
+            matched[i] = int(result["result"], 16)
+    return matched
+
+def id_index(results, ids):
+    """Match responses through index_responses (O(n))"""
+    responses, _, _, _ = index_responses(results, ids)
+    return {i: int(result["result"], 16) for i, result in responses.items() if "result" in result}
+
+def time_matcher(matcher, results, ids, repeat):
+    """Return the best time in seconds over several runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        matcher(results, ids)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON-RPC batch response matching benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, best is kept (default: 3)")
+    parser.add_argument("--scan-limit", type=int, default=10000,
+                        help="Largest batch timed with the linear scan (default: 10000)")
+    args = parser.parse_args()
+    
+    print(f"{'batch':>8} {'linear scan':>14} {'id index':>12} {'index us/elem':>14} {'speedup':>9}")
+    for size in BATCH_SIZES:
+        batch = build_batch([("eth_getBalance", [f"0x{i:040x}", "latest"]) for i in range(size)])
+        ids = [request["id"] for request in batch]
+        results = make_responses(batch)
+        
+        assert linear_scan(results[:50], ids[:50]) == id_index(results[:50], ids[:50])
+        indexed = time_matcher(id_index, results, ids, args.repeat)
+        if size <= args.scan_limit:
+            scanned = time_matcher(linear_scan, results, ids, args.repeat)
+            print(f"{size:>8} {scanned * 1000:>11.1f} ms {indexed * 1000:>9.2f} ms "
+                  f"{indexed / size * 1e6:>14.2f} {scanned / indexed:>8.0f}x")
+        else:
+            print(f"{size:>8} {'skipped':>14} {indexed * 1000:>9.2f} ms {indexed / size * 1e6:>14.2f} {'-':>9}")
+
+if __name__ == "__main__":
+    main()
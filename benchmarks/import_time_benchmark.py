@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# Cold-start benchmark for the toolkit's modules
+# Imports each module in a fresh interpreter under `python -X importtime`, reports the
+# median cumulative import time, and fails if a module pulls in a package it should
+# only load on first use or exceeds the time budget
+
+import os
+import sys
+import argparse
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module -> packages that must not be imported when the module is imported
+MODULES = {
+    "alchemy_api_debug": ("web3", "aiohttp"),
+    "fetch_nft_examples": ("web3", "aiohttp"),
+    "batch_rpc": ("web3", "aiohttp"),
+    "async_client": ("web3",),
+}
+
+def import_profile(module):
+    """
+    Import a module in a fresh interpreter
+    
+    Returns:
+        tuple: (cumulative import time in ms, set of imported top-level packages)
+    """
+    # Run without an API key: importing must not depend on configuration
+    env = {k: v for k, v in os.environ.items() if k != "ALCHEMY_API_KEY"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    
+    total = None
+    packages = set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        name = name.strip()
+        packages.add(name.split(".")[0])
+        if name == module:
+            total = int(cumulative) / 1000
+    return total, packages
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time (cold start) benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per module (default: 5)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Fail if a module's median import time exceeds this")
+    args = parser.parse_args()
+    
+    print(f"{'module':>20} {'median ms':>10} {'min ms':>8}  unexpected imports")
+    failed = False
+    for module, forbidden in MODULES.items():
+        times = []
+        loaded = set()
+        for _ in range(args.runs):
+            total, packages = import_profile(module)
+            times.append(total)
+            loaded |= packages
+        unexpected = sorted(set(forbidden) & loaded)
+        median = statistics.median(times)
+        print(f"{module:>20} {median:>10.1f} {min(times):>8.1f}  {', '.join(unexpected) or '-'}")
+        if unexpected or (args.max_ms is not None and median > args.max_ms):
+            failed = True
+    
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
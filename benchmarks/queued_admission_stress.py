@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# Stress test for queued admission in RateLimiter.wait_if_needed
+# Shows how evenly admitted calls are spaced with and without booked slots
+
+import os
+import sys
+import time
+import argparse
+import threading
+import statistics
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import SystemClock
+from rate_limiter import RateLimiter, ENGINES
+
+class CountingClock(SystemClock):
+    """System clock that counts sleeps (wake-ups)"""
+    def __init__(self):
+        self.sleeps = 0
+        self.lock = threading.Lock()
+    
+    def sleep(self, seconds):
+        with self.lock:
+            self.sleeps += 1
+        super().sleep(seconds)
+
+def run(engine, queued, threads, calls_per_thread, max_calls, time_frame):
+    """
+    Let many threads call wait_if_needed() and record when each call is admitted
+    
+    Returns:
+        tuple: Sorted admission timestamps after the initial burst, and the
+            number of sleeps per admitted call
+    """
+    counter = CountingClock()
+    limiter = RateLimiter(max_calls=max_calls, time_frame=time_frame, engine=engine, queued=queued, clock=counter)
+    admitted = []
+    admitted_lock = threading.Lock()
+    barrier = threading.Barrier(threads)
+    
+    def worker():
+        barrier.wait()
+        for _ in range(calls_per_thread):
+            limiter.wait_if_needed()
+            now = time.perf_counter()
+            with admitted_lock:
+                admitted.append(now)
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    for t in workers:
+        t.join()
+    
+    # Skip the burst admitted at once while the window was empty
+    return sorted(admitted)[max_calls:], counter.sleeps / len(admitted)
+
+def main():
+    parser = argparse.ArgumentParser(description="Queued admission stress test")
+    parser.add_argument("--threads", type=int, default=64, help="Number of threads (default: 64)")
+    parser.add_argument("--calls", type=int, default=4, help="Calls per thread (default: 4)")
+    parser.add_argument("--max-calls", type=int, default=50, help="Limiter max_calls (default: 50)")
+    parser.add_argument("--time-frame", type=float, default=1, help="Limiter time_frame (default: 1)")
+    args = parser.parse_args()
+    
+    expected = args.time_frame / args.max_calls
+    print(f"{args.threads} threads x {args.calls} calls, {args.max_calls} calls per {args.time_frame}s "
+          f"(ideal spacing {expected * 1000:.1f} ms)")
+    print(f"{'engine':>15} {'mode':>8} {'mean ms':>9} {'stdev ms':>9} {'min ms':>8} {'max ms':>8} {'same-instant':>13} {'sleeps/call':>12}")
+    
+    for engine in ENGINES:
+        for queued in (False, True):
+            times, sleeps = run(engine, queued, args.threads, args.calls, args.max_calls, args.time_frame)
+            gaps = [(b - a) * 1000 for a, b in zip(times, times[1:])]
+            # Gaps well below the ideal spacing mean several threads woke together
+            bunched = sum(1 for g in gaps if g < expected * 1000 * 0.1)
+            mode = "queued" if queued else "racing"
+            print(f"{engine:>15} {mode:>8} {statistics.mean(gaps):>9.2f} {statistics.pstdev(gaps):>9.2f} "
+                  f"{min(gaps):>8.2f} {max(gaps):>8.2f} {bunched:>13} {sleeps:>12.2f}")
+
+if __name__ == "__main__":
+    main()
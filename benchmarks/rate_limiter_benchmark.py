@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# Micro-benchmark for the RateLimiter engines
+# Compares the sliding-window list with the constant-time token bucket and GCRA engines
+
+import os
+import sys
+import time
+import argparse
+import threading
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RateLimiter, ENGINES
+
+THREAD_COUNTS = [1, 2, 4, 8, 16, 32, 64]
+
+def run_engine(engine, threads, calls_per_thread, max_calls, time_frame):
+    """
+    Hammer can_call() from several threads and measure admission throughput
+    
+    Args:
+        engine (str): Engine name
+        threads (int): Number of concurrent threads
+        calls_per_thread (int): can_call() invocations per thread
+        max_calls (int): Limiter max_calls
+        time_frame (float): Limiter time_frame
+        
+    Returns:
+        float: can_call() operations per second across all threads
+    """
+    limiter = RateLimiter(max_calls=max_calls, time_frame=time_frame, engine=engine)
+    # Fill the window so every engine runs at its steady-state size
+    for _ in range(max_calls):
+        limiter.can_call()
+    
+    barrier = threading.Barrier(threads + 1)
+    
+    def worker():
+        barrier.wait()
+        for _ in range(calls_per_thread):
+            limiter.can_call()
+    
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in workers:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in workers:
+        t.join()
+    elapsed = time.perf_counter() - start
+    
+    return threads * calls_per_thread / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="RateLimiter engine micro-benchmark")
+    parser.add_argument("--max-calls", type=int, default=300, help="Limiter max_calls (default: 300)")
+    parser.add_argument("--time-frame", type=float, default=60, help="Limiter time_frame in seconds (default: 60)")
+    parser.add_argument("--calls", type=int, default=20000, help="Total can_call() invocations per run (default: 20000)")
+    args = parser.parse_args()
+    
+    print(f"RateLimiter(max_calls={args.max_calls}, time_frame={args.time_frame}), {args.calls} calls per run")
+    print(f"{'threads':>8} " + " ".join(f"{name:>16}" for name in ENGINES))
+    
+    for threads in THREAD_COUNTS:
+        calls_per_thread = max(1, args.calls // threads)
+        row = []
+        for engine in ENGINES:
+            ops = run_engine(engine, threads, calls_per_thread, args.max_calls, args.time_frame)
+            row.append(f"{ops:>12,.0f} op/s")
+        print(f"{threads:>8} " + " ".join(row))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# Benchmark for the cross-process shared rate limiter
+# Measures admission latency and checks that N processes share one budget
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared_rate_limiter import shared_rate_limiter
+
+def worker(path, max_calls, time_frame, duration, results):
+    """Call can_call() in a loop for `duration` seconds and report stats"""
+    limiter = shared_rate_limiter(max_calls, time_frame, path=path)
+    admitted = 0
+    attempts = 0
+    elapsed = 0.0
+    first = time.time()
+    deadline = first + duration
+    while time.time() < deadline:
+        start = time.perf_counter()
+        ok = limiter.can_call()
+        elapsed += time.perf_counter() - start
+        attempts += 1
+        admitted += ok
+    limiter.engine.close()
+    results.put((admitted, attempts, elapsed, first, time.time()))
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared rate limiter benchmark")
+    parser.add_argument("--processes", type=int, default=8, help="Number of worker processes (default: 8)")
+    parser.add_argument("--max-calls", type=int, default=300, help="Budget shared by all processes (default: 300)")
+    parser.add_argument("--time-frame", type=float, default=1, help="Time frame in seconds (default: 1)")
+    parser.add_argument("--duration", type=float, default=3, help="Run time in seconds (default: 3)")
+    args = parser.parse_args()
+    
+    path = os.path.join(tempfile.mkdtemp(), "limiter.bin")
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=worker, args=(path, args.max_calls, args.time_frame, args.duration, results))
+        for _ in range(args.processes)
+    ]
+    for p in processes:
+        p.start()
+    stats = [results.get() for _ in processes]
+    for p in processes:
+        p.join()
+    
+    admitted = sum(s[0] for s in stats)
+    attempts = sum(s[1] for s in stats)
+    elapsed = sum(s[2] for s in stats)
+    # Burst of max_calls at the start, then max_calls per time_frame
+    span = max(s[4] for s in stats) - min(s[3] for s in stats)
+    allowed = args.max_calls * (1 + span / args.time_frame)
+    
+    print(f"{args.processes} processes sharing {args.max_calls} calls per {args.time_frame}s for {args.duration}s")
+    print(f"Admission latency: {elapsed / attempts * 1e6:.2f} us per can_call() ({attempts:,} calls)")
+    print(f"Admitted: {admitted} in {span:.2f}s (budget allows at most {allowed:.0f})")
+
+if __name__ == "__main__":
+    main()
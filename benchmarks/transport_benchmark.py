@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# Benchmark for the shared pooled transport
+# Compares per-request latency of bare requests.post (new connection each time)
+# with the keep-alive pool in transport.py, against a local HTTPS JSON-RPC server
+
+import os
+import ssl
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+import subprocess
+import statistics
+import warnings
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+import urllib3
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transport import Transport
+
+class RPCHandler(BaseHTTPRequestHandler):
+    """Answers every POST with an eth_blockNumber result, keeping the connection open"""
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without this, Nagle plus delayed ACKs add ~40 ms per reply
+    disable_nagle_algorithm = True
+    
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        request = json.loads(body or b"{}")
+        payload = json.dumps({"jsonrpc": "2.0", "id": request.get("id", 1), "result": "0x1312d00"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_server(use_tls):
+    """Start a local server on a free port, with a self-signed certificate if use_tls"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RPCHandler)
+    scheme = "http"
+    if use_tls:
+        directory = tempfile.mkdtemp()
+        cert = os.path.join(directory, "cert.pem")
+        key = os.path.join(directory, "key.pem")
+        subprocess.run(
+            ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-keyout", key, "-out", cert,
+             "-days", "1", "-subj", "/CN=localhost"],
+            check=True, capture_output=True
+        )
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert, key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+        scheme = "https"
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"{scheme}://127.0.0.1:{server.server_address[1]}/"
+
+def measure(post, url, requests_count):
+    """Return per-request latencies in milliseconds"""
+    payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}
+    latencies = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        response = post(url, json=payload, timeout=10, verify=False)
+        response.raise_for_status()
+        response.json()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+def main():
+    parser = argparse.ArgumentParser(description="Pooled transport latency benchmark")
+    parser.add_argument("--requests", type=int, default=300, help="Requests per run (default: 300)")
+    parser.add_argument("--no-tls", action="store_true", help="Serve plain HTTP instead of HTTPS")
+    args = parser.parse_args()
+    
+    warnings.simplefilter("ignore", urllib3.exceptions.InsecureRequestWarning)
+    server, url = start_server(use_tls=not args.no_tls)
+    transport = Transport()
+    
+    # Warm up both paths once
+    measure(requests.post, url, 5)
+    measure(transport.post, url, 5)
+    
+    print(f"{args.requests} sequential JSON-RPC POSTs to {url}")
+    print(f"{'client':>22} {'mean ms':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    results = {}
+    for name, post in (("requests.post", requests.post), ("pooled transport", transport.post)):
+        latencies = sorted(measure(post, url, args.requests))
+        results[name] = statistics.mean(latencies)
+        p99 = latencies[int(0.99 * (len(latencies) - 1))]
+        print(f"{name:>22} {results[name]:>9.3f} {statistics.median(latencies):>8.3f} {p99:>8.3f}")
+    
+    print(f"Per-request latency reduced by {1 - results['pooled transport'] / results['requests.post']:.0%}")
+    transport.close()
+    server.shutdown()
+
+if __name__ == "__main__":
+    main()
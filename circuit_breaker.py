@@ -0,0 +1,346 @@
+# File: circuit_breaker.py
+# Purpose: Fail fast during provider incidents with per-endpoint circuit breakers
+
+import sys
+import asyncio
+import logging
+import threading
+from contextlib import contextmanager
+
+from requests.exceptions import RequestException, HTTPError, Timeout, ConnectionError
+
+from clock import SYSTEM_CLOCK
+from deadline import DeadlineExceeded
+
+logger = logging.getLogger("alchemy_api")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Error categories that indicate an unhealthy provider and count against the breaker
+BREAKER_FAILURE_CATEGORIES = {"server", "timeout", "connection", "request"}
+# Error categories that prove the provider answered, so it is reachable
+BREAKER_SUCCESS_CATEGORIES = {"auth", "client", "rate_limit"}
+
+def _classify_status(status_code):
+    """Classify an HTTP error status"""
+    if status_code == 403:
+        return "auth"
+    if status_code == 429:
+        return "rate_limit"
+    if status_code >= 500:
+        return "server"
+    return "client"
+
+def error_status(error):
+    """
+    Return the HTTP status of a failed request (requests or aiohttp)
+    
+    Args:
+        error (Exception): The caught exception
+        
+    Returns:
+        int: The response's status code, or None if there was no response
+    """
+    status = getattr(error, "status", None)
+    if isinstance(status, int):
+        return status
+    return getattr(getattr(error, "response", None), "status_code", None)
+
+def classify_error(error):
+    """
+    Classify an API error (requests or aiohttp)
+    
+    Args:
+        error (Exception): The caught exception
+        
+    Returns:
+        str: One of "auth" (403), "rate_limit" (429), "server" (5xx),
+            "client" (other HTTP errors), "timeout", "connection",
+            "request" (other request errors), "deadline" (the caller's
+            deadline passed) or "unknown"
+    """
+    if isinstance(error, DeadlineExceeded):
+        return "deadline"
+    if isinstance(error, HTTPError) and getattr(error, "response", None) is not None:
+        return _classify_status(error.response.status_code)
+    if isinstance(error, Timeout):
+        return "timeout"
+    if isinstance(error, ConnectionError):
+        return "connection"
+    if isinstance(error, RequestException):
+        return "request"
+    # aiohttp errors can only exist once aiohttp is loaded, so it is never imported here
+    aiohttp = sys.modules.get("aiohttp")
+    if aiohttp is not None:
+        if isinstance(error, aiohttp.ClientResponseError):
+            return _classify_status(error.status)
+        if isinstance(error, aiohttp.ServerTimeoutError):
+            return "timeout"
+        if isinstance(error, aiohttp.ClientConnectionError):
+            return "connection"
+        if isinstance(error, aiohttp.ClientError):
+            return "request"
+    if isinstance(error, asyncio.TimeoutError):
+        return "timeout"
+    return "unknown"
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an endpoint whose circuit is open"""
+    def __init__(self, name, retry_in):
+        super().__init__(f"Circuit open for {name}, next probe in {retry_in:.1f}s")
+        self.name = name
+        self.retry_in = retry_in
+
+class CircuitBreaker:
+    """
+    Circuit breaker for one endpoint or method
+    
+    Closed: calls pass; `failure_threshold` consecutive failures open it.
+    Open: calls fail fast with CircuitOpenError for `recovery_timeout` seconds.
+    Half-open: up to `half_open_max_calls` probe calls pass at a time;
+    `success_threshold` successful probes close it, one failure reopens it.
+    """
+    def __init__(self, name, failure_threshold=5, recovery_timeout=30, half_open_max_calls=1,
+                 success_threshold=1, clock=None, on_state_change=None):
+        """
+        Initialize the circuit breaker
+        
+        Args:
+            name (str): Endpoint or method the breaker protects
+            failure_threshold (int): Consecutive failures that open the circuit
+            recovery_timeout (float): Seconds to stay open before probing
+            half_open_max_calls (int): Concurrent probe calls allowed while half-open
+            success_threshold (int): Successful probes needed to close the circuit
+            clock (object): Clock providing time() (default: the system clock)
+            on_state_change (callable): Called with (name, old_state, new_state)
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self.clock = clock or SYSTEM_CLOCK
+        self.on_state_change = on_state_change
+        
+        self._state = CLOSED
+        self.failures = 0  # Consecutive failures while closed
+        self.probe_successes = 0
+        self.probes_in_flight = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+        self._transitions = []  # (old_state, new_state) made under the lock, not yet announced
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the lock, then tell listeners about the transitions made meanwhile"""
+        self.lock.acquire()
+        try:
+            yield
+        finally:
+            transitions, self._transitions = self._transitions, []
+            self.lock.release()
+            # Listeners run without the lock, so they may read .state or other breakers
+            if self.on_state_change:
+                for old_state, new_state in transitions:
+                    self.on_state_change(self.name, old_state, new_state)
+    
+    def _transition(self, state):
+        """Change state (lock held); listeners are called once the lock is released"""
+        old_state = self._state
+        if old_state == state:
+            return
+        self._state = state
+        if state == OPEN:
+            self.opened_at = self.clock.time()
+        self.failures = 0
+        self.probe_successes = 0
+        self.probes_in_flight = 0
+        logger.warning(f"Circuit breaker {self.name}: {old_state} -> {state}")
+        self._transitions.append((old_state, state))
+    
+    def _refresh(self):
+        """Move from open to half-open once the recovery timeout has passed (lock held)"""
+        if self._state == OPEN and self.clock.time() - self.opened_at >= self.recovery_timeout:
+            self._transition(HALF_OPEN)
+    
+    @property
+    def state(self):
+        """str: Current state (closed, open or half_open)"""
+        with self._locked():
+            self._refresh()
+            return self._state
+    
+    def before_call(self):
+        """
+        Check that a call may proceed, reserving a probe slot when half-open
+        
+        Raises:
+            CircuitOpenError: If the circuit is open or all probe slots are taken
+        """
+        with self._locked():
+            self._refresh()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self.probes_in_flight < self.half_open_max_calls:
+                self.probes_in_flight += 1
+                return
+            if self._state == OPEN:
+                retry_in = self.recovery_timeout - (self.clock.time() - self.opened_at)
+            else:
+                retry_in = 0
+            raise CircuitOpenError(self.name, max(0, retry_in))
+    
+    def record_success(self):
+        """Record a call that reached a healthy provider"""
+        with self._locked():
+            if self._state == HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+                self.probe_successes += 1
+                if self.probe_successes >= self.success_threshold:
+                    self._transition(CLOSED)
+            else:
+                self.failures = 0
+    
+    def record_failure(self):
+        """Record a call that failed because the provider is unhealthy"""
+        with self._locked():
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+            elif self._state == CLOSED:
+                self.failures += 1
+                if self.failures >= self.failure_threshold:
+                    self._transition(OPEN)
+    
+    def release(self):
+        """Give back a probe slot without recording an outcome"""
+        with self._locked():
+            if self._state == HALF_OPEN:
+                self.probes_in_flight = max(0, self.probes_in_flight - 1)
+    
+    def record_error(self, error):
+        """
+        Record a failed call, counting it against the breaker only if the
+        error category points at the provider, and as a success only if the
+        provider answered
+        
+        Args:
+            error (Exception): The caught exception
+        """
+        category = classify_error(error)
+        if category in BREAKER_FAILURE_CATEGORIES:
+            self.record_failure()
+        elif category in BREAKER_SUCCESS_CATEGORIES:
+            # The provider answered (e.g. 4xx or 429), so it is reachable
+            self.record_success()
+        else:
+            # The caller gave up (deadline) or failed locally (e.g. a bad
+            # payload or a rate limit check): that says nothing about the provider
+            self.release()
+    
+    def snapshot(self):
+        """
+        Return the breaker's published state
+        
+        Returns:
+            dict: Name, state, consecutive failures and seconds until the next probe
+        """
+        with self._locked():
+            self._refresh()
+            retry_in = 0
+            if self._state == OPEN:
+                retry_in = max(0, self.recovery_timeout - (self.clock.time() - self.opened_at))
+            return {
+                "name": self.name,
+                "state": self._state,
+                "failures": self.failures,
+                "retry_in": retry_in
+            }
+
+class CircuitBreakerRegistry:
+    """Creates one CircuitBreaker per key on demand and publishes their states"""
+    def __init__(self, **breaker_kwargs):
+        """
+        Initialize the registry
+        
+        Args:
+            **breaker_kwargs: Settings passed to every new CircuitBreaker
+        """
+        self.breaker_kwargs = breaker_kwargs
+        self.breakers = {}
+        self.listeners = []
+        self.lock = threading.Lock()
+    
+    def _notify(self, name, old_state, new_state):
+        for listener in list(self.listeners):
+            listener(name, old_state, new_state)
+    
+    def get(self, name):
+        """
+        Return the breaker for an endpoint or method, creating it if needed
+        
+        Args:
+            name (str): Breaker key, e.g. "eth-mainnet/eth_getBalance"
+            
+        Returns:
+            CircuitBreaker: The breaker for that key
+        """
+        with self.lock:
+            breaker = self.breakers.get(name)
+            if breaker is None:
+                breaker = CircuitBreaker(name, on_state_change=self._notify, **self.breaker_kwargs)
+                self.breakers[name] = breaker
+            return breaker
+    
+    def add_listener(self, callback):
+        """
+        Subscribe to state changes of every breaker
+        
+        Args:
+            callback (callable): Called with (name, old_state, new_state)
+        """
+        self.listeners.append(callback)
+    
+    def states(self):
+        """
+        Return a snapshot of every breaker
+        
+        Returns:
+            dict: Breaker name -> snapshot dict
+        """
+        with self.lock:
+            breakers = list(self.breakers.values())
+        return {breaker.name: breaker.snapshot() for breaker in breakers}
+
+# Registry used by the toolkit's request functions
+default_registry = CircuitBreakerRegistry()
+
+def get_breaker(name):
+    """Return the default registry's breaker for an endpoint or method"""
+    return default_registry.get(name)
+
+def breaker_states():
+    """Return snapshots of all breakers in the default registry"""
+    return default_registry.states()
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    clock = VirtualClock()
+    breaker = CircuitBreaker("eth-mainnet/eth_getBalance", failure_threshold=3, recovery_timeout=10, clock=clock)
+    
+    for i in range(5):
+        try:
+            breaker.before_call()
+            breaker.record_error(Timeout("Simulated timeout"))
+            print(f"Call {i+1}: timed out")
+        except CircuitOpenError as e:
+            print(f"Call {i+1}: failed fast ({e})")
+    
+    clock.advance(10)
+    breaker.before_call()
+    breaker.record_success()
+    print(f"After a successful probe: {breaker.snapshot()}")
@@ -0,0 +1,98 @@
+# File: clock.py
+# Purpose: Injectable clock so rate limiting and retry policies can run on virtual time
+
+import time
+import asyncio
+import threading
+
+class SystemClock:
+    """Clock backed by the real wall clock and time.sleep"""
+    def time(self):
+        """
+        Return the current time
+        
+        Returns:
+            float: Seconds since the epoch
+        """
+        return time.time()
+    
+    def sleep(self, seconds):
+        """
+        Block for the given number of seconds
+        
+        Args:
+            seconds (float): Time to sleep
+        """
+        time.sleep(seconds)
+    
+    async def async_sleep(self, seconds):
+        """
+        Suspend the calling coroutine without blocking the event loop
+        
+        Args:
+            seconds (float): Time to sleep
+        """
+        await asyncio.sleep(seconds)
+
+class VirtualClock:
+    """
+    Clock whose time only moves when sleep() or advance() is called
+    
+    Sleeping returns immediately, so code that waits for rate limits or
+    backs off between retries runs in microseconds while still observing
+    the delays it asked for.
+    """
+    def __init__(self, start=0.0):
+        """
+        Initialize the virtual clock
+        
+        Args:
+            start (float): Initial time in seconds
+        """
+        self.now = start
+        self.slept = 0.0  # Total virtual time spent in sleep()
+        self.lock = threading.Lock()
+    
+    def time(self):
+        """
+        Return the current virtual time
+        
+        Returns:
+            float: Virtual seconds
+        """
+        return self.now
+    
+    def sleep(self, seconds):
+        """
+        Advance virtual time instead of blocking
+        
+        Args:
+            seconds (float): Time to sleep
+        """
+        if seconds > 0:
+            with self.lock:
+                self.now += seconds
+                self.slept += seconds
+    
+    async def async_sleep(self, seconds):
+        """
+        Advance virtual time and yield to the event loop once
+        
+        Args:
+            seconds (float): Time to sleep
+        """
+        self.sleep(seconds)
+        await asyncio.sleep(0)
+    
+    def advance(self, seconds):
+        """
+        Move virtual time forward, e.g. to model work between calls
+        
+        Args:
+            seconds (float): Time to advance
+        """
+        with self.lock:
+            self.now += seconds
+
+# Clock used when none is injected
+SYSTEM_CLOCK = SystemClock()
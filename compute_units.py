@@ -0,0 +1,75 @@
+# File: compute_units.py
+# Purpose: Alchemy compute unit costs for weighted rate limiting
+
+from rate_limiter import RateLimiter
+
+# Compute units charged per method (see Alchemy's compute unit pricing docs)
+COMPUTE_UNIT_COSTS = {
+    # Standard JSON-RPC methods
+    "net_version": 0,
+    "eth_chainId": 0,
+    "eth_blockNumber": 10,
+    "eth_getBalance": 19,
+    "eth_getCode": 19,
+    "eth_gasPrice": 19,
+    "eth_getStorageAt": 17,
+    "eth_getTransactionByHash": 17,
+    "eth_getTransactionReceipt": 15,
+    "eth_getBlockByNumber": 16,
+    "eth_getBlockByHash": 21,
+    "eth_getTransactionCount": 26,
+    "eth_call": 26,
+    "eth_getLogs": 75,
+    "eth_estimateGas": 87,
+    "eth_sendRawTransaction": 250,
+    # Enhanced APIs
+    "alchemy_getTokenMetadata": 10,
+    "alchemy_getTokenBalances": 19,
+    "alchemy_getAssetTransfers": 150,
+    # NFT API
+    "getNFTs": 100,
+    "getNFTMetadata": 100,
+    "getContractMetadata": 100,
+    "getNFTsForCollection": 100,
+    "getOwnersForToken": 100,
+}
+
+# Cost assumed for methods missing from the table
+DEFAULT_COMPUTE_UNITS = 26
+
+def compute_unit_limiter(compute_units_per_second, engine="gcra", costs=None):
+    """
+    Build a RateLimiter that budgets compute units per second
+    
+    Args:
+        compute_units_per_second (int): Plan throughput in CU/s
+        engine (str or object): Rate limiter engine
+        costs (dict): Optional overrides merged into COMPUTE_UNIT_COSTS
+        
+    Returns:
+        RateLimiter: Limiter whose cost_of() charges compute units
+    """
+    table = dict(COMPUTE_UNIT_COSTS)
+    if costs:
+        table.update(costs)
+    return RateLimiter(
+        max_calls=compute_units_per_second,
+        time_frame=1,
+        engine=engine,
+        costs=table,
+        default_cost=DEFAULT_COMPUTE_UNITS
+    )
+
+# Example usage
+if __name__ == "__main__":
+    limiter = compute_unit_limiter(330)
+    batch = [
+        {"jsonrpc": "2.0", "id": i, "method": "eth_getBalance", "params": ["0x0", "latest"]}
+        for i in range(10)
+    ]
+    print(f"eth_getBalance costs {limiter.cost_of('eth_getBalance')} CU")
+    print(f"getNFTs costs {limiter.cost_of('getNFTs')} CU")
+    print(f"A batch of 10 balance lookups costs {limiter.cost_of(batch)} CU")
+    for i in range(4):
+        waited = limiter.wait_for(batch)
+        print(f"Batch {i+1}: waited {waited:.2f} seconds")
@@ -0,0 +1,144 @@
+# File: config.py
+# Purpose: Lazily built client configuration so importing the toolkit does no work
+
+import os
+import logging
+import threading
+from decimal import Decimal, localcontext
+
+# Default Alchemy network
+DEFAULT_NETWORK = "eth-mainnet"
+
+# Wei in one ether
+WEI_PER_ETHER = Decimal(10 ** 18)
+
+class MissingAPIKeyError(RuntimeError):
+    """Raised when a request needs an API key and none is configured"""
+
+class AlchemyConfig:
+    """
+    API key, network and endpoints shared by the toolkit's request functions
+    
+    Creating one reads and connects nothing; per-network connection pools
+    and Web3 instances live in network_registry and are built on first use.
+    """
+    def __init__(self, api_key=None, network=DEFAULT_NETWORK, api_keys=None):
+        """
+        Initialize the configuration
+        
+        Args:
+            api_key (str): Alchemy API key (default: the first of api_keys)
+            network (str): Alchemy network, e.g. "eth-mainnet"
+            api_keys (list): All keys to spread requests across (see key_pool)
+        """
+        self.api_keys = list(api_keys or ([api_key] if api_key else []))
+        self.api_key = api_key or (self.api_keys[0] if self.api_keys else None)
+        self.network = network
+    
+    @classmethod
+    def from_env(cls):
+        """
+        Build a configuration from the environment and the .env file
+        
+        Returns:
+            AlchemyConfig: Configuration using ALCHEMY_API_KEY, ALCHEMY_API_KEYS
+                (comma-separated) and ALCHEMY_NETWORK
+        """
+        from dotenv import load_dotenv
+        load_dotenv()
+        api_key = os.getenv("ALCHEMY_API_KEY")
+        api_keys = [key.strip() for key in os.getenv("ALCHEMY_API_KEYS", "").split(",") if key.strip()]
+        if api_key and api_key not in api_keys:
+            api_keys.insert(0, api_key)
+        return cls(api_key=api_key, network=os.getenv("ALCHEMY_NETWORK", DEFAULT_NETWORK), api_keys=api_keys)
+    
+    def require_api_key(self):
+        """
+        Return the API key
+        
+        Raises:
+            MissingAPIKeyError: If no key is configured
+        """
+        if not self.api_key:
+            raise MissingAPIKeyError(
+                "ALCHEMY_API_KEY (or ALCHEMY_API_KEYS) environment variable not found! "
+                "Please ensure it exists in your .env file."
+            )
+        return self.api_key
+    
+    @property
+    def rpc_url(self):
+        """str: JSON-RPC endpoint"""
+        return f"https://{self.network}.g.alchemy.com/v2/{self.require_api_key()}"
+    
+    @property
+    def nft_url(self):
+        """str: NFT API base URL"""
+        return f"https://{self.network}.g.alchemy.com/nft/v2/{self.require_api_key()}"
+    
+_config = None
+_config_lock = threading.Lock()
+
+def get_config():
+    """
+    Return the shared configuration, reading the environment on first use
+    
+    Returns:
+        AlchemyConfig: The configuration used by the toolkit's request functions
+    """
+    global _config
+    with _config_lock:
+        if _config is None:
+            _config = AlchemyConfig.from_env()
+        return _config
+
+def set_config(config):
+    """
+    Replace the shared configuration
+    
+    Args:
+        config (AlchemyConfig): New configuration (None to re-read the environment on next use)
+    """
+    global _config
+    with _config_lock:
+        _config = config
+
+def wei_to_ether(wei):
+    """
+    Convert a wei amount to ether without importing web3
+    
+    Args:
+        wei (int): Amount in wei
+    
+    Returns:
+        Decimal: Amount in ether (exact, as Web3.from_wei)
+    """
+    with localcontext() as context:
+        context.prec = 999
+        return Decimal(wei) / WEI_PER_ETHER
+
+def setup_logging(log_file="alchemy_api.log", level=logging.INFO):
+    """
+    Log to the console and a file, as the toolkit's scripts do when run directly
+    
+    Library code never calls this; applications configure logging themselves.
+    
+    Args:
+        log_file (str): Log file path (None for console only)
+        level (int): Root log level
+    """
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.insert(0, logging.FileHandler(log_file))
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=handlers
+    )
+
+# Example usage
+if __name__ == "__main__":
+    config = get_config()
+    print(f"Network: {config.network}")
+    print(f"API key configured: {bool(config.api_key)}")
+    print(f"1 ether in wei converts back to: {wei_to_ether(10 ** 18)}")
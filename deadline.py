@@ -0,0 +1,163 @@
+# File: deadline.py
+# Purpose: Propagate an overall deadline through retry loops and HTTP timeouts
+
+import contextvars
+from contextlib import contextmanager
+
+from clock import SYSTEM_CLOCK
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when an operation cannot finish before its deadline; never retried"""
+
+class Deadline:
+    """Point in time by which an operation, including all its retries, must finish"""
+    def __init__(self, seconds, clock=None):
+        """
+        Initialize the deadline
+        
+        Args:
+            seconds (float): Time allowed from now
+            clock (object): Clock providing time() (default: the system clock)
+        """
+        self.clock = clock or SYSTEM_CLOCK
+        self.expires_at = self.clock.time() + seconds
+    
+    def remaining(self):
+        """
+        Return the time left
+        
+        Returns:
+            float: Seconds until the deadline (0 once it has passed)
+        """
+        return max(0, self.expires_at - self.clock.time())
+    
+    def expired(self):
+        """Return True once the deadline has passed"""
+        return self.remaining() <= 0
+    
+    def allows(self, seconds):
+        """
+        Check whether there is time to wait and still make another attempt
+        
+        Args:
+            seconds (float): Planned wait (e.g. a retry backoff)
+            
+        Returns:
+            bool: True if time remains after waiting
+        """
+        return self.remaining() > seconds
+    
+    def check(self, operation="operation"):
+        """
+        Raise if the deadline has passed
+        
+        Args:
+            operation (str): Description used in the error message
+            
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        if self.expired():
+            raise DeadlineExceeded(f"Deadline exceeded before {operation}")
+    
+    def timeout(self, default=None):
+        """
+        Return a per-attempt timeout shrunk to the time left
+        
+        Args:
+            default (float): The attempt's usual timeout (None for no limit)
+            
+        Returns:
+            float: min(default, time remaining)
+            
+        Raises:
+            DeadlineExceeded: If no time is left
+        """
+        self.check("sending request")
+        remaining = self.remaining()
+        return remaining if default is None else min(default, remaining)
+    
+    def __repr__(self):
+        return f"Deadline(remaining={self.remaining():.3f}s)"
+
+_current_deadline = contextvars.ContextVar("alchemy_deadline", default=None)
+
+def current_deadline():
+    """Return the deadline set by the innermost deadline_scope, or None"""
+    return _current_deadline.get()
+
+def resolve_deadline(deadline=None, clock=None):
+    """
+    Combine an explicit deadline with the context-scoped one
+    
+    Args:
+        deadline (Deadline or float): Explicit deadline, or seconds from now
+        clock (object): Clock for a deadline given in seconds
+        
+    Returns:
+        Deadline: Whichever expires first, or None if neither is set
+    """
+    if deadline is not None and not isinstance(deadline, Deadline):
+        deadline = Deadline(deadline, clock)
+    scoped = _current_deadline.get()
+    if deadline is None:
+        return scoped
+    if scoped is None or deadline.expires_at < scoped.expires_at:
+        return deadline
+    return scoped
+
+@contextmanager
+def deadline_scope(deadline, clock=None):
+    """
+    Context manager that applies a deadline to every toolkit call inside it
+    
+    Nested scopes can only tighten the deadline. Scopes follow contextvars,
+    so they carry into asyncio tasks started inside them.
+    
+    Args:
+        deadline (Deadline or float): Deadline, or seconds from now
+        clock (object): Clock for a deadline given in seconds
+        
+    Yields:
+        Deadline: The effective deadline
+    """
+    effective = resolve_deadline(deadline, clock)
+    token = _current_deadline.set(effective)
+    try:
+        yield effective
+    finally:
+        _current_deadline.reset(token)
+
+def request_timeout(default, deadline=None):
+    """
+    Return the HTTP timeout for one attempt
+    
+    Args:
+        default (float): The call's usual timeout
+        deadline (Deadline or float): Explicit deadline (the scoped one also applies)
+        
+    Returns:
+        float: The default timeout, shrunk to the time left before the deadline
+        
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    deadline = resolve_deadline(deadline)
+    if deadline is None:
+        return default
+    return deadline.timeout(default)
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    
+    clock = VirtualClock()
+    with deadline_scope(12, clock=clock) as deadline:
+        for attempt in range(1, 5):
+            print(f"Attempt {attempt}: timeout {request_timeout(10):.1f}s")
+            clock.advance(request_timeout(10))  # Simulate the attempt timing out
+            backoff = 2 ** attempt
+            if not deadline.allows(backoff):
+                print(f"Not retrying: {backoff}s backoff would miss the deadline ({deadline})")
+                break
+            clock.sleep(backoff)
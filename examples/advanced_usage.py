@@ -7,6 +7,7 @@ import sys
 import logging
 import asyncio
 import time
+import functools
 from dotenv import load_dotenv
 
 # Add parent directory to path to import modules
@@ -16,7 +17,7 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from validate_api_key import is_valid_alchemy_key
 from alchemy_api_debug import handle_alchemy_error, batch_get_eth_balances
 from retry_with_backoff import retry_with_backoff
-from rate_limiter import RateLimiter
+from async_rate_limiter import AsyncRateLimiter
 from fetch_nft_examples import get_nfts_for_owner, get_nft_transfers, resolve_ipfs_uri
 from test_network_connection import test_alchemy_connection
 
@@ -36,18 +37,24 @@ load_dotenv()
 ALCHEMY_API_KEY = os.getenv("ALCHEMY_API_KEY")
 
 # Create a rate limiter (300 calls per minute)
-rate_limiter = RateLimiter(max_calls=300, time_frame=60)
+rate_limiter = AsyncRateLimiter(max_calls=300, time_frame=60)
 
-# Create a custom retry function with our rate limiter
+# Create a custom retry function
 @retry_with_backoff(max_retries=5, base_delay=2)
-def rate_limited_api_call(func, *args, **kwargs):
-    """Make an API call with rate limiting and retry logic"""
-    # Wait if we're exceeding rate limits
-    rate_limiter.wait_if_needed()
-    
-    # Make the actual API call
+def call_with_retry(func, *args, **kwargs):
+    """Make an API call with retry logic"""
     return func(*args, **kwargs)
 
+async def rate_limited_api_call(func, *args, **kwargs):
+    """Make an API call with rate limiting and retry logic"""
+    # Wait if we're exceeding rate limits, without blocking the event loop
+    async with rate_limiter:
+        # Run the blocking call in a worker thread
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, functools.partial(call_with_retry, func, *args, **kwargs)
+        )
+
 async def main():
     """Main function demonstrating advanced toolkit usage"""
     
@@ -86,7 +93,7 @@ async def main():
         logger.info(f"Getting NFT transfers for {address}...")
         
         # Use our rate-limited function
-        transfers = rate_limited_api_call(
+        transfers = await rate_limited_api_call(
             get_nft_transfers,
             address,
             page_size=10,
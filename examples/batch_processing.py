@@ -7,7 +7,7 @@ import sys
 import logging
 import asyncio
 import time
-import concurrent.futures
+import functools
 from dotenv import load_dotenv
 
 # Add parent directory to path to import modules
@@ -15,10 +15,9 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import toolkit modules
 from validate_api_key import is_valid_alchemy_key
-from alchemy_api_debug import handle_alchemy_error, batch_get_eth_balances
-from retry_with_backoff import retry_with_backoff
-from rate_limiter import RateLimiter
-from fetch_nft_examples import get_nfts_for_owner, get_nft_metadata
+from alchemy_api_debug import batch_get_eth_balances
+from async_rate_limiter import AsyncRateLimiter
+from fetch_nft_examples import get_nfts_for_owner
 
 # Set up logging
 logging.basicConfig(
@@ -36,7 +35,7 @@ load_dotenv()
 ALCHEMY_API_KEY = os.getenv("ALCHEMY_API_KEY")
 
 # Create a rate limiter (300 calls per minute)
-rate_limiter = RateLimiter(max_calls=300, time_frame=60)
+rate_limiter = AsyncRateLimiter(max_calls=300, time_frame=60)
 
 # List of addresses to process
 ADDRESSES = [
@@ -50,11 +49,13 @@ ADDRESSES = [
 async def process_nfts_for_address(address, batch_id):
     """Process NFTs for a single address with rate limiting"""
     try:
-        # Wait if needed to respect rate limits
-        rate_limiter.wait_if_needed()
-        
-        # Get NFTs for this address
-        nfts = get_nfts_for_owner(address, page_size=10, max_pages=1)
+        # Wait if needed to respect rate limits, without blocking the event loop
+        async with rate_limiter:
+            # Run the blocking request in a worker thread so tasks overlap
+            loop = asyncio.get_running_loop()
+            nfts = await loop.run_in_executor(
+                None, functools.partial(get_nfts_for_owner, address, page_size=10, max_pages=1)
+            )
         
         # Process the NFTs (in a real scenario, you might store them in a database)
         nft_count = len(nfts.get('nfts', []))
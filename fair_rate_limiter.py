@@ -0,0 +1,173 @@
+# File: fair_rate_limiter.py
+# Purpose: Share one rate limit between priority lanes with weighted fair queuing
+
+import heapq
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+
+from rate_limiter import RateLimiter
+
+# Lane used by wait_if_needed() when none is passed explicitly
+_current_lane = contextvars.ContextVar("rate_limit_lane", default=None)
+
+@contextmanager
+def use_lane(lane):
+    """
+    Run the enclosed calls in a priority lane
+    
+    Toolkit functions throttle through the default limiter without a lane
+    argument, so the lane is picked up from this context instead.
+    
+    Args:
+        lane (str): Lane name, e.g. "interactive" or "bulk"
+    """
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+class FairRateLimiter(RateLimiter):
+    """
+    RateLimiter that shares its budget between weighted lanes
+    
+    Waiting calls are ordered by weighted fair queuing: each call gets a
+    virtual finish tag of max(virtual time, lane's last tag) + cost / weight
+    and the smallest tag is admitted next. A lane with weight 10 therefore
+    gets ten times the share of a weight-1 lane while both are backlogged,
+    and an idle lane's first call goes straight to the front of the queue.
+    The call at the head books its slot through the engine once it is due
+    and all waiting uses the limiter's clock, so a VirtualClock drives it
+    deterministically.
+    
+    Usage:
+        limiter = FairRateLimiter(300, 60, lanes={"interactive": 10, "bulk": 1})
+        with use_lane("interactive"):
+            limiter.wait_if_needed()
+    """
+    def __init__(self, max_calls, time_frame, lanes=None, default_lane="default", **kwargs):
+        """
+        Initialize the fair rate limiter
+        
+        Args:
+            max_calls (int): Maximum number of calls (or cost units) allowed within the time frame
+            time_frame (float): Time frame in seconds
+            lanes (dict): Mapping of lane name to weight (unknown lanes get weight 1)
+            default_lane (str): Lane used when none is given or set with use_lane()
+            **kwargs: Extra RateLimiter arguments (engine, costs, default_cost, clock)
+        """
+        super().__init__(max_calls, time_frame, **kwargs)
+        self.lanes = dict(lanes or {})
+        self.default_lane = default_lane
+        self.condition = threading.Condition(self.lock)
+        self.virtual_time = 0  # Finish tag of the last admitted call
+        self.last_finish = {}  # Lane name -> finish tag of its last queued call
+        self.waiting = []  # Heap of (finish tag, sequence) for queued calls
+        self.sequence = itertools.count()
+    
+    def can_call(self, cost=1):
+        """
+        Check if an API call can be made without jumping the queue
+        
+        Args:
+            cost (int): Number of units the call consumes
+        
+        Returns:
+            bool: True if a call can be made, False otherwise
+        """
+        self._check_cost(cost)
+        with self.lock:
+            now = self.clock.time()
+            if self.waiting or now < self.paused_until:
+                return False
+            return self.engine.try_acquire(now, cost)
+    
+    def wait_if_needed(self, cost=1, lane=None):
+        """
+        Wait for this call's turn in its lane, then register it
+        
+        Args:
+            cost (int): Number of units the call consumes
+            lane (str): Lane name (default: the use_lane() context, then default_lane)
+        
+        Returns:
+            float: The time waited in seconds
+        """
+        self._check_cost(cost)
+        lane = lane or _current_lane.get() or self.default_lane
+        weight = self.lanes.get(lane, 1)
+        start = self.clock.time()
+        
+        with self.condition:
+            tag = max(self.virtual_time, self.last_finish.get(lane, 0)) + cost / weight
+            self.last_finish[lane] = tag
+            entry = (tag, next(self.sequence))
+            heapq.heappush(self.waiting, entry)
+        
+        try:
+            while True:
+                with self.condition:
+                    while self.waiting[0] is not entry:
+                        self.condition.wait()
+                    
+                    now = self.clock.time()
+                    if now < self.paused_until:
+                        wait_time = self.paused_until - now
+                    else:
+                        wait_time = self.engine.wait_time(now, cost)
+                        if wait_time <= 0:
+                            # Book the slot only once it is due, so a call from a
+                            # heavier lane arriving meanwhile can still go first
+                            wait_time = self.engine.reserve(now, cost)
+                            heapq.heappop(self.waiting)
+                            self.virtual_time = tag
+                            # Let the next call in line compute its own wait
+                            self.condition.notify_all()
+                            break
+                
+                # Sleep outside the lock; a call with a smaller tag may take the head meanwhile
+                self.clock.sleep(wait_time)
+        except BaseException:
+            # An interrupted wait (e.g. KeyboardInterrupt) must not leave its entry blocking the queue
+            with self.condition:
+                if entry in self.waiting:
+                    self.waiting.remove(entry)
+                    heapq.heapify(self.waiting)
+                self.condition.notify_all()
+            raise
+        
+        if wait_time > 0:
+            self.clock.sleep(wait_time)
+        return self.clock.time() - start
+
+# Example usage
+if __name__ == "__main__":
+    limiter = FairRateLimiter(max_calls=20, time_frame=1, engine="gcra",
+                              lanes={"interactive": 10, "bulk": 1})
+    stop = threading.Event()
+    bulk_calls = [0]
+    
+    def bulk_worker():
+        # Bulk crawlers keep the limiter saturated
+        with use_lane("bulk"):
+            while not stop.is_set():
+                limiter.wait_if_needed()
+                bulk_calls[0] += 1
+    
+    workers = [threading.Thread(target=bulk_worker) for _ in range(20)]
+    for t in workers:
+        t.start()
+    
+    limiter.clock.sleep(1)
+    with use_lane("interactive"):
+        for i in range(5):
+            waited = limiter.wait_if_needed()
+            print(f"Interactive call {i+1}: waited {waited:.3f} seconds")
+            limiter.clock.sleep(0.2)
+    
+    stop.set()
+    for t in workers:
+        t.join()
+    print(f"Bulk calls made meanwhile: {bulk_calls[0]}")
@@ -1,33 +1,37 @@
 # File: fetch_nft_examples.py
 # Purpose: Consolidate NFT functionality into a single comprehensive file
 
-import os
 import time
 import logging
 import requests
-from dotenv import load_dotenv
+from config import get_config, setup_logging, MissingAPIKeyError
+from rate_limiter import throttle, report_result
+from retry_budget import default_retry_budget
+from retry_policy import RetryPolicy
+from hedging import get_default_hedger
+from circuit_breaker import get_breaker, CircuitOpenError
+from deadline import DeadlineExceeded, resolve_deadline, request_timeout
+from singleflight import default_singleflight, request_key
+from transport import http_get
+from network_registry import get_client, fan_out
+from response_cache import get_default_cache
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("alchemy_api.log"),
-        logging.StreamHandler()
-    ]
-)
+# Logging is configured by the application (or by the __main__ block when run directly)
 logger = logging.getLogger("alchemy_api")
 
-# Load environment variables
-load_dotenv()
-ALCHEMY_API_KEY = os.getenv('ALCHEMY_API_KEY')
+def __getattr__(name):
+    """Resolve the legacy ALCHEMY_API_KEY global from the shared configuration on first access"""
+    if name == "ALCHEMY_API_KEY":
+        return get_config().api_key
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# Validate API key exists
-if not ALCHEMY_API_KEY:
-    logger.error("[ERROR] ALCHEMY_API_KEY environment variable not found! Please ensure it exists in your .env file.")
-    exit(1)
+def _throttled_get(client, method, url, params, timeout):
+    """Wait for the rate limiter, then send a GET request over the network's pool"""
+    throttle(method)
+    return client.transport.get(url, params=params, timeout=timeout)
 
-def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spam=False):
+def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spam=False, timeout=30, deadline=None,
+                       network=None):
     """
     Get all NFTs owned by an address, handling pagination and errors
     
@@ -36,12 +40,48 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
         page_size (int): Number of NFTs to fetch per page
         max_pages (int): Maximum number of pages to fetch (None for all)
         include_spam (bool): Whether to include spam NFTs
+        timeout (float): Per-page request timeout, shrunk to fit the deadline
+        deadline (Deadline or float): Overall deadline in seconds for all pages
+            and retries (an enclosing deadline_scope also applies)
+        network (str): Alchemy network (default: the configured network)
+        
+    Concurrent calls with the same arguments share one upstream fetch and
+    receive the same result dict (treat it as read-only).
         
     Returns:
         dict: Result containing NFTs and status information
     """
+    deadline = resolve_deadline(deadline)
+    client = get_client(network)
+    key = request_key("getNFTs", {
+        "network": client.network,
+        "owner": owner_address,
+        "pageSize": page_size,
+        "maxPages": max_pages,
+        "includeSpam": include_spam
+    })
+    try:
+        with client.scope():
+            return default_singleflight.do(
+                key, _fetch_nfts_for_owner, client, owner_address, page_size, max_pages, include_spam, timeout,
+                deadline, wait_timeout=deadline.remaining() if deadline else None
+            )
+    except DeadlineExceeded as e:
+        logger.error(f"[ERROR] {e}")
+        return {
+            "success": False,
+            "error": "deadline_exceeded",
+            "message": str(e),
+            "nfts": [],
+            "total": 0,
+            "owner": owner_address,
+            "pages_fetched": 0
+        }
+
+def _fetch_nfts_for_owner(client, owner_address, page_size, max_pages, include_spam, timeout, deadline):
+    """Fetch all pages of an owner's NFTs (the upstream call behind get_nfts_for_owner)"""
     
-    url = f"https://eth-mainnet.g.alchemy.com/nft/v2/{ALCHEMY_API_KEY}/getNFTs"
+    url = f"{client.nft_url}/getNFTs"
     params = {
         "owner": owner_address,
         "pageSize": page_size,
@@ -52,7 +92,9 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
     all_nfts = []
     page_count = 0
     next_page_key = None
-    
+    rate_limit_retries = 0
+    policy = RetryPolicy(max_retries=5, base_delay=2, max_delay=30)
+    breaker = get_breaker(client.breaker_name("getNFTs"))
     try:
         while True:
             page_count += 1
@@ -64,8 +106,30 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
             logger.info(f"Fetching NFT page {page_count}" + (f" (pageKey: {next_page_key[:10]}...)" if next_page_key else ""))
             
             try:
-                response = requests.get(url, params=params, timeout=30)
+                # Fail fast while the endpoint's circuit is open
+                breaker.before_call()
+            except CircuitOpenError as e:
+                logger.error(f"[ERROR] {e}")
+                return {
+                    "success": False,
+                    "error": "circuit_open",
+                    "message": str(e),
+                    "retry_in": e.retry_in,
+                    "nfts": all_nfts,
+                    "total": len(all_nfts),
+                    "owner": owner_address,
+                    "pages_fetched": page_count - 1
+                }
+            
+            try:
+                # Wait for the default rate limiter, if one is set
+                throttle("getNFTs")
+                start_time = time.time()
+                response = client.transport.get(url, params=params, timeout=request_timeout(timeout, deadline))
                 response.raise_for_status()
+                report_result(latency=time.time() - start_time)
+                default_retry_budget.record_success()
+                breaker.record_success()
                 data = response.json()
                 
                 # Get NFTs from this page
@@ -88,7 +152,21 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
                 # Add small delay to avoid rate limits
                 time.sleep(0.5)
                 
+            except DeadlineExceeded as e:
+                breaker.record_error(e)
+                logger.error(f"[ERROR] Deadline exceeded, retrieved {len(all_nfts)} NFTs")
+                return {
+                    "success": False,
+                    "error": "deadline_exceeded",
+                    "message": str(e),
+                    "nfts": all_nfts,
+                    "total": len(all_nfts),
+                    "owner": owner_address,
+                    "pages_fetched": page_count - 1
+                }
+            
             except requests.exceptions.HTTPError as e:
+                breaker.record_error(e)
                 status_code = e.response.status_code
                 
                 if status_code == 400:
@@ -100,19 +178,37 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
                     break
                     
                 elif status_code == 429:
-                    logger.warning(f"[WARNING] Rate limit reached (429), waiting 2 seconds...")
-                    time.sleep(2)
+                    report_result(throttled=True)
+                    rate_limit_retries += 1
+                    if rate_limit_retries > policy.max_retries:
+                        logger.error(f"[ERROR] Rate limit reached (429), all {policy.max_retries} retries failed")
+                        break
+                    # Wait as long as the server asks, else back off exponentially
+                    wait_time = policy.delay_for(rate_limit_retries, e)
+                    if deadline and not deadline.allows(wait_time):
+                        logger.error(f"[ERROR] Rate limit reached (429), waiting would miss the deadline")
+                        break
+                    if not default_retry_budget.try_spend():
+                        logger.error(f"[ERROR] Rate limit reached (429) and retry budget exhausted")
+                        break
+                    logger.warning(f"[WARNING] Rate limit reached (429), waiting {wait_time:.2f} seconds...")
+                    time.sleep(wait_time)
                     continue
                     
                 else:
                     logger.error(f"[ERROR] HTTP error: {e}")
                     break
             
-            except requests.exceptions.Timeout:
+            except requests.exceptions.Timeout as e:
+                breaker.record_error(e)
+                if not default_retry_budget.try_spend():
+                    logger.error(f"[ERROR] Request timeout and retry budget exhausted")
+                    break
                 logger.warning(f"[WARNING] Request timeout, retrying...")
                 continue
                 
             except Exception as e:
+                breaker.record_error(e)
                 logger.error(f"[ERROR] Error retrieving NFTs: {e}")
                 break
         
@@ -136,7 +232,8 @@ def get_nfts_for_owner(owner_address, page_size=100, max_pages=None, include_spa
             "pages_fetched": page_count
         }
 
-def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
+def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1, hedge=False, timeout=10, deadline=None,
+                     network=None):
     """
     Get NFT metadata with error handling and retry mechanism
     
@@ -145,12 +242,60 @@ def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
         token_id (str): The NFT token ID
         retry_count (int): Number of retry attempts
         retry_delay (int): Initial delay between retries in seconds
+        hedge (bool): Send a duplicate request if the first one is unusually slow
+        timeout (float): Per-attempt request timeout, shrunk to fit the deadline
+        deadline (Deadline or float): Overall deadline in seconds, including
+            retries (an enclosing deadline_scope also applies)
+        network (str): Alchemy network (default: the configured network)
+        
+    Concurrent calls for the same NFT share one upstream fetch, and
+    successful results are served from the response cache for one block
+    time; callers receive the same result dict (treat it as read-only).
         
     Returns:
         dict: Result containing metadata and status information
     """
+    deadline = resolve_deadline(deadline)
+    client = get_client(network)
+    cache = get_default_cache()
+    cache_key = None
+    if cache:
+        cache_key = cache.make_key(client.network, "getNFTMetadata", {
+            "contractAddress": contract_address,
+            "tokenId": token_id
+        })
+        found, result = cache.lookup(cache_key)
+        if found:
+            return result
     
-    url = f"https://eth-mainnet.g.alchemy.com/nft/v2/{ALCHEMY_API_KEY}/getNFTMetadata"
+    key = request_key("getNFTMetadata", {
+        "network": client.network,
+        "contractAddress": contract_address,
+        "tokenId": token_id
+    })
+    try:
+        with client.scope():
+            result = default_singleflight.do(
+                key, _fetch_nft_metadata, client, contract_address, token_id, retry_count, retry_delay, hedge,
+                timeout, deadline, wait_timeout=deadline.remaining() if deadline else None
+            )
+        if cache_key and result["success"]:
+            cache.store(cache_key, result)
+        return result
+    except DeadlineExceeded as e:
+        logger.error(f"[ERROR] {e}")
+        return {
+            "success": False,
+            "error": "deadline_exceeded",
+            "message": str(e),
+            "contract_address": contract_address,
+            "token_id": token_id
+        }
+
+def _fetch_nft_metadata(client, contract_address, token_id, retry_count, retry_delay, hedge, timeout, deadline):
+    """Fetch one NFT's metadata with retries (the upstream call behind get_nft_metadata)"""
+    
+    url = f"{client.nft_url}/getNFTMetadata"
     params = {
         "contractAddress": contract_address,
         "tokenId": token_id,
@@ -159,13 +304,39 @@ def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
     
     attempts = 0
     last_error = None
+    policy = RetryPolicy(max_retries=retry_count, base_delay=retry_delay)
+    breaker = get_breaker(client.breaker_name("getNFTMetadata"))
     
     while attempts < retry_count:
+        try:
+            # Fail fast while the endpoint's circuit is open
+            breaker.before_call()
+        except CircuitOpenError as e:
+            logger.error(f"[ERROR] {e}")
+            return {
+                "success": False,
+                "error": "circuit_open",
+                "message": str(e),
+                "retry_in": e.retry_in,
+                "contract_address": contract_address,
+                "token_id": token_id
+            }
+        
         try:
             logger.info(f"Fetching NFT metadata: {contract_address}/{token_id} (attempt {attempts+1}/{retry_count})")
             
-            response = requests.get(url, params=params, timeout=10)
+            start_time = time.time()
+            if hedge:
+                # Each attempt (primary or hedge) is charged to the rate limiter
+                response = get_default_hedger().call("getNFTMetadata", _throttled_get, client, "getNFTMetadata", url,
+                                                     params, request_timeout(timeout, deadline))
+            else:
+                throttle("getNFTMetadata")
+                response = client.transport.get(url, params=params, timeout=request_timeout(timeout, deadline))
             response.raise_for_status()
+            report_result(latency=time.time() - start_time)
+            default_retry_budget.record_success()
+            breaker.record_success()
             
             metadata = response.json()
             logger.info(f"[SUCCESS] Successfully retrieved metadata for NFT {contract_address}/{token_id}")
@@ -181,7 +352,13 @@ def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
                 "token_id": token_id
             }
             
+        except DeadlineExceeded as e:
+            breaker.record_error(e)
+            last_error = e
+            break
+            
         except requests.exceptions.HTTPError as e:
+            breaker.record_error(e)
             status_code = e.response.status_code
             
             if status_code == 400:
@@ -211,13 +388,20 @@ def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
                 }
                 
             elif status_code == 429:
+                report_result(throttled=True)
                 logger.warning(f"[WARNING] NFT API rate limit reached (429): {e}")
                 attempts += 1
                 last_error = e
                 
                 if attempts < retry_count:
-                    wait_time = retry_delay * (2 ** (attempts - 1))  # Exponential backoff
-                    logger.info(f"Waiting {wait_time} seconds before retry...")
+                    # Server's Retry-After hint if any, else exponential backoff
+                    wait_time = policy.delay_for(attempts, e)
+                    if deadline and not deadline.allows(wait_time):
+                        last_error = DeadlineExceeded(f"Backoff would miss the deadline: {e}")
+                        break
+                    if not default_retry_budget.try_spend():
+                        break
+                    logger.info(f"Waiting {wait_time:.2f} seconds before retry...")
                     time.sleep(wait_time)
                     continue
                     
@@ -236,32 +420,70 @@ def get_nft_metadata(contract_address, token_id, retry_count=3, retry_delay=1):
                 
                 if attempts < retry_count:
                     wait_time = retry_delay * (2 ** (attempts - 1))
+                    if deadline and not deadline.allows(wait_time):
+                        last_error = DeadlineExceeded(f"Backoff would miss the deadline: {e}")
+                        break
+                    if not default_retry_budget.try_spend():
+                        break
                     logger.info(f"Waiting {wait_time} seconds before retry...")
                     time.sleep(wait_time)
                     continue
         
-        except requests.exceptions.Timeout:
+        except requests.exceptions.Timeout as e:
+            breaker.record_error(e)
             logger.warning(f"[WARNING] Request timeout")
             attempts += 1
             last_error = "Timeout"
             
             if attempts < retry_count:
                 wait_time = retry_delay * (2 ** (attempts - 1))
+                if deadline and not deadline.allows(wait_time):
+                    last_error = DeadlineExceeded(f"Backoff would miss the deadline: {last_error}")
+                    break
+                if not default_retry_budget.try_spend():
+                    break
                 logger.info(f"Waiting {wait_time} seconds before retry...")
                 time.sleep(wait_time)
                 continue
                 
         except Exception as e:
+            breaker.record_error(e)
             logger.error(f"[ERROR] Error retrieving NFT metadata: {e}")
             attempts += 1
             last_error = e
             
             if attempts < retry_count:
                 wait_time = retry_delay * (2 ** (attempts - 1))
+                if deadline and not deadline.allows(wait_time):
+                    last_error = DeadlineExceeded(f"Backoff would miss the deadline: {last_error}")
+                    break
+                if not default_retry_budget.try_spend():
+                    break
                 logger.info(f"Waiting {wait_time} seconds before retry...")
                 time.sleep(wait_time)
                 continue
     
+    if isinstance(last_error, DeadlineExceeded):
+        logger.error(f"[ERROR] Deadline exceeded, giving up on NFT metadata after {attempts} attempts")
+        return {
+            "success": False,
+            "error": "deadline_exceeded",
+            "message": str(last_error),
+            "contract_address": contract_address,
+            "token_id": token_id
+        }
+    
+    # Leaving the loop early means the shared retry budget refused a retry
+    if attempts < retry_count:
+        logger.error(f"[ERROR] Retry budget exhausted, giving up on NFT metadata after {attempts} attempts")
+        return {
+            "success": False,
+            "error": "retry_budget_exhausted",
+            "message": f"Retry budget exhausted: {last_error}",
+            "contract_address": contract_address,
+            "token_id": token_id
+        }
+    
     # If all retries failed
     logger.error(f"[ERROR] Failed to get NFT metadata after {retry_count} attempts")
     return {
@@ -299,7 +521,7 @@ def resolve_ipfs_uri(ipfs_uri, timeout=15):
         logger.info(f"Resolving IPFS URI: {ipfs_uri} -> {http_uri}")
         
         # Get metadata with timeout
-        response = requests.get(http_uri, timeout=timeout)
+        response = http_get(http_uri, timeout=timeout)
         response.raise_for_status()
         
         if "content-type" in response.headers and "application/json" in response.headers["content-type"]:
@@ -317,7 +539,7 @@ def resolve_ipfs_uri(ipfs_uri, timeout=15):
             alt_gateway = ipfs_uri.replace("ipfs://", "https://cloudflare-ipfs.com/ipfs/")
             logger.info(f"Trying alternate gateway: {alt_gateway}")
             
-            alt_response = requests.get(alt_gateway, timeout=timeout)
+            alt_response = http_get(alt_gateway, timeout=timeout)
             alt_response.raise_for_status()
             
             if "content-type" in alt_response.headers and "application/json" in alt_response.headers["content-type"]:
@@ -335,7 +557,7 @@ def resolve_ipfs_uri(ipfs_uri, timeout=15):
         logger.error(f"[ERROR] Failed to resolve IPFS URI: {e}")
         return None
 
-def get_nft_transfers(owner_address, page_size=100, max_pages=1):
+def get_nft_transfers(owner_address, page_size=100, max_pages=1, timeout=30, deadline=None, network=None):
     """
     Get NFT transfer history for an address using alchemy_getAssetTransfers endpoint
     
@@ -343,16 +565,27 @@ def get_nft_transfers(owner_address, page_size=100, max_pages=1):
         owner_address (str): The Ethereum address to query
         page_size (int): Number of transfers to fetch per page
         max_pages (int): Maximum number of pages to fetch
+        timeout (float): Per-page request timeout, shrunk to fit the deadline
+        deadline (Deadline or float): Overall deadline in seconds for all pages
+            (an enclosing deadline_scope also applies)
+        network (str): Alchemy network (default: the configured network)
         
     Returns:
         dict: Result containing transfers and status information
     """
+    client = get_client(network)
+    with client.scope():
+        return _fetch_nft_transfers(client, owner_address, page_size, max_pages, timeout, deadline)
+
+def _fetch_nft_transfers(client, owner_address, page_size, max_pages, timeout, deadline):
+    """Fetch pages of an owner's NFT transfers (the upstream calls behind get_nft_transfers)"""
     
-    url = f"https://eth-mainnet.g.alchemy.com/v2/{ALCHEMY_API_KEY}"
+    url = client.rpc_url
     
     all_transfers = []
     page_count = 0
     page_key = None
+    deadline = resolve_deadline(deadline)
     
     try:
         while page_count < max_pages:
@@ -383,8 +616,14 @@ def get_nft_transfers(owner_address, page_size=100, max_pages=1):
                 payload["params"][0]["pageKey"] = page_key
             
             # Make the request
-            response = requests.post(url, json=payload, timeout=30)
+            throttle(payload)
+            start_time = time.time()
+            response = client.transport.post(url, json=payload, timeout=request_timeout(timeout, deadline))
+            if response.status_code == 429:
+                report_result(throttled=True)
             response.raise_for_status()
+            report_result(latency=time.time() - start_time)
+            default_retry_budget.record_success()
             
             result = response.json()
             
@@ -441,6 +680,39 @@ def get_nft_transfers(owner_address, page_size=100, max_pages=1):
             "pages_fetched": page_count
         }
 
+def get_nfts_across_networks(owner_address, networks=None, **kwargs):
+    """
+    Get an owner's NFTs on several networks concurrently and merge them
+    
+    Args:
+        owner_address (str): The address to query
+        networks (list): Networks to query (default: network_registry.DEFAULT_NETWORKS)
+        **kwargs: Passed to get_nfts_for_owner (page_size, max_pages, include_spam, timeout, deadline)
+        
+    Returns:
+        dict: Result containing all NFTs (each tagged with its "network"),
+            per-network totals and per-network errors
+    """
+    outcome = fan_out(get_nfts_for_owner, owner_address, networks=networks, **kwargs)
+    errors = dict(outcome["errors"])
+    all_nfts = []
+    totals = {}
+    for network, result in outcome["results"].items():
+        if not result["success"]:
+            errors[network] = result.get("message") or result.get("error")
+        # Copy each NFT: results may be shared with concurrent callers
+        all_nfts.extend(dict(nft, network=network) for nft in result["nfts"])
+        totals[network] = result["total"]
+    
+    return {
+        "success": not errors,
+        "nfts": all_nfts,
+        "total": len(all_nfts),
+        "owner": owner_address,
+        "by_network": totals,
+        "errors": errors
+    }
+
 # Example usage
 def nft_demo():
     """Demo of NFT API usage with error handling"""
@@ -516,4 +788,10 @@ def nft_demo():
         logger.error(f"Demo failed with error: {str(e)}")
 
 if __name__ == "__main__":
+    setup_logging()
+    try:
+        get_config().require_api_key()
+    except MissingAPIKeyError as e:
+        logger.error(f"[ERROR] {e}")
+        exit(1)
     nft_demo()
@@ -0,0 +1,174 @@
+# File: hedging.py
+# Purpose: Hedge slow idempotent reads with a duplicate request to cut tail latency
+
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Read-only methods that are safe to send twice
+IDEMPOTENT_METHODS = {
+    "eth_blockNumber",
+    "eth_chainId",
+    "eth_getBalance",
+    "eth_getCode",
+    "eth_getStorageAt",
+    "eth_getTransactionCount",
+    "eth_getTransactionByHash",
+    "eth_getTransactionReceipt",
+    "eth_getBlockByNumber",
+    "eth_getBlockByHash",
+    "eth_getLogs",
+    "eth_call",
+    "alchemy_getTokenBalances",
+    "alchemy_getTokenMetadata",
+    "alchemy_getAssetTransfers",
+    "getNFTs",
+    "getNFTMetadata",
+    "getContractMetadata",
+}
+
+class HedgedExecutor:
+    """
+    Send a duplicate ("hedge") request when the first one is unusually slow
+    
+    The hedge delay is a percentile of recently observed latencies, so only
+    the slowest few percent of calls are duplicated. A token budget caps
+    hedges at `budget_ratio` of calls. The first successful answer wins;
+    the other request is cancelled if it has not started, otherwise its
+    result is discarded.
+    """
+    def __init__(self, percentile=0.95, min_delay=0.05, max_delay=2.0, budget_ratio=0.05,
+                 window=200, max_workers=32):
+        """
+        Initialize the hedged executor
+        
+        Args:
+            percentile (float): Latency percentile after which a hedge is sent
+            min_delay (float): Lower bound for the hedge delay in seconds
+            max_delay (float): Upper bound (and initial value) for the hedge delay
+            budget_ratio (float): Maximum hedges per call (0.05 = 5% extra load)
+            window (int): Number of recent latencies used for the percentile
+            max_workers (int): Threads available for primary and hedge requests
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.budget_ratio = budget_ratio
+        self.latencies = deque(maxlen=window)
+        self.delay = max_delay  # Current hedge delay, refreshed as latencies arrive
+        self.tokens = 1.0  # Hedge budget, refilled by budget_ratio per call
+        self.max_tokens = max(1.0, budget_ratio * window)
+        self.stats = {"calls": 0, "hedges": 0, "hedge_wins": 0}
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self.lock = threading.Lock()
+    
+    def _record_latency(self, latency):
+        """Add a latency sample and refresh the hedge delay"""
+        with self.lock:
+            self.latencies.append(latency)
+            # Re-sort only every few samples to keep the bookkeeping cheap
+            if len(self.latencies) % 10 == 0:
+                samples = sorted(self.latencies)
+                value = samples[int(self.percentile * (len(samples) - 1))]
+                self.delay = min(self.max_delay, max(self.min_delay, value))
+    
+    def _take_hedge_token(self):
+        """Spend one hedge from the budget if available"""
+        with self.lock:
+            if self.tokens >= 1:
+                self.tokens -= 1
+                self.stats["hedges"] += 1
+                return True
+            return False
+    
+    def call(self, method, func, *args, **kwargs):
+        """
+        Call func, hedging it if the method is idempotent and the call is slow
+        
+        Args:
+            method (str): JSON-RPC or NFT API method name
+            func (callable): Function performing the request
+            *args, **kwargs: Arguments passed to func
+            
+        Returns:
+            The result of the first successful attempt
+            
+        Raises:
+            Exception: The primary request's error if every attempt failed
+        """
+        if method not in IDEMPOTENT_METHODS:
+            return func(*args, **kwargs)
+        
+        with self.lock:
+            self.stats["calls"] += 1
+            self.tokens = min(self.max_tokens, self.tokens + self.budget_ratio)
+            delay = self.delay
+        
+        start = time.time()
+        # Attempts run on the hedger's threads with the caller's context (limiter scope, lane)
+        primary = self.executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge_token():
+            result = primary.result()
+            self._record_latency(time.time() - start)
+            return result
+        
+        hedge = self.executor.submit(contextvars.copy_context().run, func, *args, **kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    # The loser cannot be interrupted once running; its result is dropped
+                    for other in pending:
+                        other.cancel()
+                    if future is hedge:
+                        with self.lock:
+                            self.stats["hedge_wins"] += 1
+                    self._record_latency(time.time() - start)
+                    return future.result()
+        
+        # Both attempts failed
+        return primary.result()
+
+_default_hedger = None
+_default_hedger_lock = threading.Lock()
+
+def get_default_hedger():
+    """
+    Return the shared HedgedExecutor, creating it on first use
+    
+    Returns:
+        HedgedExecutor: The shared executor
+    """
+    global _default_hedger
+    with _default_hedger_lock:
+        if _default_hedger is None:
+            _default_hedger = HedgedExecutor()
+        return _default_hedger
+
+# Example usage
+if __name__ == "__main__":
+    import random
+    
+    def slow_read():
+        # 95% of calls take ~20 ms, 5% stall for 1 s
+        time.sleep(1.0 if random.random() < 0.05 else 0.02)
+        return "ok"
+    
+    for hedged in (False, True):
+        hedger = HedgedExecutor(min_delay=0.03)
+        latencies = []
+        for _ in range(300):
+            start = time.time()
+            if hedged:
+                hedger.call("eth_getBalance", slow_read)
+            else:
+                slow_read()
+            latencies.append(time.time() - start)
+        latencies.sort()
+        p99 = latencies[int(0.99 * (len(latencies) - 1))] * 1000
+        print(f"{'Hedged' if hedged else 'Plain'}: p99 {p99:.0f} ms"
+              + (f", stats {hedger.stats}" if hedged else ""))
@@ -0,0 +1,267 @@
+# File: key_pool.py
+# Purpose: Spread requests across several API keys, weighted by remaining quota
+
+import re
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from requests.adapters import HTTPAdapter
+
+from clock import SYSTEM_CLOCK
+from retry_policy import parse_retry_after
+from response_cache import observe_head_block
+from transport import http_post
+from validate_api_key import is_valid_alchemy_key
+
+logger = logging.getLogger("alchemy_api")
+
+# Key segment of Alchemy JSON-RPC and NFT API URLs
+KEY_IN_URL = re.compile(r"(\.alchemy\.com/(?:nft/)?v\d+/)[^/?#]+")
+
+# How long a key is parked after an authorization failure (401/403)
+AUTH_PARK_SECONDS = 300
+
+# How long a key is parked after a 429 without a Retry-After header
+RATE_LIMIT_PARK_SECONDS = 30
+
+def mask_key(api_key):
+    """Return a key shortened for logs"""
+    return f"{api_key[:4]}...{api_key[-2:]}" if api_key and len(api_key) > 8 else "***"
+
+class KeyState:
+    """Usage and parking state of one API key"""
+    def __init__(self, api_key, quota):
+        self.api_key = api_key
+        self.quota = quota
+        self.window_start = 0.0
+        self.used = 0
+        self.parked_until = 0.0
+        self.stats = {"requests": 0, "auth_errors": 0, "rate_limited": 0}
+    
+    def remaining(self, now, time_frame):
+        """Return the requests left in the current quota window"""
+        if now - self.window_start >= time_frame:
+            return self.quota
+        return max(0, self.quota - self.used)
+
+class KeyPool:
+    """
+    Set of API keys that requests are spread across
+    
+    Each request takes a key at random, weighted by the quota the key has
+    left in the current window, so keys with more headroom take more of the
+    load. A key answering 401/403 or 429 is parked (skipped) for a while.
+    When every key is parked, the one that comes back soonest is used.
+    
+    Usage:
+        pool = KeyPool(["key-a...", "key-b..."], quota=330)
+        pool.validate()
+        api_key = pool.acquire()
+    """
+    def __init__(self, api_keys, quota=330, time_frame=1.0, clock=None, rng=None):
+        """
+        Initialize the key pool
+        
+        Args:
+            api_keys (list): API keys; malformed keys are dropped with an error
+            quota (int or dict): Requests per time frame for every key, or a
+                key -> quota mapping (keys missing from it get the smallest quota)
+            time_frame (float): Quota window in seconds
+            clock (object): Clock providing time() (default: the system clock)
+            rng (random.Random): Random source for key selection
+        
+        Raises:
+            ValueError: If no well-formed key is given
+        """
+        self.time_frame = time_frame
+        self.clock = clock or SYSTEM_CLOCK
+        self.rng = rng or random.Random()
+        self.lock = threading.Lock()
+        self.keys = {}
+        default_quota = min(quota.values()) if isinstance(quota, dict) and quota else quota
+        for api_key in dict.fromkeys(api_keys):
+            if not api_key or not is_valid_alchemy_key(api_key):
+                logger.error(f"Ignoring malformed API key {mask_key(api_key)}")
+                continue
+            key_quota = quota.get(api_key, default_quota) if isinstance(quota, dict) else quota
+            self.keys[api_key] = KeyState(api_key, key_quota)
+        if not self.keys:
+            raise ValueError("KeyPool needs at least one well-formed API key")
+    
+    def __len__(self):
+        return len(self.keys)
+    
+    def acquire(self):
+        """
+        Choose a key for one request and charge it to the key's quota
+        
+        Returns:
+            str: The API key to use
+        """
+        with self.lock:
+            now = self.clock.time()
+            active = [state for state in self.keys.values() if state.parked_until <= now]
+            if not active:
+                # Every key is parked: use the one that comes back first rather than failing
+                state = min(self.keys.values(), key=lambda s: s.parked_until)
+            else:
+                weights = [state.remaining(now, self.time_frame) for state in active]
+                if not any(weights):
+                    weights = [state.quota for state in active]
+                state = self.rng.choices(active, weights=weights)[0]
+            
+            if now - state.window_start >= self.time_frame:
+                state.window_start = now
+                state.used = 0
+            state.used += 1
+            state.stats["requests"] += 1
+            return state.api_key
+    
+    def park(self, api_key, seconds):
+        """
+        Stop choosing a key for a while
+        
+        Args:
+            api_key (str): Key to park
+            seconds (float): How long to skip it
+        """
+        with self.lock:
+            state = self.keys.get(api_key)
+            if state is not None:
+                state.parked_until = max(state.parked_until, self.clock.time() + seconds)
+        logger.warning(f"Parking API key {mask_key(api_key)} for {seconds:.0f} seconds")
+    
+    def record_response(self, api_key, status_code, retry_after=None):
+        """
+        Update a key's state from the HTTP status of a request made with it
+        
+        Args:
+            api_key (str): Key the request used
+            status_code (int): HTTP status of the response
+            retry_after (str): The response's Retry-After header, if any
+        """
+        if status_code not in (401, 403, 429):
+            return
+        with self.lock:
+            state = self.keys.get(api_key)
+            if state is not None:
+                state.stats["rate_limited" if status_code == 429 else "auth_errors"] += 1
+        if status_code != 429:
+            self.park(api_key, AUTH_PARK_SECONDS)
+        else:
+            hint = parse_retry_after(retry_after)
+            self.park(api_key, hint if hint is not None else RATE_LIMIT_PARK_SECONDS)
+    
+    def validate(self, network="eth-mainnet", timeout=5, session=None):
+        """
+        Check every key against the live API and drop the ones that are rejected
+        
+        Keys answering 401/403 are removed; keys that could not be checked
+        (timeouts, 5xx, 429) are kept.
+        
+        Args:
+            network (str): Alchemy network to probe
+            timeout (float): Request timeout per key
+            session (requests.Session): Session to probe with (default: the shared transport)
+        
+        Returns:
+            dict: Masked key -> True (accepted), False (rejected) or None (unknown)
+        """
+        post = session.post if session is not None else http_post
+        payload = {"jsonrpc": "2.0", "id": 1, "method": "eth_blockNumber", "params": []}
+        
+        def probe(api_key):
+            try:
+                response = post(f"https://{network}.g.alchemy.com/v2/{api_key}", json=payload, timeout=timeout)
+            except Exception as e:
+                logger.warning(f"Could not validate API key {mask_key(api_key)}: {e}")
+                return None
+            if response.status_code in (401, 403):
+                return False
+            if not response.ok:
+                return None
+            try:
+                # The probe fetched the head block, which also tells the response cache what is final
+                observe_head_block(network, response.json()["result"])
+            except Exception:
+                pass
+            return True
+        
+        keys = list(self.keys)
+        with ThreadPoolExecutor(max_workers=min(8, len(keys)), thread_name_prefix="keycheck") as executor:
+            results = dict(zip(keys, executor.map(probe, keys)))
+        
+        with self.lock:
+            rejected = [api_key for api_key, ok in results.items() if ok is False]
+            if len(rejected) == len(self.keys):
+                logger.error("Every API key was rejected; keeping them so requests report the error")
+            else:
+                for api_key in rejected:
+                    logger.error(f"Removing API key {mask_key(api_key)}: rejected by {network}")
+                    del self.keys[api_key]
+        return {mask_key(api_key): ok for api_key, ok in results.items()}
+    
+    def snapshot(self):
+        """
+        Return the state of every key
+        
+        Returns:
+            list: One dict per key with its masked key, quota, requests left
+                in the window, seconds until unparked and counters
+        """
+        with self.lock:
+            now = self.clock.time()
+            return [
+                {
+                    "key": mask_key(state.api_key),
+                    "quota": state.quota,
+                    "remaining": state.remaining(now, self.time_frame),
+                    "parked_for": max(0.0, state.parked_until - now),
+                    **state.stats
+                }
+                for state in self.keys.values()
+            ]
+
+class KeyPoolAdapter(HTTPAdapter):
+    """
+    requests adapter that puts a key from a KeyPool into each Alchemy URL
+    
+    Mounted on a session, it replaces the key segment of every request URL
+    (including those sent by a Web3 provider on the session) and reports
+    401/403 and 429 responses back to the pool, so callers never see which
+    key was used.
+    """
+    def __init__(self, key_pool, **kwargs):
+        """
+        Initialize the adapter
+        
+        Args:
+            key_pool (KeyPool): Pool to take keys from
+            **kwargs: Passed to HTTPAdapter (pool_connections, pool_maxsize, max_retries)
+        """
+        self.key_pool = key_pool
+        super().__init__(**kwargs)
+    
+    def send(self, request, **kwargs):
+        api_key = self.key_pool.acquire()
+        request.url = KEY_IN_URL.sub(lambda match: match.group(1) + api_key, request.url, count=1)
+        response = super().send(request, **kwargs)
+        self.key_pool.record_response(api_key, response.status_code, response.headers.get("Retry-After"))
+        return response
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    
+    clock = VirtualClock()
+    pool = KeyPool(["a" * 32, "b" * 32, "c" * 32], quota={"a" * 32: 600, "b" * 32: 300, "c" * 32: 100}, clock=clock)
+    counts = {}
+    for _ in range(500):
+        api_key = pool.acquire()
+        counts[mask_key(api_key)] = counts.get(mask_key(api_key), 0) + 1
+    print(f"Requests per key: {counts}")
+    
+    pool.record_response("a" * 32, 429, retry_after="10")
+    print(pool.snapshot())
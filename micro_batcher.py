@@ -0,0 +1,160 @@
+# File: micro_batcher.py
+# Purpose: Coalesce concurrent single-item calls into batches (DataLoader-style)
+
+import time
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+class MicroBatcher:
+    """
+    Collect single-item requests from many threads and load them in batches
+    
+    The first request of a batch opens a window of `max_delay` seconds; the
+    batch is dispatched when the window closes or `max_batch_size` distinct
+    keys have arrived, whichever comes first. Duplicate keys in one batch
+    are loaded once. Each caller gets a future resolved with its own result.
+    """
+    def __init__(self, batch_fn, max_batch_size=100, max_delay=0.005, max_concurrent_batches=4):
+        """
+        Initialize the micro-batcher
+        
+        Args:
+            batch_fn (callable): Takes a list of keys and returns a list of
+                results in the same order; a result that is an Exception is
+                raised to that key's callers only
+            max_batch_size (int): Most keys per batch
+            max_delay (float): Longest time a request waits for others to join its batch
+            max_concurrent_batches (int): Batches that may be loading at once
+        """
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.pending = {}  # Key -> futures waiting for it, in arrival order
+        self.window_start = None
+        self.stats = {"requests": 0, "batches": 0, "keys": 0}
+        self.closed = False
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent_batches, thread_name_prefix="microbatch")
+        self.dispatcher = threading.Thread(target=self._run, name="microbatch-dispatcher", daemon=True)
+        self.dispatcher.start()
+    
+    def submit(self, key):
+        """
+        Queue a key for the next batch
+        
+        Args:
+            key: Hashable item to load (e.g. an address)
+        
+        Returns:
+            concurrent.futures.Future: Resolved with the key's result
+        """
+        future = Future()
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("MicroBatcher is closed")
+            self.stats["requests"] += 1
+            if not self.pending:
+                self.window_start = time.monotonic()
+            self.pending.setdefault(key, []).append(future)
+            if len(self.pending) == 1 or len(self.pending) >= self.max_batch_size:
+                self.condition.notify()
+        return future
+    
+    def load(self, key, timeout=None):
+        """
+        Load one key through the batcher, blocking until its batch completes
+        
+        Args:
+            key: Hashable item to load
+            timeout (float): Seconds to wait (None to wait indefinitely)
+        
+        Returns:
+            The key's result
+        
+        Raises:
+            concurrent.futures.TimeoutError: If the timeout expires
+            Exception: The error from loading the key's batch
+        """
+        return self.submit(key).result(timeout)
+    
+    async def load_async(self, key):
+        """Load one key from a coroutine without blocking the event loop"""
+        return await asyncio.wrap_future(self.submit(key))
+    
+    def _take_batch(self):
+        """Wait for a full batch or an expired window and take it (condition held)"""
+        while not self.pending and not self.closed:
+            self.condition.wait()
+        while self.pending and len(self.pending) < self.max_batch_size and not self.closed:
+            remaining = self.window_start + self.max_delay - time.monotonic()
+            if remaining <= 0:
+                break
+            self.condition.wait(remaining)
+        
+        keys = list(self.pending)[:self.max_batch_size]
+        batch = [(key, self.pending.pop(key)) for key in keys]
+        # Keys left over start a new window now
+        self.window_start = time.monotonic() if self.pending else None
+        return batch
+    
+    def _run(self):
+        """Dispatcher loop: hand each batch to the executor"""
+        while True:
+            with self.condition:
+                batch = self._take_batch()
+                if not batch and self.closed:
+                    return
+                self.stats["batches"] += 1
+                self.stats["keys"] += len(batch)
+            self.executor.submit(self._load_batch, batch)
+    
+    def _load_batch(self, batch):
+        """Load one batch and resolve its futures"""
+        try:
+            results = self.batch_fn([key for key, _ in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} keys")
+        except Exception as e:
+            for _, futures in batch:
+                for future in futures:
+                    future.set_exception(e)
+            return
+        
+        for (_, futures), result in zip(batch, results):
+            for future in futures:
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+    
+    def close(self):
+        """Dispatch what is queued, then stop the dispatcher"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.dispatcher.join()
+        self.executor.shutdown(wait=True)
+
+# Example usage
+if __name__ == "__main__":
+    def square_all(keys):
+        time.sleep(0.01)  # Simulate one round trip per batch
+        return [key * key for key in keys]
+    
+    batcher = MicroBatcher(square_all, max_batch_size=50, max_delay=0.005)
+    results = {}
+    
+    def worker(n):
+        results[n] = batcher.load(n % 120)
+    
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(200)]
+    start = time.time()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    batcher.close()
+    
+    assert all(results[n] == (n % 120) ** 2 for n in range(200))
+    print(f"{len(results)} calls in {time.time() - start:.3f}s: {batcher.stats}")
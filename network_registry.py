@@ -0,0 +1,229 @@
+# File: network_registry.py
+# Purpose: Per-network clients (connection pool, rate limiter, Web3) and cross-chain fan-out
+
+import logging
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+from config import get_config
+from rate_limiter import limiter_scope
+from transport import Transport
+from key_pool import KeyPool, KeyPoolAdapter
+
+logger = logging.getLogger("alchemy_api")
+
+# Networks queried by fan_out when none are given
+DEFAULT_NETWORKS = ("eth-mainnet", "polygon-mainnet", "arb-mainnet", "opt-mainnet", "base-mainnet")
+
+class NetworkClient:
+    """
+    Endpoints, connection pool, rate limiter and Web3 instance for one network
+    
+    Each network has its own pool so a slow chain cannot hold connections
+    another chain needs. Calls made inside `scope()` are throttled by the
+    network's limiter instead of the default one. With a key pool, each
+    request to the network's host is sent with a key taken from the pool.
+    """
+    def __init__(self, network, api_key=None, limiter=None, pool_maxsize=32, key_pool=None):
+        """
+        Initialize the client
+        
+        Args:
+            network (str): Alchemy network, e.g. "polygon-mainnet"
+            api_key (str): Alchemy API key (default: the shared configuration's key)
+            limiter (RateLimiter): Limiter for this network (None to use the default limiter)
+            pool_maxsize (int): Keep-alive connections kept to the network's host
+            key_pool (KeyPool): Keys to spread requests across (None to always use api_key)
+        """
+        self.network = network
+        self.api_key = api_key
+        self.limiter = limiter
+        self.key_pool = key_pool
+        self.transport = Transport(pool_connections=1, pool_maxsize=pool_maxsize)
+        if key_pool is not None:
+            adapter = KeyPoolAdapter(key_pool, pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+            self.transport.session.mount(f"https://{network}.g.alchemy.com/", adapter)
+        self._web3 = None
+        self._lock = threading.Lock()
+    
+    def _key(self):
+        """Return the API key, reading the shared configuration if none was given"""
+        return self.api_key or get_config().require_api_key()
+    
+    @property
+    def rpc_url(self):
+        """str: JSON-RPC endpoint"""
+        return f"https://{self.network}.g.alchemy.com/v2/{self._key()}"
+    
+    @property
+    def nft_url(self):
+        """str: NFT API base URL"""
+        return f"https://{self.network}.g.alchemy.com/nft/v2/{self._key()}"
+    
+    @property
+    def session(self):
+        """requests.Session: The network's pooled session"""
+        return self.transport.session
+    
+    @property
+    def web3(self):
+        """Web3: Instance on the network's pool, created on first use"""
+        with self._lock:
+            if self._web3 is None:
+                from web3 import Web3
+                self._web3 = Web3(Web3.HTTPProvider(self.rpc_url, session=self.transport.session))
+            return self._web3
+    
+    def breaker_name(self, method):
+        """Return the circuit breaker name for a method on this network"""
+        return f"{self.network}/{method}"
+    
+    def scope(self):
+        """Context manager that routes throttle() and report_result() to this network's limiter"""
+        return limiter_scope(self.limiter)
+    
+    def close(self):
+        """Close the network's pooled connections"""
+        self.transport.close()
+
+class NetworkRegistry:
+    """
+    Network clients keyed by network name, created on first use
+    
+    Usage:
+        registry = NetworkRegistry(limiter_factory=lambda network: RateLimiter(300, 1))
+        client = registry.get("base-mainnet")
+    """
+    def __init__(self, api_key=None, limiter_factory=None, pool_maxsize=32, key_pool=None):
+        """
+        Initialize the registry
+        
+        Args:
+            api_key (str): API key for every network (default: the shared configuration's key)
+            limiter_factory (callable): Takes a network name and returns its limiter
+                (None to throttle every network with the default limiter)
+            pool_maxsize (int): Keep-alive connections kept per network
+            key_pool (KeyPool): Keys shared by every network (default: a validated
+                pool of the configured keys when more than one is configured)
+        """
+        self.api_key = api_key
+        self.limiter_factory = limiter_factory
+        self.pool_maxsize = pool_maxsize
+        self.key_pool = key_pool
+        self._key_pool_checked = key_pool is not None or api_key is not None
+        self.clients = {}
+        self.lock = threading.Lock()
+        self._key_pool_lock = threading.Lock()  # Held while the key pool is built and validated
+    
+    def get(self, network=None):
+        """
+        Return the client for a network, creating it on first use
+        
+        Args:
+            network (str): Alchemy network (default: the shared configuration's network)
+        
+        Returns:
+            NetworkClient: The network's client
+        """
+        network = network or get_config().network
+        with self.lock:
+            client = self.clients.get(network)
+        if client is not None:
+            return client
+        
+        # Validating keys makes network requests, so it must not hold up clients that already exist
+        key_pool = self._get_key_pool()
+        with self.lock:
+            client = self.clients.get(network)
+            if client is None:
+                limiter = self.limiter_factory(network) if self.limiter_factory else None
+                client = NetworkClient(network, api_key=self.api_key, limiter=limiter, pool_maxsize=self.pool_maxsize,
+                                       key_pool=key_pool)
+                self.clients[network] = client
+            return client
+    
+    def _get_key_pool(self):
+        """Build and validate the pool of configured keys on first use, without holding self.lock"""
+        with self._key_pool_lock:
+            if not self._key_pool_checked:
+                config = get_config()
+                if len(config.api_keys) > 1:
+                    key_pool = KeyPool(config.api_keys)
+                    logger.info(f"API key validation: {key_pool.validate(config.network)}")
+                    with self.lock:
+                        self.key_pool = key_pool
+                self._key_pool_checked = True
+            return self.key_pool
+    
+    def networks(self):
+        """Return the networks that have a client"""
+        with self.lock:
+            return list(self.clients)
+    
+    def close(self):
+        """Close every client's pooled connections"""
+        with self.lock:
+            clients, self.clients = list(self.clients.values()), {}
+        for client in clients:
+            client.close()
+
+# Registry used by the toolkit's request functions
+default_registry = NetworkRegistry()
+
+def get_client(network=None):
+    """Return the default registry's client for a network"""
+    return default_registry.get(network)
+
+def fan_out(func, *args, networks=None, max_workers=None, **kwargs):
+    """
+    Run the same query on several networks concurrently
+    
+    func is called once per network as func(*args, network=network, **kwargs)
+    on its own worker thread, with the caller's context (deadline scope and
+    fairness lane) copied in.
+    
+    Args:
+        func (callable): Toolkit function accepting a network keyword
+        *args, **kwargs: Arguments passed to func
+        networks (list): Networks to query (default: DEFAULT_NETWORKS)
+        max_workers (int): Maximum networks queried at once (default: all)
+    
+    Returns:
+        dict: Result containing per-network results and errors
+            (success is True only if every network answered)
+    """
+    networks = list(networks or DEFAULT_NETWORKS)
+    results = {}
+    errors = {}
+    if not networks:
+        return {"success": True, "results": results, "errors": errors}
+    
+    with ThreadPoolExecutor(max_workers=max_workers or len(networks), thread_name_prefix="fanout") as executor:
+        futures = {
+            network: executor.submit(contextvars.copy_context().run, func, *args, network=network, **kwargs)
+            for network in networks
+        }
+        for network, future in futures.items():
+            try:
+                results[network] = future.result()
+            except Exception as e:
+                logger.error(f"{getattr(func, '__name__', 'query')} failed on {network}: {e}")
+                errors[network] = str(e)
+    
+    return {"success": not errors, "results": results, "errors": errors}
+
+# Example usage
+if __name__ == "__main__":
+    from rate_limiter import RateLimiter
+    
+    registry = NetworkRegistry(api_key="demo", limiter_factory=lambda network: RateLimiter(max_calls=25, time_frame=1))
+    for name in DEFAULT_NETWORKS:
+        client = registry.get(name)
+        print(f"{name}: {client.rpc_url} (limiter {client.limiter.max_calls}/s)")
+    
+    def chain_name(network):
+        return network.split("-")[0]
+    
+    print(fan_out(chain_name, networks=DEFAULT_NETWORKS))
+    registry.close()
@@ -1,8 +1,321 @@
 # File: rate_limiter.py
 # Purpose: Add rate limiting implementation to prevent API throttling
 
-import time
 import threading
+import contextvars
+from contextlib import contextmanager
+
+from clock import SYSTEM_CLOCK, VirtualClock
+
+class SlidingWindowEngine:
+    """
+    Sliding-window log engine (the original RateLimiter algorithm)
+    
+    Keeps one timestamp per unit of cost admitted within the time frame,
+    so memory and admission cost grow linearly with max_calls.
+    """
+    def __init__(self, max_calls, time_frame):
+        """
+        Initialize the sliding window engine
+        
+        Args:
+            max_calls (int): Maximum number of calls allowed within the time frame
+            time_frame (float): Time frame in seconds
+        """
+        self.max_calls = max_calls
+        self.time_frame = time_frame
+        self.calls = []  # Record of call timestamps
+    
+    def try_acquire(self, now, cost=1):
+        """
+        Register a call at time `now` if the window has room
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            bool: True if the call was admitted, False otherwise
+        """
+        # Remove call records outside the time frame
+        self.calls = [t for t in self.calls if now - t < self.time_frame]
+        
+        if len(self.calls) + cost <= self.max_calls:
+            booked_ahead = self.calls and self.calls[-1] > now
+            self.calls.extend([now] * cost)
+            if booked_ahead:
+                # Future slots were booked by reserve(); keep the log in time order
+                self.calls.sort()
+            return True
+        return False
+    
+    def wait_time(self, now, cost=1):
+        """
+        Return the time to wait before a call would be admitted
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait in seconds
+        """
+        excess = len(self.calls) + cost - self.max_calls
+        if excess <= 0:
+            return 0
+        
+        # Timestamps are appended in order, so the first `excess` must expire
+        expiring_call = self.calls[excess - 1]
+        return max(0, self.time_frame - (now - expiring_call))
+    
+    def reserve(self, now, cost=1):
+        """
+        Book the earliest slot for a call, even if it lies in the future
+        
+        Future slots are spaced at least time_frame / max_calls per unit
+        apart, so callers queued at the same instant are released one by
+        one rather than as a burst when the window frees up.
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait until the booked slot
+        """
+        self.calls = [t for t in self.calls if now - t < self.time_frame]
+        excess = len(self.calls) + cost - self.max_calls
+        slot = now
+        if excess > 0:
+            # The call may run once the first `excess` entries have expired,
+            # and no sooner than one emission interval after the last booking
+            interval = self.time_frame / self.max_calls
+            slot = max(now, self.calls[excess - 1] + self.time_frame, self.calls[-1] + interval * cost)
+        self.calls.extend([slot] * cost)
+        return slot - now
+    
+    def set_max_calls(self, max_calls):
+        """
+        Change the number of calls allowed within the time frame
+        
+        Args:
+            max_calls (float): New maximum number of calls
+        """
+        self.max_calls = max_calls
+
+class TokenBucketEngine:
+    """
+    Token bucket engine with O(1) admission and constant memory
+    
+    The bucket holds up to max_calls tokens and refills continuously at
+    max_calls / time_frame tokens per second. Each call consumes `cost` tokens.
+    """
+    def __init__(self, max_calls, time_frame):
+        """
+        Initialize the token bucket engine
+        
+        Args:
+            max_calls (int): Bucket capacity (maximum burst size)
+            time_frame (float): Time in seconds to refill a full bucket
+        """
+        self.max_calls = max_calls
+        self.time_frame = time_frame
+        self.rate = max_calls / time_frame  # Tokens added per second
+        self.tokens = float(max_calls)
+        self.updated = None  # Timestamp of the last refill
+    
+    def _refill(self, now):
+        """Add the tokens accrued since the last update"""
+        if self.updated is not None and now > self.updated:
+            self.tokens = min(self.max_calls, self.tokens + (now - self.updated) * self.rate)
+        if self.updated is None or now > self.updated:
+            self.updated = now
+    
+    def try_acquire(self, now, cost=1):
+        """
+        Consume tokens at time `now` if enough are available
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of tokens the call consumes
+            
+        Returns:
+            bool: True if the call was admitted, False otherwise
+        """
+        self._refill(now)
+        if self.tokens >= cost:
+            self.tokens -= cost
+            return True
+        return False
+    
+    def wait_time(self, now, cost=1):
+        """
+        Return the time until enough tokens are available
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of tokens the call consumes
+            
+        Returns:
+            float: Time to wait in seconds
+        """
+        self._refill(now)
+        if self.tokens >= cost:
+            return 0
+        return (cost - self.tokens) / self.rate
+    
+    def reserve(self, now, cost=1):
+        """
+        Take tokens for a call, going into debt if the bucket is short
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of tokens the call consumes
+            
+        Returns:
+            float: Time to wait until the debt is repaid
+        """
+        self._refill(now)
+        self.tokens -= cost
+        if self.tokens >= 0:
+            return 0
+        return -self.tokens / self.rate
+    
+    def set_max_calls(self, max_calls):
+        """
+        Change the bucket capacity and refill rate
+        
+        Args:
+            max_calls (float): New capacity, refilled over the same time frame
+        """
+        self.max_calls = max_calls
+        self.rate = max_calls / self.time_frame
+        self.tokens = min(self.tokens, max_calls)
+
+class GCRAEngine:
+    """
+    Generic Cell Rate Algorithm engine with O(1) admission and constant memory
+    
+    GCRA stores a single "theoretical arrival time" (TAT). Calls are spaced
+    by an emission interval of time_frame / max_calls, and bursts of up to
+    max_calls are tolerated, matching the limits of the sliding window.
+    """
+    def __init__(self, max_calls, time_frame):
+        """
+        Initialize the GCRA engine
+        
+        Args:
+            max_calls (int): Maximum number of calls allowed within the time frame
+            time_frame (float): Time frame in seconds
+        """
+        self.max_calls = max_calls
+        self.time_frame = time_frame
+        self.interval = time_frame / max_calls  # Emission interval between calls
+        self.tat = None  # Theoretical arrival time of the next call
+    
+    def try_acquire(self, now, cost=1):
+        """
+        Admit a call at time `now` if it conforms to the configured rate
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            bool: True if the call was admitted, False otherwise
+        """
+        tat = now if self.tat is None else max(self.tat, now)
+        new_tat = tat + self.interval * cost
+        if new_tat - now > self.time_frame:
+            return False
+        self.tat = new_tat
+        return True
+    
+    def wait_time(self, now, cost=1):
+        """
+        Return the time until a call would conform
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait in seconds
+        """
+        tat = now if self.tat is None else max(self.tat, now)
+        return max(0, tat + self.interval * cost - self.time_frame - now)
+    
+    def reserve(self, now, cost=1):
+        """
+        Book the earliest conforming slot for a call
+        
+        Args:
+            now (float): Current timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait until the booked slot
+        """
+        tat = now if self.tat is None else max(self.tat, now)
+        self.tat = tat + self.interval * cost
+        return max(0, self.tat - self.time_frame - now)
+    
+    def set_max_calls(self, max_calls):
+        """
+        Change the number of calls allowed within the time frame
+        
+        Args:
+            max_calls (float): New maximum number of calls
+        """
+        self.max_calls = max_calls
+        self.interval = self.time_frame / max_calls
+
+# Engines selectable by name through RateLimiter(engine=...)
+ENGINES = {
+    "sliding_window": SlidingWindowEngine,
+    "token_bucket": TokenBucketEngine,
+    "gcra": GCRAEngine,
+}
+
+def make_engine(engine, max_calls, time_frame):
+    """
+    Build a rate limiter engine
+    
+    Args:
+        engine (str or object): Engine name from ENGINES, or an engine instance
+        max_calls (int): Maximum number of calls allowed within the time frame
+        time_frame (float): Time frame in seconds
+        
+    Returns:
+        object: Engine providing try_acquire, wait_time, reserve and set_max_calls
+        
+    Raises:
+        ValueError: If the engine name is unknown
+    """
+    if not isinstance(engine, str):
+        return engine
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown rate limiter engine: {engine}")
+    return ENGINES[engine](max_calls, time_frame)
+
+def request_cost(request, costs, default_cost=1):
+    """
+    Return the cost of a request according to a costs table
+    
+    Args:
+        request (str, dict or list): A method name, a JSON-RPC payload,
+            or a JSON-RPC batch (the summed cost of its elements)
+        costs (dict): Mapping of method name to cost
+        default_cost (int): Cost of methods missing from the table
+        
+    Returns:
+        int: Cost of the request
+    """
+    if isinstance(request, (list, tuple)):
+        return sum(request_cost(item, costs, default_cost) for item in request)
+    if isinstance(request, dict):
+        request = request.get("method")
+    return costs.get(request, default_cost)
 
 class RateLimiter:
     """
@@ -10,84 +323,271 @@ class RateLimiter:
     
     This class helps prevent hitting API rate limits by tracking
     the number of calls made within a specified time frame.
+    The admission algorithm is delegated to a pluggable engine:
+    "sliding_window" (default, the original behaviour), or the
+    constant-time "token_bucket" and "gcra" engines.
+    
+    Calls can be weighted: with a `costs` table (e.g. compute units per
+    JSON-RPC method) max_calls is a budget of units rather than calls.
+    
+    In queued mode, wait_if_needed() books each caller a precise future
+    slot, so blocked threads wake exactly once, in order and evenly spaced.
     """
-    def __init__(self, max_calls, time_frame):
+    def __init__(self, max_calls, time_frame, engine="sliding_window", costs=None, default_cost=1, queued=False, clock=None):
         """
         Initialize the rate limiter
         
         Args:
-            max_calls (int): Maximum number of calls allowed within the time frame
+            max_calls (int): Maximum number of calls (or cost units) allowed within the time frame
             time_frame (float): Time frame in seconds
+            engine (str or object): Engine name from ENGINES, or an engine
+                instance providing try_acquire(now, cost), wait_time(now, cost)
+                and reserve(now, cost)
+            costs (dict): Optional mapping of method name to cost, used by cost_of()
+            default_cost (int): Cost of methods missing from the costs table
+            queued (bool): Book future slots in wait_if_needed() instead of
+                letting blocked threads race for the next free one
+            clock (object): Clock providing time() and sleep() (default: the system clock)
         """
         self.max_calls = max_calls  # Maximum number of calls allowed within the time frame
         self.time_frame = time_frame  # Time frame in seconds
-        self.calls = []  # Record of call timestamps
+        self.engine = make_engine(engine, max_calls, time_frame)
+        self.costs = costs or {}
+        self.default_cost = default_cost
+        self.queued = queued
+        self.clock = clock or SYSTEM_CLOCK
+        self.controller = None  # Optional feedback controller (see adaptive_rate.py)
+        self.paused_until = 0  # No call is admitted before this time (see pause())
         self.lock = threading.Lock()
+    
+    def cost_of(self, request):
+        """
+        Return the cost of a request according to the costs table
+        
+        Args:
+            request (str, dict or list): A method name, a JSON-RPC payload,
+                or a JSON-RPC batch (the summed cost of its elements)
+                
+        Returns:
+            int: Cost of the request
+        """
+        return request_cost(request, self.costs, self.default_cost)
+    
+    def _check_cost(self, cost):
+        """Reject costs that could never be admitted"""
+        if cost > self.max_calls:
+            raise ValueError(f"Request cost {cost} exceeds rate limit capacity {self.max_calls}")
         
-    def can_call(self):
+    def can_call(self, cost=1):
         """
         Check if an API call can be made
         
+        Args:
+            cost (int): Number of units the call consumes
+        
         Returns:
             bool: True if a call can be made, False otherwise
         """
+        self._check_cost(cost)
         with self.lock:
-            now = time.time()
-            # Remove call records outside the time frame
-            self.calls = [t for t in self.calls if now - t < self.time_frame]
-            
-            if len(self.calls) < self.max_calls:
-                self.calls.append(now)
-                return True
-            return False
+            now = self.clock.time()
+            if now < self.paused_until:
+                return False
+            return self.engine.try_acquire(now, cost)
     
-    def wait_time(self):
+    def wait_time(self, cost=1):
         """
         Return the time to wait before making the next call
         
+        Args:
+            cost (int): Number of units the call consumes
+        
         Returns:
             float: Time to wait in seconds
         """
         with self.lock:
-            if len(self.calls) < self.max_calls:
-                return 0
-            
-            now = time.time()
-            oldest_call = min(self.calls)
-            return max(0, self.time_frame - (now - oldest_call))
+            now = self.clock.time()
+            if now < self.paused_until:
+                return self.paused_until - now
+            return self.engine.wait_time(now, cost)
     
-    def wait_if_needed(self):
+    def wait_if_needed(self, cost=1):
         """
         Wait if rate limit is reached before making a call
         
         This method will block until a call can be made without
-        exceeding the rate limit.
+        exceeding the rate limit. The whole cost is reserved at once,
+        so a JSON-RPC batch is admitted atomically.
+        
+        Args:
+            cost (int): Number of units the call consumes
         
         Returns:
             float: The time waited in seconds
         """
-        wait_time = self.wait_time()
-        if wait_time > 0:
-            time.sleep(wait_time)
-            # After waiting, register the call
+        self._check_cost(cost)
+        if self.queued:
+            # Book a slot under the lock, then sleep exactly once outside it
             with self.lock:
-                now = time.time()
-                self.calls = [t for t in self.calls if now - t < self.time_frame]
-                self.calls.append(now)
+                now = self.clock.time()
+                start = max(now, self.paused_until)
+                wait_time = start - now + self.engine.reserve(start, cost)
+            if wait_time > 0:
+                self.clock.sleep(wait_time)
             return wait_time
         
-        # If we can make a call without waiting, register it
-        if self.can_call():
-            return 0
+        waited = 0
+        while True:
+            with self.lock:
+                now = self.clock.time()
+                if now < self.paused_until:
+                    wait_time = self.paused_until - now
+                elif self.engine.try_acquire(now, cost):
+                    return waited
+                else:
+                    wait_time = self.engine.wait_time(now, cost)
+            
+            # Another thread may take the slot first, in which case we loop again
+            self.clock.sleep(wait_time)
+            waited += wait_time
+    
+    def set_rate(self, max_calls):
+        """
+        Change the number of calls (or cost units) allowed within the time frame
         
-        # If we reach here, something changed between wait_time and can_call
-        # Try again recursively (should be rare)
-        return self.wait_if_needed()
+        Args:
+            max_calls (float): New maximum, applied to the engine immediately
+        """
+        with self.lock:
+            self.max_calls = max_calls
+            self.engine.set_max_calls(max_calls)
+    
+    def pause(self, seconds):
+        """
+        Hold back all calls for a while, e.g. when the server asks for a pause
+        
+        Args:
+            seconds (float): How long no call should be admitted
+        """
+        with self.lock:
+            self.paused_until = max(self.paused_until, self.clock.time() + seconds)
+    
+    def record_result(self, latency=None, throttled=False):
+        """
+        Feed the outcome of a call back to the attached controller, if any
+        
+        Args:
+            latency (float): Response time of a successful call in seconds
+            throttled (bool): True if the call was rejected with a 429
+        """
+        controller = self.controller
+        if controller is None:
+            return
+        if throttled:
+            controller.on_throttle()
+        else:
+            controller.on_success(latency)
+    
+    def wait_for(self, request):
+        """
+        Wait until a request can be made, charging its cost from the costs table
+        
+        Args:
+            request (str, dict or list): Method name, JSON-RPC payload or batch
+            
+        Returns:
+            float: The time waited in seconds
+        """
+        return self.wait_if_needed(self.cost_of(request))
+
+# Limiter used by the toolkit's request functions (None disables throttling)
+_default_limiter = None
+
+def set_default_limiter(limiter):
+    """
+    Set the rate limiter consulted by the toolkit's request functions
+    
+    Args:
+        limiter (RateLimiter): Limiter to use, or None to disable throttling
+    """
+    global _default_limiter
+    _default_limiter = limiter
+
+def get_default_limiter():
+    """
+    Return the rate limiter consulted by the toolkit's request functions
+    
+    Returns:
+        RateLimiter: The default limiter, or None if none is set
+    """
+    return _default_limiter
+
+# Limiter set by limiter_scope, overriding the default for calls inside the scope
+_scoped_limiter = contextvars.ContextVar("alchemy_limiter", default=None)
+
+@contextmanager
+def limiter_scope(limiter):
+    """
+    Context manager that makes throttle() and report_result() use another limiter
+    
+    Used to give one network its own quota; scopes follow contextvars, so
+    they carry into worker threads started with a copied context.
+    
+    Args:
+        limiter (RateLimiter): Limiter for calls inside the scope (None keeps the current one)
+    """
+    if limiter is None:
+        yield
+        return
+    token = _scoped_limiter.set(limiter)
+    try:
+        yield
+    finally:
+        _scoped_limiter.reset(token)
+
+def current_limiter():
+    """
+    Return the limiter throttle() consults in this context
+    
+    Returns:
+        RateLimiter: The scoped limiter, else the default limiter, or None
+    """
+    return _scoped_limiter.get() or _default_limiter
+
+def throttle(request):
+    """
+    Wait for the current limiter before sending a request
+    
+    Args:
+        request (str, dict or list): Method name, JSON-RPC payload or batch
+        
+    Returns:
+        float: The time waited in seconds
+    """
+    limiter = current_limiter()
+    if limiter is None:
+        return 0
+    return limiter.wait_for(request)
+
+def report_result(latency=None, throttled=False):
+    """
+    Report the outcome of a call to the current limiter
+    
+    Args:
+        latency (float): Response time of a successful call in seconds
+        throttled (bool): True if the call was rejected with a 429
+    """
+    limiter = current_limiter()
+    if limiter is not None:
+        limiter.record_result(latency, throttled)
 
 # Example usage
 if __name__ == "__main__":
+    # Run on a virtual clock so the demo's waits take no real time
+    clock = VirtualClock()
+    
     # Create a rate limiter with 5 calls per 10 seconds
-    limiter = RateLimiter(max_calls=5, time_frame=10)
+    limiter = RateLimiter(max_calls=5, time_frame=10, clock=clock)
     
     # Simulate API calls
     for i in range(10):
@@ -96,13 +596,13 @@ if __name__ == "__main__":
         else:
             wait_time = limiter.wait_time()
             print(f"Call {i+1}: Rate limit reached. Wait {wait_time:.2f} seconds")
-            time.sleep(wait_time)
+            clock.sleep(wait_time)
             # Try again after waiting
             if limiter.can_call():
                 print(f"Call {i+1}: API call made after waiting")
         
         # Simulate some processing time
-        time.sleep(0.5)
+        clock.sleep(0.5)
     
     # Example of using wait_if_needed
     print("\nExample of using wait_if_needed:")
@@ -112,4 +612,13 @@ if __name__ == "__main__":
             print(f"Call {i+1}: Waited {wait_time:.2f} seconds before making API call")
         else:
             print(f"Call {i+1}: API call made without waiting")
-        time.sleep(0.5)
+        clock.sleep(0.5)
+    
+    # Constant-time engines share the same API
+    print("\nExample of using the GCRA engine:")
+    gcra_limiter = RateLimiter(max_calls=5, time_frame=10, engine="gcra", clock=clock)
+    for i in range(7):
+        wait_time = gcra_limiter.wait_if_needed()
+        print(f"Call {i+1}: Waited {wait_time:.2f} seconds")
+    
+    print(f"\nVirtual time elapsed: {clock.time():.2f} seconds")
@@ -0,0 +1,297 @@
+# File: response_cache.py
+# Purpose: Block-aware LRU response cache so repeated reads stop costing quota
+
+import threading
+from collections import OrderedDict
+
+from clock import SYSTEM_CLOCK
+from singleflight import normalize_params
+
+# Average block time per network in seconds; results read at a moving tag
+# ("latest", "safe", "finalized") are kept for at most one block
+BLOCK_TIMES = {
+    "eth-mainnet": 12,
+    "eth-sepolia": 12,
+    "eth-holesky": 12,
+    "polygon-mainnet": 2,
+    "polygon-amoy": 2,
+    "arb-mainnet": 0.25,
+    "arb-sepolia": 0.25,
+    "opt-mainnet": 2,
+    "opt-sepolia": 2,
+    "base-mainnet": 2,
+    "base-sepolia": 2,
+}
+
+# Block time assumed for networks missing from BLOCK_TIMES
+DEFAULT_BLOCK_TIME = 1
+
+# Blocks behind the chain head after which a block is treated as final (about two
+# Ethereum epochs, or the L1 finality delay for rollups); networks missing here only
+# learn their finalized block from set_finalized_block
+FINALITY_DEPTHS = {
+    "eth-mainnet": 96,
+    "eth-sepolia": 96,
+    "eth-holesky": 96,
+    "polygon-mainnet": 256,
+    "polygon-amoy": 256,
+    "arb-mainnet": 5000,
+    "arb-sepolia": 5000,
+    "opt-mainnet": 600,
+    "opt-sepolia": 600,
+    "base-mainnet": 600,
+    "base-sepolia": 600,
+}
+
+# Block times after which the last observed head is too old to tell whether a
+# block number is final, so callers reading at one should fetch the head again
+HEAD_REFRESH_BLOCKS = 10
+
+# Block tags whose results are never cached
+UNCACHEABLE_TAGS = {"pending"}
+
+def resolve_block(block):
+    """
+    Normalize a block identifier for use in a cache key
+    
+    Args:
+        block (str or int): Block tag, number (int or hex string) or block hash
+    
+    Returns:
+        str or int: Lower-case tag or hash, or the block number as an int
+    """
+    if isinstance(block, int):
+        return block
+    block = str(block).lower()
+    if block.startswith("0x") and len(block) < 66:
+        return int(block, 16)
+    return block
+
+class ResponseCache:
+    """
+    Size-bounded LRU cache of API results keyed by the block they were read at
+    
+    Keys are (network, method, canonical params, resolved block). Results
+    read at a block hash, or at a block number at or below the network's
+    finalized block, cannot change and are kept until evicted. Results read
+    at a moving tag such as "latest", or at a block that may still be
+    reorganized, expire after one block time.
+    
+    The finalized block is learned from every head block number the toolkit
+    fetches (see observe_head) or set directly with set_finalized_block.
+    Callers reading at a block number check head_is_stale first and fetch
+    the head when it is, so the finalized block keeps moving.
+    """
+    def __init__(self, max_entries=10000, block_times=None, clock=None, finality_depths=None):
+        """
+        Initialize the cache
+        
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted
+            block_times (dict): Network -> block time in seconds (default: BLOCK_TIMES)
+            clock (object): Clock providing time() (default: the system clock)
+            finality_depths (dict): Network -> blocks behind the head that are final
+                (default: FINALITY_DEPTHS)
+        """
+        self.max_entries = max_entries
+        self.block_times = dict(BLOCK_TIMES, **(block_times or {}))
+        self.finality_depths = dict(FINALITY_DEPTHS, **(finality_depths or {}))
+        self.clock = clock or SYSTEM_CLOCK
+        self.entries = OrderedDict()  # Key -> (value, expires_at or None)
+        self.finalized = {}  # Network -> highest block number known to be final
+        self.head_seen = {}  # Network -> time the head block number was last observed
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+        self.lock = threading.Lock()
+    
+    def make_key(self, network, method, params, block="latest"):
+        """
+        Build the cache key for a request
+        
+        Args:
+            network (str): Alchemy network
+            method (str): JSON-RPC or NFT API method name
+            params: Request parameters (without the block)
+            block (str or int): Block the data is read at
+        
+        Returns:
+            tuple: (network, method, canonical params, resolved block)
+        """
+        return (network, method, normalize_params(params), resolve_block(block))
+    
+    def ttl_for(self, network, block):
+        """
+        Return how long a result read at a block stays valid
+        
+        Args:
+            network (str): Alchemy network
+            block (str or int): Resolved block (see resolve_block)
+        
+        Returns:
+            float: Seconds, None to keep it until evicted, or 0 not to cache it
+        """
+        if block in UNCACHEABLE_TAGS:
+            return 0
+        if isinstance(block, str) and block.startswith("0x"):
+            return None  # Block hash: the block's state never changes
+        if isinstance(block, int) and block <= self.finalized.get(network, -1):
+            return None
+        return self.block_times.get(network, DEFAULT_BLOCK_TIME)
+    
+    def set_finalized_block(self, network, number):
+        """
+        Record the network's latest finalized block
+        
+        Args:
+            network (str): Alchemy network
+            number (int or str): Block number (int or hex string)
+        """
+        number = resolve_block(number)
+        with self.lock:
+            self.finalized[network] = max(self.finalized.get(network, -1), number)
+    
+    def observe_head(self, network, number):
+        """
+        Record a freshly fetched head block number, moving the finalized block up
+        
+        Args:
+            network (str): Alchemy network
+            number (int or str): Latest block number (int or hex string)
+        """
+        depth = self.finality_depths.get(network)
+        if depth is not None:
+            self.set_finalized_block(network, resolve_block(number) - depth)
+            with self.lock:
+                self.head_seen[network] = self.clock.time()
+    
+    def head_is_stale(self, network, block):
+        """
+        Return True if the head should be fetched before caching a result read at a block
+        
+        Args:
+            network (str): Alchemy network
+            block (str or int): Resolved block (see resolve_block)
+        
+        Returns:
+            bool: True if the block is a number not yet known to be final and
+                the head was never observed, or not for HEAD_REFRESH_BLOCKS block times
+        """
+        if not isinstance(block, int) or network not in self.finality_depths:
+            return False
+        with self.lock:
+            if block <= self.finalized.get(network, -1):
+                return False
+            seen = self.head_seen.get(network)
+        max_age = HEAD_REFRESH_BLOCKS * self.block_times.get(network, DEFAULT_BLOCK_TIME)
+        return seen is None or self.clock.time() - seen > max_age
+    
+    def lookup(self, key):
+        """
+        Look a key up, counting a hit or a miss
+        
+        Args:
+            key (tuple): Key from make_key
+        
+        Returns:
+            tuple: (found, value)
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > self.clock.time():
+                    self.entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                    return True, value
+                del self.entries[key]
+                self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return False, None
+    
+    def store(self, key, value):
+        """
+        Cache a result, evicting the least recently used entries if full
+        
+        Args:
+            key (tuple): Key from make_key
+            value: Result to cache (treated as read-only by every reader)
+        """
+        ttl = self.ttl_for(key[0], key[3])
+        if ttl == 0 or self.max_entries <= 0:
+            return
+        with self.lock:
+            expires_at = None if ttl is None else self.clock.time() + ttl
+            self.entries[key] = (value, expires_at)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats["evictions"] += 1
+    
+    def clear(self):
+        """Drop every entry (the counters are kept)"""
+        with self.lock:
+            self.entries.clear()
+    
+    def snapshot(self):
+        """
+        Return the counters
+        
+        Returns:
+            dict: Hits, misses, evictions, expirations, entries and hit ratio
+        """
+        with self.lock:
+            stats = dict(self.stats)
+            stats["entries"] = len(self.entries)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+# Cache used by the toolkit's request functions (None disables caching)
+_default_cache = ResponseCache()
+
+def set_default_cache(cache):
+    """
+    Set the cache consulted by the toolkit's request functions
+    
+    Args:
+        cache (ResponseCache): Cache to use, or None to disable caching
+    """
+    global _default_cache
+    _default_cache = cache
+
+def get_default_cache():
+    """
+    Return the cache consulted by the toolkit's request functions
+    
+    Returns:
+        ResponseCache: The default cache, or None if caching is disabled
+    """
+    return _default_cache
+
+def observe_head_block(network, number):
+    """
+    Tell the default cache about a head block number fetched from a network
+    
+    Args:
+        network (str): Alchemy network
+        number (int or str): Latest block number (int or hex string)
+    """
+    cache = _default_cache
+    if cache is not None:
+        cache.observe_head(network, number)
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    
+    clock = VirtualClock()
+    cache = ResponseCache(max_entries=2, clock=clock)
+    cache.observe_head("eth-mainnet", 19000096)  # Blocks up to 19000000 are now final
+    
+    latest = cache.make_key("eth-mainnet", "eth_getBalance", ["0xD8DA6BF26964AF9D7EED9E03E53415D37AA96045"])
+    pinned = cache.make_key("eth-mainnet", "eth_getBalance", ["0xd8da6bf26964af9d7eed9e03e53415d37aa96045"], 18000000)
+    cache.store(latest, 1)
+    cache.store(pinned, 2)
+    print(cache.lookup(latest), cache.lookup(pinned))
+    clock.sleep(13)  # One block later the latest balance has expired; the finalized one has not
+    print(cache.lookup(latest), cache.lookup(pinned))
+    print(cache.snapshot())
@@ -0,0 +1,110 @@
+# File: retry_budget.py
+# Purpose: Cap retries at a fraction of recent successes to prevent retry storms
+
+import threading
+
+from clock import SYSTEM_CLOCK
+
+class RetryBudget:
+    """
+    Shared budget that limits retries to a fraction of recent successful requests
+    
+    Successes and retries are counted in a sliding window of time buckets.
+    A retry is allowed while retries in the window stay below
+    `ratio` x successes plus a small floor, so a healthy fleet retries
+    freely but an outage cannot multiply load by max_retries.
+    """
+    def __init__(self, ratio=0.1, window=10, min_retries_per_second=1, buckets=10, clock=None):
+        """
+        Initialize the retry budget
+        
+        Args:
+            ratio (float): Retries allowed per recent success (0.1 = 10%)
+            window (float): Length of the sliding window in seconds
+            min_retries_per_second (float): Retries always allowed, so low-traffic callers can still retry
+            buckets (int): Number of time buckets the window is split into
+            clock (object): Clock providing time() (default: the system clock)
+        """
+        self.ratio = ratio
+        self.window = window
+        self.min_retries = min_retries_per_second * window
+        self.bucket_width = window / buckets
+        self.clock = clock or SYSTEM_CLOCK
+        # Each bucket is [bucket number, successes, retries]
+        self.buckets = [[None, 0, 0] for _ in range(buckets)]
+        self.lock = threading.Lock()
+    
+    def _bucket(self, now):
+        """Return the bucket for `now`, resetting it if it belongs to an old window"""
+        number = int(now // self.bucket_width)
+        bucket = self.buckets[number % len(self.buckets)]
+        if bucket[0] != number:
+            bucket[0], bucket[1], bucket[2] = number, 0, 0
+        return bucket
+    
+    def _totals(self, now):
+        """Sum successes and retries over the buckets inside the window"""
+        oldest = int(now // self.bucket_width) - len(self.buckets) + 1
+        successes = retries = 0
+        for number, bucket_successes, bucket_retries in self.buckets:
+            if number is not None and number >= oldest:
+                successes += bucket_successes
+                retries += bucket_retries
+        return successes, retries
+    
+    def record_success(self):
+        """Record a successful request"""
+        with self.lock:
+            self._bucket(self.clock.time())[1] += 1
+    
+    def try_spend(self):
+        """
+        Take one retry from the budget if any is left
+        
+        Returns:
+            bool: True if the caller may retry, False if the budget is exhausted
+        """
+        with self.lock:
+            now = self.clock.time()
+            successes, retries = self._totals(now)
+            if retries >= self.ratio * successes + self.min_retries:
+                return False
+            self._bucket(now)[2] += 1
+            return True
+    
+    def stats(self):
+        """
+        Return the counts in the current window
+        
+        Returns:
+            dict: Successes, retries and retries still available
+        """
+        with self.lock:
+            successes, retries = self._totals(self.clock.time())
+        allowed = self.ratio * successes + self.min_retries
+        return {
+            "successes": successes,
+            "retries": retries,
+            "available": max(0, int(allowed - retries))
+        }
+
+# Budget shared by retry_with_backoff, retry_function and the toolkit's retry loops
+default_retry_budget = RetryBudget()
+
+# Example usage
+if __name__ == "__main__":
+    from clock import VirtualClock
+    
+    clock = VirtualClock()
+    budget = RetryBudget(ratio=0.1, window=10, min_retries_per_second=0.5, clock=clock)
+    
+    # Healthy traffic: 100 successes per second for 5 seconds
+    for _ in range(5):
+        for _ in range(100):
+            budget.record_success()
+        clock.advance(1)
+    print(f"After healthy traffic: {budget.stats()}")
+    
+    # Outage: every request fails and wants to retry
+    allowed = sum(budget.try_spend() for _ in range(1000))
+    print(f"During an outage, {allowed} of 1000 retries were allowed")
@@ -0,0 +1,210 @@
+# File: retry_policy.py
+# Purpose: Common retry policy that honors Retry-After and Alchemy backoff hints
+
+import re
+import time
+import random
+from email.utils import parsedate_to_datetime
+
+from rate_limiter import current_limiter
+
+# JSON-RPC error codes used for rate limiting (Alchemy uses 429; -32005 is "limit exceeded")
+RATE_LIMIT_ERROR_CODES = (429, -32005)
+
+# Fields in a JSON-RPC error's "data" object that carry a wait time in seconds
+_HINT_FIELDS = ("retryAfter", "retry_after", "backoff_seconds", "backoffSeconds")
+
+# e.g. "... please try again in 2 seconds", "try again in 250ms"
+_TRY_AGAIN_PATTERN = re.compile(r"try again in\s+(\d+(?:\.\d+)?)\s*(ms|milliseconds?|s|sec|seconds?)?", re.IGNORECASE)
+
+def backoff_delay(retries, base_delay=1, max_delay=30, rng=None):
+    """
+    Calculate the delay before a retry (exponential, with jitter)
+    
+    Args:
+        retries (int): Number of the retry about to be made (1 for the first)
+        base_delay (float): Initial delay in seconds
+        max_delay (float): Maximum delay in seconds
+        rng (random.Random): Source of jitter (default: the random module)
+    
+    Returns:
+        float: Delay in seconds
+    """
+    delay = min(max_delay, base_delay * (2 ** (retries - 1)))
+    jitter = (rng or random).uniform(0, 0.1 * delay)
+    return delay + jitter
+
+def parse_retry_after(value, now=None):
+    """
+    Parse a Retry-After header value
+    
+    Args:
+        value (str): Delay in seconds, or an HTTP date
+        now (float): Current timestamp, used for HTTP dates (default: time.time())
+        
+    Returns:
+        float: Seconds to wait, or None if the value cannot be parsed
+    """
+    if value is None:
+        return None
+    value = str(value).strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+def rate_limit_hint(payload):
+    """
+    Extract a wait time from a JSON-RPC rate limit error payload
+    
+    Args:
+        payload (dict or list): JSON-RPC response, or a batch of responses
+        
+    Returns:
+        float: Seconds to wait (the longest hint in a batch), or None if no
+            rate limit error with a hint was found
+    """
+    if isinstance(payload, list):
+        hints = [rate_limit_hint(item) for item in payload]
+        hints = [h for h in hints if h is not None]
+        return max(hints) if hints else None
+    if not isinstance(payload, dict) or not isinstance(payload.get("error"), dict):
+        return None
+    
+    error = payload["error"]
+    message = str(error.get("message", ""))
+    if error.get("code") not in RATE_LIMIT_ERROR_CODES and "rate limit" not in message.lower():
+        return None
+    
+    data = error.get("data")
+    if isinstance(data, dict):
+        for field in _HINT_FIELDS:
+            if field in data:
+                try:
+                    return max(0.0, float(data[field]))
+                except (TypeError, ValueError):
+                    pass
+    
+    match = _TRY_AGAIN_PATTERN.search(message)
+    if match:
+        seconds = float(match.group(1))
+        unit = (match.group(2) or "s").lower()
+        return seconds / 1000 if unit.startswith("m") else seconds
+    return None
+
+def is_rate_limited(payload):
+    """
+    Check whether a JSON-RPC response (or any element of a batch) is a rate limit error
+    
+    Args:
+        payload (dict or list): JSON-RPC response or batch of responses
+        
+    Returns:
+        bool: True if a rate limit error is present
+    """
+    if isinstance(payload, list):
+        return any(is_rate_limited(item) for item in payload)
+    if not isinstance(payload, dict) or not isinstance(payload.get("error"), dict):
+        return False
+    error = payload["error"]
+    return error.get("code") in RATE_LIMIT_ERROR_CODES or "rate limit" in str(error.get("message", "")).lower()
+
+def server_retry_hint(error=None, response=None):
+    """
+    Find the server's requested wait time for a failed request
+    
+    Looks at the Retry-After header first, then at a JSON-RPC rate limit
+    error in the response body.
+    
+    Args:
+        error (Exception): The caught exception (its .response is used if present)
+        response (requests.Response): The response, if available directly
+        
+    Returns:
+        float: Seconds to wait, or None if the server gave no hint
+    """
+    if response is None and error is not None:
+        response = getattr(error, "response", None)
+    if response is None:
+        return None
+    
+    headers = getattr(response, "headers", None) or {}
+    hint = parse_retry_after(headers.get("Retry-After"))
+    if hint is not None:
+        return hint
+    
+    try:
+        return rate_limit_hint(response.json())
+    except Exception:
+        return None
+
+class RetryPolicy:
+    """
+    Retry settings plus the rule for how long to wait before each retry
+    
+    When the server says how long to wait (Retry-After header or a JSON-RPC
+    rate limit hint) that wait is used, capped at max_retry_after, and the
+    active rate limiter is paused for the same time so other threads stop
+    too. Otherwise the usual exponential backoff with jitter applies.
+    """
+    def __init__(self, max_retries=5, base_delay=1, max_delay=30, respect_retry_after=True,
+                 max_retry_after=60, limiter=None):
+        """
+        Initialize the retry policy
+        
+        Args:
+            max_retries (int): Maximum number of retries
+            base_delay (float): Initial computed delay in seconds
+            max_delay (float): Maximum computed delay in seconds
+            respect_retry_after (bool): Use server hints when present
+            max_retry_after (float): Longest server-requested wait that is honored
+            limiter (RateLimiter): Limiter to pause on server hints (default: the current limiter)
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+        self.limiter = limiter
+    
+    def delay_for(self, retries, error=None, response=None, hint=None):
+        """
+        Return how long to wait before a retry
+        
+        Args:
+            retries (int): Number of the retry about to be made (1 for the first)
+            error (Exception): The caught exception, if any
+            response (requests.Response): The failed response, if available
+            hint (float): Server-requested wait already extracted by the caller
+                (e.g. from an aiohttp response); overrides error and response
+            
+        Returns:
+            float: Delay in seconds
+        """
+        if self.respect_retry_after:
+            if hint is None:
+                hint = server_retry_hint(error, response)
+            if hint is not None:
+                delay = min(hint, self.max_retry_after)
+                limiter = self.limiter or current_limiter()
+                if limiter is not None and delay > 0:
+                    limiter.pause(delay)
+                return delay
+        return backoff_delay(retries, self.base_delay, self.max_delay)
+
+# Example usage
+if __name__ == "__main__":
+    print(parse_retry_after("3"))
+    print(rate_limit_hint({
+        "jsonrpc": "2.0",
+        "id": 1,
+        "error": {"code": 429, "message": "Your app has exceeded its compute units per second capacity. Please try again in 250ms."}
+    }))
+    print(rate_limit_hint({"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "limit exceeded", "data": {"backoff_seconds": 1.5}}}))
+    policy = RetryPolicy(base_delay=1)
+    print(f"Fallback delays: {[round(policy.delay_for(n), 2) for n in range(1, 6)]}")
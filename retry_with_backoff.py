@@ -1,48 +1,159 @@
 # File: retry_with_backoff.py
 # Purpose: Implement exponential backoff retry mechanism for API resilience
 
-import time
 import random
-import requests
+import asyncio
 import functools
-from requests.exceptions import RequestException, Timeout
+from contextlib import nullcontext
+from requests.exceptions import RequestException
 
-def retry_with_backoff(max_retries=5, base_delay=1, max_delay=30):
+from clock import SYSTEM_CLOCK, VirtualClock
+from retry_budget import default_retry_budget
+from retry_policy import RetryPolicy
+from deadline import DeadlineExceeded, resolve_deadline, deadline_scope
+
+# Errors retried by the decorator; aiohttp errors are added when it is installed
+RETRYABLE_ERRORS = (RequestException, TimeoutError, asyncio.TimeoutError)
+try:
+    import aiohttp
+    RETRYABLE_ERRORS += (aiohttp.ClientError,)
+except ImportError:
+    pass
+
+def _resolve_budget(budget):
+    """Map the budget argument to a RetryBudget (None: shared default, False: disabled)"""
+    if budget is None:
+        return default_retry_budget
+    return budget or None
+
+class _RetryAttempts:
+    """
+    Attempt counting, retry budget, server hints and deadline of one retried call
+    
+    Shared by the sync and async wrappers, which only differ in how they
+    call the function and sleep.
+    """
+    def __init__(self, policy, budget, deadline):
+        """
+        Initialize the attempt state
+        
+        Args:
+            policy (RetryPolicy): Retry policy (attempts and delays)
+            budget (RetryBudget): Retry budget, or None
+            deadline (Deadline): Overall deadline, or None
+        """
+        self.policy = policy
+        self.budget = budget
+        self.deadline = deadline
+        self.retries = 0
+    
+    def scope(self):
+        """Return a context manager applying the deadline to one attempt, so its HTTP timeouts shrink to fit"""
+        if self.deadline is None:
+            return nullcontext()
+        return deadline_scope(self.deadline)
+    
+    def succeeded(self):
+        """Record a successful attempt with the retry budget"""
+        if self.budget:
+            self.budget.record_success()
+    
+    def backoff(self, error):
+        """
+        Decide whether to retry after a failed attempt
+        
+        Args:
+            error (Exception): The retryable error the attempt raised
+        
+        Returns:
+            float: Seconds to sleep before the next attempt
+        
+        Raises:
+            DeadlineExceeded: If the backoff would leave no time for another attempt
+            Exception: If maximum retries are reached or the retry budget is exhausted
+        """
+        max_retries = self.policy.max_retries
+        self.retries += 1
+        if self.retries > max_retries:
+            raise Exception(f"Maximum retries reached ({max_retries}): {str(error)}")
+        if self.budget and not self.budget.try_spend():
+            raise Exception(f"Retry budget exhausted: {str(error)}")
+        
+        # Use the server's hint if any, else exponential backoff with jitter
+        sleep_time = self.policy.delay_for(self.retries, error)
+        if self.deadline and not self.deadline.allows(sleep_time):
+            raise DeadlineExceeded(f"Not retrying, a {sleep_time:.2f}s backoff would miss the deadline: {str(error)}") from error
+        
+        print(f"Operation failed, retrying in {sleep_time:.2f} seconds (attempt {self.retries}/{max_retries}): {str(error)}")
+        return sleep_time
+
+def retry_with_backoff(max_retries=5, base_delay=1, max_delay=30, clock=None, budget=None, policy=None, deadline=None):
     """
     Decorator to retry a function with exponential backoff strategy
     
+    Coroutine functions are retried with a non-blocking sleep; cancelling
+    the awaiting task interrupts the backoff and is never retried.
+    Retrying stops with DeadlineExceeded once a backoff would overrun the
+    deadline (the per-call one or an enclosing deadline_scope). Each
+    attempt runs inside a deadline_scope, so toolkit calls made by the
+    function shrink their timeouts to the time left.
+    
     Parameters:
         max_retries (int): Maximum number of retries
         base_delay (float): Initial delay in seconds
         max_delay (float): Maximum delay in seconds
+        clock (object): Clock providing sleep() (default: the system clock)
+        budget (RetryBudget): Retry budget consulted before each retry
+            (default: the shared default_retry_budget; False to disable)
+        policy (RetryPolicy): Retry policy; overrides max_retries, base_delay and
+            max_delay. Server Retry-After hints are honored either way.
+        deadline (float): Seconds each call may take including retries
+            (default: only an enclosing deadline_scope applies)
     
     Returns:
         Decorated function that will be retried on failure
     """
+    clock = clock or SYSTEM_CLOCK
+    budget = _resolve_budget(budget)
+    policy = policy or RetryPolicy(max_retries, base_delay, max_delay)
+    
     def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempts = _RetryAttempts(policy, budget, resolve_deadline(deadline, clock))
+                while True:
+                    try:
+                        with attempts.scope():
+                            result = await func(*args, **kwargs)
+                    except DeadlineExceeded:
+                        raise
+                    except RETRYABLE_ERRORS as e:
+                        await clock.async_sleep(attempts.backoff(e))
+                    else:
+                        attempts.succeeded()
+                        return result
+            return async_wrapper
+        
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            retries = 0
+            attempts = _RetryAttempts(policy, budget, resolve_deadline(deadline, clock))
             while True:
                 try:
-                    return func(*args, **kwargs)
-                except (RequestException, TimeoutError) as e:
-                    retries += 1
-                    if retries > max_retries:
-                        raise Exception(f"Maximum retries reached ({max_retries}): {str(e)}")
-                    
-                    # Calculate delay time (with jitter)
-                    delay = min(max_delay, base_delay * (2 ** (retries - 1)))
-                    jitter = random.uniform(0, 0.1 * delay)
-                    sleep_time = delay + jitter
-                    
-                    print(f"Operation failed, retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries}): {str(e)}")
-                    time.sleep(sleep_time)
+                    with attempts.scope():
+                        result = func(*args, **kwargs)
+                except DeadlineExceeded:
+                    raise
+                except RETRYABLE_ERRORS as e:
+                    clock.sleep(attempts.backoff(e))
+                else:
+                    attempts.succeeded()
+                    return result
         return wrapper
     return decorator
 
 # Legacy function for backward compatibility
-def retry_function(func, max_retries=5, base_delay=1, max_delay=30):
+def retry_function(func, max_retries=5, base_delay=1, max_delay=30, clock=None, budget=None, policy=None, deadline=None):
     """
     Retry a function with exponential backoff strategy (non-decorator version)
     
@@ -51,34 +162,32 @@ def retry_function(func, max_retries=5, base_delay=1, max_delay=30):
         max_retries (int): Maximum number of retries
         base_delay (float): Initial delay in seconds
         max_delay (float): Maximum delay in seconds
+        clock (object): Clock providing sleep() (default: the system clock)
+        budget (RetryBudget): Retry budget consulted before each retry
+            (default: the shared default_retry_budget; False to disable)
+        policy (RetryPolicy): Retry policy; overrides max_retries, base_delay and
+            max_delay. Server Retry-After hints are honored either way.
+        deadline (Deadline or float): Overall deadline including retries
+            (an enclosing deadline_scope also applies)
     
     Returns:
         The result of the function if successful
         
     Raises:
-        Exception: If maximum retries are reached
+        DeadlineExceeded: If another attempt cannot finish before the deadline
+        Exception: If maximum retries are reached or the retry budget is exhausted
     """
-    retries = 0
-    while True:
-        try:
-            return func()
-        except (RequestException, TimeoutError) as e:
-            retries += 1
-            if retries > max_retries:
-                raise Exception(f"Maximum retries reached ({max_retries}): {str(e)}")
-            
-            # Calculate delay time (with jitter)
-            delay = min(max_delay, base_delay * (2 ** (retries - 1)))
-            jitter = random.uniform(0, 0.1 * delay)
-            sleep_time = delay + jitter
-            
-            print(f"Operation failed, retrying in {sleep_time:.2f} seconds (attempt {retries}/{max_retries}): {str(e)}")
-            time.sleep(sleep_time)
+    decorated = retry_with_backoff(max_retries, base_delay, max_delay, clock=clock, budget=budget,
+                                   policy=policy, deadline=deadline)(func)
+    return decorated()
 
 # Example usage
 if __name__ == "__main__":
+    # Run on a virtual clock so the demo's backoff takes no real time
+    clock = VirtualClock()
+    
     # Example function that might fail
-    @retry_with_backoff(max_retries=3, base_delay=1)
+    @retry_with_backoff(max_retries=3, base_delay=1, clock=clock)
     def fetch_data_decorated():
         # Simulate a request that might fail
         r = random.random()
@@ -104,7 +213,25 @@ if __name__ == "__main__":
         
         # Try the legacy approach
         print("\nTesting legacy approach:")
-        result = retry_function(fetch_data, max_retries=3, base_delay=1)
+        result = retry_function(fetch_data, max_retries=3, base_delay=1, clock=clock)
         print(f"Success: {result}")
     except Exception as e:
         print(f"Failed after all retries: {e}")
+    
+    # Coroutine functions are retried with a non-blocking sleep
+    @retry_with_backoff(max_retries=3, base_delay=1, clock=clock)
+    async def fetch_data_async():
+        r = random.random()
+        if r < 0.7:  # 70% chance of failure for demonstration
+            print("Async request failed (simulated)")
+            raise asyncio.TimeoutError("Simulated timeout")
+        return "Data successfully retrieved"
+    
+    try:
+        print("\nTesting async function:")
+        result = asyncio.run(fetch_data_async())
+        print(f"Success: {result}")
+    except Exception as e:
+        print(f"Failed after all retries: {e}")
+    
+    print(f"\nVirtual time spent backing off: {clock.slept:.2f} seconds")
@@ -0,0 +1,190 @@
+# File: shared_rate_limiter.py
+# Purpose: Share one rate limit budget between processes on the same host
+
+import os
+import mmap
+import struct
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from rate_limiter import RateLimiter
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Layout of the shared state: the GCRA theoretical arrival time as a double
+_STATE = struct.Struct("d")
+
+def default_state_path(name):
+    """
+    Return the state file used for a named shared limiter
+    
+    Args:
+        name (str): Limiter name shared by all cooperating processes
+        
+    Returns:
+        str: Path of the memory-mapped state file
+    """
+    return os.path.join(tempfile.gettempdir(), f"alchemy_rate_limiter_{name}.bin")
+
+class SharedGCRAEngine:
+    """
+    GCRA engine whose state lives in a memory-mapped file
+    
+    Every process that opens the same file shares one budget. Updates are
+    serialized with an exclusive file lock, so admission costs a lock/unlock
+    pair and an 8-byte read/write, with no broker process. All processes
+    must use the same max_calls and time_frame.
+    """
+    def __init__(self, max_calls, time_frame, path=None, name="default"):
+        """
+        Initialize the shared GCRA engine
+        
+        Args:
+            max_calls (int): Maximum number of calls allowed within the time frame
+            time_frame (float): Time frame in seconds
+            path (str): State file path (default: derived from name in the temp directory)
+            name (str): Limiter name used to derive the default path
+        """
+        self.max_calls = max_calls
+        self.time_frame = time_frame
+        self.interval = time_frame / max_calls  # Emission interval between calls
+        self.path = path or default_state_path(name)
+        # flock does not exclude threads sharing a descriptor, so also lock in-process
+        self._thread_lock = threading.Lock()
+        
+        self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+        if os.fstat(self._fd).st_size < _STATE.size:
+            # A fresh zero-filled file means an empty bucket history (TAT 0)
+            os.ftruncate(self._fd, _STATE.size)
+        self._map = mmap.mmap(self._fd, _STATE.size)
+    
+    @contextmanager
+    def _locked(self):
+        """Hold the in-process and cross-process locks"""
+        with self._thread_lock:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+                try:
+                    yield
+                finally:
+                    os.lseek(self._fd, 0, os.SEEK_SET)
+                    msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+    
+    def try_acquire(self, now, cost=1):
+        """
+        Admit a call at time `now` if it conforms to the shared rate
+        
+        Args:
+            now (float): Current wall-clock timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            bool: True if the call was admitted, False otherwise
+        """
+        with self._locked():
+            tat = max(_STATE.unpack_from(self._map, 0)[0], now)
+            new_tat = tat + self.interval * cost
+            if new_tat - now > self.time_frame:
+                return False
+            _STATE.pack_into(self._map, 0, new_tat)
+            return True
+    
+    def wait_time(self, now, cost=1):
+        """
+        Return the time until a call would conform
+        
+        Args:
+            now (float): Current wall-clock timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait in seconds
+        """
+        with self._locked():
+            tat = max(_STATE.unpack_from(self._map, 0)[0], now)
+        return max(0, tat + self.interval * cost - self.time_frame - now)
+    
+    def reserve(self, now, cost=1):
+        """
+        Book the earliest conforming slot in the shared schedule
+        
+        Args:
+            now (float): Current wall-clock timestamp in seconds
+            cost (int): Number of units the call consumes
+            
+        Returns:
+            float: Time to wait until the booked slot
+        """
+        with self._locked():
+            tat = max(_STATE.unpack_from(self._map, 0)[0], now) + self.interval * cost
+            _STATE.pack_into(self._map, 0, tat)
+        return max(0, tat - self.time_frame - now)
+    
+    def set_max_calls(self, max_calls):
+        """
+        Change this process's emission interval
+        
+        Args:
+            max_calls (float): New maximum number of calls within the time frame
+        """
+        self.max_calls = max_calls
+        self.interval = self.time_frame / max_calls
+    
+    def close(self):
+        """Unmap the state file and close its descriptor"""
+        self._map.close()
+        os.close(self._fd)
+
+def shared_rate_limiter(max_calls, time_frame, name="default", path=None, **kwargs):
+    """
+    Build a RateLimiter that shares its budget with other processes
+    
+    Each process (e.g. every multiprocessing worker) should call this with
+    the same name and limits; they then draw from one host-wide budget.
+    
+    Args:
+        max_calls (int): Maximum number of calls allowed within the time frame, for all processes
+        time_frame (float): Time frame in seconds
+        name (str): Limiter name shared by all cooperating processes
+        path (str): Explicit state file path, overriding name
+        **kwargs: Extra RateLimiter arguments (e.g. costs, default_cost)
+        
+    Returns:
+        RateLimiter: Limiter backed by a SharedGCRAEngine
+    """
+    engine = SharedGCRAEngine(max_calls, time_frame, path=path, name=name)
+    return RateLimiter(max_calls, time_frame, engine=engine, **kwargs)
+
+def _demo_worker(worker_id, start):
+    """Example process; defined at module level so the spawn start method can pickle it"""
+    import time
+    
+    # Each process opens the same named limiter: 10 calls per 2 seconds in total
+    limiter = shared_rate_limiter(max_calls=10, time_frame=2, name="demo")
+    for i in range(5):
+        limiter.wait_if_needed()
+        print(f"Worker {worker_id}: call {i+1} at {time.time() - start:.2f}s", flush=True)
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    import multiprocessing
+    
+    start = time.time()
+    processes = [multiprocessing.Process(target=_demo_worker, args=(n, start)) for n in range(4)]
+    for p in processes:
+        p.start()
+    for p in processes:
+        p.join()
@@ -0,0 +1,270 @@
+# File: simulator.py
+# Purpose: Discrete-event simulator for comparing rate limiting and retry policies
+
+import json
+import time
+import heapq
+import random
+import itertools
+
+from clock import VirtualClock
+from rate_limiter import GCRAEngine, request_cost
+from retry_policy import backoff_delay
+from compute_units import COMPUTE_UNIT_COSTS, DEFAULT_COMPUTE_UNITS
+
+class QuotaModel:
+    """
+    Model of Alchemy's server-side throttling
+    
+    Requests are charged compute units against a GCRA budget of
+    compute_units_per_second, with bursts up to burst_seconds worth of
+    budget. Admitted requests take base_latency plus an exponentially
+    distributed delay; throttled requests return a 429 after base_latency.
+    """
+    def __init__(self, compute_units_per_second=330, burst_seconds=1, base_latency=0.05,
+                 latency_jitter=0.03, costs=None):
+        """
+        Initialize the quota model
+        
+        Args:
+            compute_units_per_second (int): Plan throughput in CU/s
+            burst_seconds (float): Seconds of budget that may be spent in one burst
+            base_latency (float): Minimum response time in seconds
+            latency_jitter (float): Mean of the exponential extra response time
+            costs (dict): Compute units per method (default: COMPUTE_UNIT_COSTS)
+        """
+        self.engine = GCRAEngine(compute_units_per_second * burst_seconds, burst_seconds)
+        self.base_latency = base_latency
+        self.latency_jitter = latency_jitter
+        self.costs = costs or COMPUTE_UNIT_COSTS
+    
+    def admit(self, now, method):
+        """
+        Decide whether a request sent at `now` is served or throttled
+        
+        Returns:
+            bool: True if served, False for a 429
+        """
+        return self.engine.try_acquire(now, request_cost(method, self.costs, DEFAULT_COMPUTE_UNITS))
+    
+    def latency(self, rng):
+        """Draw the response time of a served request"""
+        return self.base_latency + rng.expovariate(1 / self.latency_jitter)
+
+class SimulationPolicy:
+    """
+    Client-side policy under test: an optional rate limiter plus retry settings
+    """
+    def __init__(self, name, limiter_factory=None, max_retries=5, base_delay=1, max_delay=30):
+        """
+        Initialize the policy
+        
+        Args:
+            name (str): Name shown in reports
+            limiter_factory (callable): Called with a VirtualClock, returns a
+                RateLimiter (optionally with a controller attached), or None
+                to send requests unthrottled
+            max_retries (int): Maximum number of retries after a 429
+            base_delay (float): Initial retry delay in seconds
+            max_delay (float): Maximum retry delay in seconds
+        """
+        self.name = name
+        self.limiter_factory = limiter_factory
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+def synthetic_trace(rate, duration, methods=None, seed=0):
+    """
+    Generate Poisson request arrivals
+    
+    Args:
+        rate (float): Mean requests per second
+        duration (float): Length of the trace in seconds
+        methods (dict): Mapping of method name to relative frequency
+            (default: eth_getBalance only)
+        seed (int): Random seed
+        
+    Returns:
+        list: (arrival time, method) tuples in time order
+    """
+    rng = random.Random(seed)
+    methods = methods or {"eth_getBalance": 1}
+    names = list(methods)
+    weights = [methods[name] for name in names]
+    
+    trace = []
+    now = rng.expovariate(rate)
+    while now < duration:
+        trace.append((now, rng.choices(names, weights)[0]))
+        now += rng.expovariate(rate)
+    return trace
+
+def load_trace(path):
+    """
+    Load a recorded trace from a JSON lines file
+    
+    Each line is an object with "time" (seconds) and "method" fields.
+    
+    Args:
+        path (str): Path of the trace file
+        
+    Returns:
+        list: (arrival time, method) tuples in time order
+    """
+    trace = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                trace.append((float(record["time"]), record["method"]))
+    trace.sort()
+    return trace
+
+def _percentile(sorted_values, fraction):
+    """Return a percentile of an already sorted list (None if empty)"""
+    if not sorted_values:
+        return None
+    return sorted_values[int(fraction * (len(sorted_values) - 1))]
+
+def simulate(trace, policy, quota=None, seed=0):
+    """
+    Replay a trace against a quota model under a client policy
+    
+    The client's limiter books slots with engine.reserve() on a virtual
+    clock, so nothing sleeps and thousands of requests simulate in
+    milliseconds.
+    
+    Args:
+        trace (list): (arrival time, method) tuples
+        policy (SimulationPolicy): Client policy under test
+        quota (QuotaModel): Server model (default: QuotaModel())
+        seed (int): Random seed for latencies and retry jitter
+        
+    Returns:
+        dict: Throughput, 429 rate, latency percentiles and counters
+    """
+    wall_start = time.perf_counter()
+    quota = quota or QuotaModel()
+    rng = random.Random(seed)
+    clock = VirtualClock()
+    limiter = policy.limiter_factory(clock) if policy.limiter_factory else None
+    
+    events = []  # Heap of (time, sequence, kind, request)
+    sequence = itertools.count()
+    for arrival, method in trace:
+        request = {"arrival": arrival, "method": method, "retries": 0}
+        heapq.heappush(events, (arrival, next(sequence), "arrive", request))
+    
+    latencies = []
+    attempts = throttled = failed = 0
+    end = 0
+    
+    while events:
+        now, _, kind, request = heapq.heappop(events)
+        clock.now = now
+        end = max(end, now)
+        
+        if kind == "arrive":
+            delay = 0
+            if limiter:
+                delay = limiter.engine.reserve(now, limiter.cost_of(request["method"]))
+            heapq.heappush(events, (now + delay, next(sequence), "send", request))
+        
+        elif kind == "send":
+            attempts += 1
+            request["sent"] = now
+            if quota.admit(now, request["method"]):
+                heapq.heappush(events, (now + quota.latency(rng), next(sequence), "done", request))
+            else:
+                throttled += 1
+                heapq.heappush(events, (now + quota.base_latency, next(sequence), "throttled", request))
+        
+        elif kind == "done":
+            latencies.append(now - request["arrival"])
+            if limiter:
+                # Controllers watch the response time, not time spent queued
+                limiter.record_result(latency=now - request["sent"])
+        
+        elif kind == "throttled":
+            if limiter:
+                limiter.record_result(throttled=True)
+            request["retries"] += 1
+            if request["retries"] > policy.max_retries:
+                failed += 1
+                continue
+            delay = backoff_delay(request["retries"], policy.base_delay, policy.max_delay, rng)
+            heapq.heappush(events, (now + delay, next(sequence), "arrive", request))
+    
+    latencies.sort()
+    start = trace[0][0] if trace else 0
+    span = max(end - start, 1e-9)
+    return {
+        "policy": policy.name,
+        "requests": len(trace),
+        "succeeded": len(latencies),
+        "failed": failed,
+        "attempts": attempts,
+        "throttled": throttled,
+        "throttle_rate": throttled / attempts if attempts else 0,
+        "throughput": len(latencies) / span,
+        "latency_p50": _percentile(latencies, 0.50),
+        "latency_p95": _percentile(latencies, 0.95),
+        "latency_p99": _percentile(latencies, 0.99),
+        "simulated_seconds": span,
+        "wall_ms": (time.perf_counter() - wall_start) * 1000,
+    }
+
+def compare_policies(trace, policies, quota_factory=QuotaModel, seed=0):
+    """
+    Simulate the same trace under several policies
+    
+    Args:
+        trace (list): (arrival time, method) tuples
+        policies (list): SimulationPolicy objects
+        quota_factory (callable): Returns a fresh QuotaModel for each run
+        seed (int): Random seed shared by all runs
+        
+    Returns:
+        list: One report dict per policy
+    """
+    return [simulate(trace, policy, quota_factory(), seed) for policy in policies]
+
+def print_reports(reports):
+    """Print simulation reports as a table"""
+    print(f"{'policy':>20} {'ok':>6} {'failed':>6} {'req/s':>7} {'429 rate':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>9} {'wall ms':>8}")
+    for r in reports:
+        p50, p95, p99 = (
+            (r[key] or 0) * 1000 for key in ("latency_p50", "latency_p95", "latency_p99")
+        )
+        print(f"{r['policy']:>20} {r['succeeded']:>6} {r['failed']:>6} {r['throughput']:>7.1f} "
+              f"{r['throttle_rate']:>9.1%} {p50:>8.0f} {p95:>8.0f} {p99:>9.0f} {r['wall_ms']:>8.1f}")
+
+# Example usage
+if __name__ == "__main__":
+    from compute_units import compute_unit_limiter
+    from adaptive_rate import AdaptiveRateController
+    
+    def adaptive(clock):
+        limiter = compute_unit_limiter(200)
+        limiter.clock = clock
+        AdaptiveRateController(limiter, min_rate=100, max_rate=1000, increase=20, decrease_factor=0.9)
+        return limiter
+    
+    def static(cu_per_second):
+        def factory(clock):
+            limiter = compute_unit_limiter(cu_per_second)
+            limiter.clock = clock
+            return limiter
+        return factory
+    
+    # 60 seconds of mixed traffic offering ~30% more compute units than the plan allows
+    trace = synthetic_trace(rate=18, duration=60, methods={"eth_getBalance": 0.9, "getNFTs": 0.1})
+    policies = [
+        SimulationPolicy("no limiter"),
+        SimulationPolicy("static 300 CU/s", static(300)),
+        SimulationPolicy("static 400 CU/s", static(400)),
+        SimulationPolicy("adaptive AIMD", adaptive),
+    ]
+    print_reports(compare_policies(trace, policies))
@@ -0,0 +1,143 @@
+# File: singleflight.py
+# Purpose: Share one upstream call between concurrent identical requests
+
+import json
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from deadline import DeadlineExceeded
+
+def _normalize(value):
+    """Lower-case hex strings (addresses, token ids) and recurse into containers"""
+    if isinstance(value, str):
+        return value.lower() if value[:2].lower() == "0x" else value
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+def normalize_params(params):
+    """
+    Return a canonical string for request parameters
+    
+    Dict keys are sorted and hex strings lower-cased, so parameters that
+    select the same data produce the same string.
+    
+    Args:
+        params: JSON-serializable parameters
+    
+    Returns:
+        str: Canonical JSON
+    """
+    return json.dumps(_normalize(params), sort_keys=True, separators=(",", ":"), default=str)
+
+def request_key(method, params, block_tag="latest"):
+    """
+    Build the coalescing key for a request
+    
+    Args:
+        method (str): JSON-RPC or NFT API method name
+        params: Request parameters
+        block_tag (str): Block the data is read at
+    
+    Returns:
+        tuple: (method, normalized params, block tag)
+    """
+    return (method, normalize_params(params), str(block_tag).lower())
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share a key into one upstream call
+    
+    The first caller for a key (the leader) runs the function; callers that
+    arrive while it is in flight wait for it and receive the same result or
+    exception. Nothing is cached: once the call finishes the next caller
+    starts a new one. Shared results are the same object for every caller,
+    so treat them as read-only.
+    """
+    def __init__(self):
+        """Initialize the coalescing layer"""
+        self.in_flight = {}  # Key -> Future of the leader's call
+        self.stats = {"calls": 0, "upstream": 0, "merged": 0}
+        self.lock = threading.Lock()
+    
+    def do(self, key, func, *args, wait_timeout=None, **kwargs):
+        """
+        Run func once per key among concurrent callers
+        
+        Args:
+            key: Hashable request key (see request_key)
+            func (callable): Function performing the upstream call
+            *args, **kwargs: Arguments passed to func by the leader
+            wait_timeout (float): Longest time a follower waits for the leader
+        
+        Returns:
+            The result of the shared call
+        
+        Raises:
+            DeadlineExceeded: If a follower's wait_timeout expires first
+            Exception: The shared call's error
+        """
+        with self.lock:
+            self.stats["calls"] += 1
+            future = self.in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self.in_flight[key] = future
+                self.stats["upstream"] += 1
+            else:
+                self.stats["merged"] += 1
+        
+        if not leader:
+            try:
+                return future.result(wait_timeout)
+            except FutureTimeoutError:
+                raise DeadlineExceeded(f"Timed out waiting for in-flight {key[0] if isinstance(key, tuple) else key}")
+        
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+    
+    def snapshot(self):
+        """
+        Return the counters
+        
+        Returns:
+            dict: Calls, upstream calls made, merged calls and the fraction
+                of calls that were saved
+        """
+        with self.lock:
+            stats = dict(self.stats)
+        stats["saved_ratio"] = stats["merged"] / stats["calls"] if stats["calls"] else 0.0
+        return stats
+
+# Coalescing layer used by the toolkit's request functions
+default_singleflight = SingleFlight()
+
+# Example usage
+if __name__ == "__main__":
+    import time
+    
+    group = SingleFlight()
+    
+    def fetch_owner_nfts(owner):
+        time.sleep(0.05)  # Simulate one upstream round trip
+        return {"owner": owner, "total": 42}
+    
+    key = request_key("getNFTs", {"owner": "0xD8DA6BF26964AF9D7EED9E03E53415D37AA96045", "pageSize": 100})
+    threads = [threading.Thread(target=group.do, args=(key, fetch_owner_nfts, "0xd8da...")) for _ in range(20)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    print(group.snapshot())
@@ -5,6 +5,8 @@ import requests
 import time
 import os
 from dotenv import load_dotenv
+from transport import http_get, http_post
+from response_cache import observe_head_block
 
 # Load environment variables
 load_dotenv()
@@ -19,7 +21,7 @@ def test_network_connection():
     """
     try:
         start_time = time.time()
-        response = requests.get('https://dashboard.alchemy.com/health', timeout=5)
+        response = http_get('https://dashboard.alchemy.com/health', timeout=5)
         response_time = time.time() - start_time
         
         print(f"Network connection status: {response.status_code}")
@@ -50,12 +52,14 @@ def test_alchemy_connection():
         }
         
         start_time = time.time()
-        response = requests.post(url, json=payload, timeout=5)
+        response = http_post(url, json=payload, timeout=5)
         latency = (time.time() - start_time) * 1000  # Convert to milliseconds
         
         if response.status_code == 200:
             result = response.json()
             if "result" in result:
+                # Let the response cache treat blocks well behind the head as final
+                observe_head_block(network, result["result"])
                 return {
                     "success": True,
                     "latency": round(latency, 2),
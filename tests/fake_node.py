@@ -0,0 +1,49 @@
+# File: tests/fake_node.py
+# Purpose: In-process JSON-RPC node for tests, mounted on a requests session
+
+import json
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+class FakeNodeAdapter(HTTPAdapter):
+    """
+    Answers every JSON-RPC call, batched or not, with 1 ether (as a hex wei amount)
+    
+    Records each batch's size in batch_sizes (1 for a single call) and every
+    method called in methods. on_request, if set, is called
+    with the decoded batch before the answer is built; returning an HTTP
+    status from it fails the whole POST with that status.
+    """
+    def __init__(self, on_request=None):
+        super().__init__()
+        self.on_request = on_request
+        self.batch_sizes = []
+        self.methods = []
+        self.lock = threading.Lock()
+    
+    def send(self, request, **kwargs):
+        body = json.loads(request.body)
+        batch = body if isinstance(body, list) else [body]
+        with self.lock:
+            self.batch_sizes.append(len(batch))
+            self.methods.extend(item["method"] for item in batch)
+        status = self.on_request(batch) if self.on_request else None
+        response = requests.Response()
+        response.status_code = status or 200
+        response.headers["Content-Type"] = "application/json"
+        if status is None:
+            answers = [{"jsonrpc": "2.0", "id": item["id"], "result": hex(10 ** 18)} for item in batch]
+            response._content = json.dumps(answers if isinstance(body, list) else answers[0]).encode()
+        else:
+            response._content = b"{}"
+        response.url = request.url
+        response.request = request
+        return response
+
+def fake_session(adapter):
+    """Return a session whose https:// requests are answered by adapter"""
+    session = requests.Session()
+    session.mount("https://", adapter)
+    return session
@@ -0,0 +1,32 @@
+# File: tests/test_adaptive_rate.py
+# Purpose: Regression tests for the AIMD controller's rate floor
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock
+from adaptive_rate import AdaptiveRateController
+from compute_units import compute_unit_limiter
+
+class AdaptiveRateFloorTest(unittest.TestCase):
+    def test_throttling_never_locks_out_expensive_methods(self):
+        """A run of 429s must leave room for a 100 CU getNFTs call"""
+        clock = VirtualClock()
+        limiter = compute_unit_limiter(330)
+        limiter.clock = clock
+        controller = AdaptiveRateController(limiter, cooldown=1.0)
+        
+        for _ in range(10):
+            controller.on_throttle()
+            clock.sleep(1.0)
+        
+        self.assertGreaterEqual(limiter.max_calls, 100)
+        # Raised ValueError before the floor was clamped to the largest cost
+        self.assertGreaterEqual(limiter.wait_if_needed(limiter.cost_of("getNFTs")), 0)
+
+if __name__ == "__main__":
+    unittest.main()
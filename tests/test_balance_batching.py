@@ -0,0 +1,68 @@
+# File: tests/test_balance_batching.py
+# Purpose: Regression tests for coalesced get_eth_balance calls under a compute-unit limiter
+
+import os
+import sys
+import threading
+import unittest
+from decimal import Decimal
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import network_registry
+import alchemy_api_debug
+from clock import VirtualClock
+from config import AlchemyConfig, get_config, set_config
+from compute_units import compute_unit_limiter, COMPUTE_UNIT_COSTS
+from rate_limiter import get_default_limiter, set_default_limiter
+from response_cache import get_default_cache, set_default_cache
+from fake_node import FakeNodeAdapter
+
+class BalanceBatchingTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = (get_config(), get_default_limiter(), get_default_cache(), network_registry.default_registry)
+        set_config(AlchemyConfig(api_key="a" * 32))
+        set_default_cache(None)
+        limiter = compute_unit_limiter(330)
+        limiter.clock = VirtualClock()
+        set_default_limiter(limiter)
+        
+        network_registry.default_registry = network_registry.NetworkRegistry(api_key="a" * 32)
+        self.node = FakeNodeAdapter()
+        network_registry.get_client().session.mount("https://", self.node)
+    
+    def tearDown(self):
+        alchemy_api_debug.disable_balance_batching()
+        network_registry.default_registry.close()
+        config, limiter, cache, registry = self.saved
+        set_config(config)
+        set_default_limiter(limiter)
+        set_default_cache(cache)
+        network_registry.default_registry = registry
+    
+    def test_concurrent_balances_fit_compute_unit_limiter(self):
+        """40 coalesced calls cost 760 CU, more than the 330 CU the limiter admits at once"""
+        alchemy_api_debug.enable_balance_batching(max_batch_size=100, max_delay=0.05)
+        addresses = [f"0x{i:040x}" for i in range(40)]
+        results = {}
+        start = threading.Barrier(len(addresses))
+        
+        def call(address):
+            start.wait()
+            try:
+                results[address] = alchemy_api_debug.get_eth_balance(address)
+            except Exception as e:
+                results[address] = e
+        
+        threads = [threading.Thread(target=call, args=(address,)) for address in addresses]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        self.assertEqual(results, {address: Decimal(1) for address in addresses})
+        self.assertLessEqual(max(self.node.batch_sizes) * COMPUTE_UNIT_COSTS["eth_getBalance"], 330)
+
+if __name__ == "__main__":
+    unittest.main()
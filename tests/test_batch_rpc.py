@@ -0,0 +1,85 @@
+# File: tests/test_batch_rpc.py
+# Purpose: Regression tests for batch_call under a limiter whose rate changes mid-batch
+
+import os
+import sys
+import unittest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch_rpc
+from clock import VirtualClock
+from adaptive_rate import AdaptiveRateController
+from batch_rpc import batch_call
+from circuit_breaker import get_breaker
+from retry_budget import RetryBudget
+from compute_units import compute_unit_limiter, COMPUTE_UNIT_COSTS
+from rate_limiter import limiter_scope
+from fake_node import FakeNodeAdapter, fake_session
+
+URL = "https://eth-mainnet.g.alchemy.com/v2/test"
+
+class BatchRateCutTest(unittest.TestCase):
+    def test_chunks_are_resplit_after_a_rate_cut(self):
+        """A 429 between chunks must not leave a chunk costing more than the new capacity"""
+        limiter = compute_unit_limiter(330)
+        limiter.clock = VirtualClock()
+        controller = AdaptiveRateController(limiter)
+        sent = []
+        
+        def on_request(batch):
+            sent.append((len(batch), limiter.max_calls))
+            if len(sent) == 1:
+                controller.on_throttle()  # 330 -> 250 CU/s
+        
+        adapter = FakeNodeAdapter(on_request=on_request)
+        calls = [("eth_getBalance", [f"0x{n:040x}", "latest"]) for n in range(34)]
+        with limiter_scope(limiter):
+            # Packed as two pieces of 17 calls (323 CU) for the original capacity
+            responses = batch_call(URL, calls, session=fake_session(adapter))
+        
+        self.assertTrue(all(r and r["result"] == hex(10 ** 18) for r in responses))
+        cost = COMPUTE_UNIT_COSTS["eth_getBalance"]
+        for size, capacity in sent:
+            self.assertLessEqual(size * cost, capacity)
+
+class BatchStopTest(unittest.TestCase):
+    def setUp(self):
+        self.saved_budget = batch_rpc.default_retry_budget
+        self.calls = [("eth_getBalance", [f"0x{n:040x}", "latest"]) for n in range(34)]
+    
+    def tearDown(self):
+        batch_rpc.default_retry_budget = self.saved_budget
+    
+    def test_open_circuit_keeps_answered_calls(self):
+        """A circuit opening between chunks returns what was answered, None for the rest"""
+        breaker = get_breaker("test_batch_rpc/open_circuit")
+        limiter = compute_unit_limiter(330)
+        limiter.clock = VirtualClock()
+        
+        def on_request(batch):
+            for _ in range(breaker.failure_threshold):
+                breaker.record_failure()
+        
+        adapter = FakeNodeAdapter(on_request=on_request)
+        with limiter_scope(limiter):
+            responses = batch_call(URL, self.calls, breaker_name=breaker.name, session=fake_session(adapter))
+        
+        self.assertEqual(adapter.batch_sizes, [17])
+        self.assertTrue(all(responses[:17]))
+        self.assertEqual(responses[17:], [None] * 17)
+    
+    def test_budget_is_charged_per_resubmitted_post(self):
+        """Both halves of a failed batch cost a retry; one token sends only one of them"""
+        batch_rpc.default_retry_budget = RetryBudget(ratio=0, min_retries_per_second=0.1, window=10, clock=VirtualClock())
+        adapter = FakeNodeAdapter(on_request=lambda batch: 503 if len(batch) == 4 else None)
+        
+        responses = batch_call(URL, self.calls[:4], session=fake_session(adapter))
+        
+        self.assertEqual(adapter.batch_sizes, [4, 2])
+        self.assertTrue(all(responses[:2]))
+        self.assertEqual(responses[2:], [None, None])
+
+if __name__ == "__main__":
+    unittest.main()
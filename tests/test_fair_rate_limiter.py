@@ -0,0 +1,43 @@
+# File: tests/test_fair_rate_limiter.py
+# Purpose: Regression tests for interrupted waits in FairRateLimiter
+
+import os
+import sys
+import threading
+import unittest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock
+from fair_rate_limiter import FairRateLimiter
+
+class InterruptingClock(VirtualClock):
+    """Virtual clock whose first sleep() is interrupted, as by Ctrl+C"""
+    def __init__(self):
+        super().__init__()
+        self.interrupt = True
+    
+    def sleep(self, seconds):
+        if self.interrupt:
+            self.interrupt = False
+            raise KeyboardInterrupt
+        super().sleep(seconds)
+
+class InterruptedWaitTest(unittest.TestCase):
+    def test_interrupted_wait_leaves_the_queue(self):
+        """A caller interrupted while waiting must not block every later caller"""
+        limiter = FairRateLimiter(1, 1, clock=InterruptingClock())
+        limiter.wait_if_needed()
+        with self.assertRaises(KeyboardInterrupt):
+            limiter.wait_if_needed()
+        self.assertEqual(limiter.waiting, [])
+        
+        # Hung forever on the orphaned queue head before the fix
+        thread = threading.Thread(target=limiter.wait_if_needed, daemon=True)
+        thread.start()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+# File: tests/test_rate_limiter.py
+# Purpose: Regression tests for queued sliding-window bookings
+
+import os
+import sys
+import bisect
+import unittest
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock
+from rate_limiter import RateLimiter
+
+class FrozenClock(VirtualClock):
+    """Virtual clock whose sleep() does not advance time, as if every caller arrived at once"""
+    def sleep(self, seconds):
+        pass
+
+class QueuedSlidingWindowTest(unittest.TestCase):
+    def test_queued_callers_get_distinct_slots(self):
+        """300 callers queued at one instant are released one by one, never 100 at once"""
+        limiter = RateLimiter(100, 1, queued=True, clock=FrozenClock())
+        slots = [limiter.wait_if_needed() for _ in range(300)]
+        
+        self.assertEqual(slots[:100], [0] * 100)
+        self.assertEqual(len(set(slots[100:])), 200)
+        self.assertEqual(slots, sorted(slots))
+        # Every window of one time frame still holds at most max_calls
+        busiest = max(bisect.bisect_left(slots, t + 1) - bisect.bisect_left(slots, t) for t in slots)
+        self.assertLessEqual(busiest, 100)
+
+if __name__ == "__main__":
+    unittest.main()
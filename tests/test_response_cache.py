@@ -0,0 +1,66 @@
+# File: tests/test_response_cache.py
+# Purpose: Regression tests for learning the finalized block on the request path
+
+import os
+import sys
+import unittest
+from decimal import Decimal
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import network_registry
+import alchemy_api_debug
+from clock import VirtualClock
+from config import AlchemyConfig, get_config, set_config
+from rate_limiter import get_default_limiter, set_default_limiter
+from response_cache import ResponseCache, HEAD_REFRESH_BLOCKS, get_default_cache, set_default_cache
+from fake_node import FakeNodeAdapter
+
+ADDRESS = "0xd8da6bf26964af9d7eed9e03e53415d37aa96045"
+
+class FinalizedBlockTest(unittest.TestCase):
+    def setUp(self):
+        self.saved = (get_config(), get_default_limiter(), get_default_cache(), network_registry.default_registry)
+        set_config(AlchemyConfig(api_key="a" * 32))
+        set_default_limiter(None)
+        self.clock = VirtualClock()
+        self.cache = ResponseCache(clock=self.clock)
+        set_default_cache(self.cache)
+        
+        network_registry.default_registry = network_registry.NetworkRegistry(api_key="a" * 32)
+        self.node = FakeNodeAdapter()
+        network_registry.get_client().session.mount("https://", self.node)
+    
+    def tearDown(self):
+        network_registry.default_registry.close()
+        config, limiter, cache, registry = self.saved
+        set_config(config)
+        set_default_limiter(limiter)
+        set_default_cache(cache)
+        network_registry.default_registry = registry
+    
+    def test_reading_at_a_block_learns_the_head(self):
+        """A balance at an old block number is kept once the head shows the block is final"""
+        self.assertEqual(alchemy_api_debug.get_eth_balance(ADDRESS, block=18000000), Decimal(1))
+        self.clock.advance(3600)
+        self.assertEqual(alchemy_api_debug.get_eth_balance(ADDRESS, block=18000000), Decimal(1))
+        
+        # Without a known head the balance expired after one block time and was fetched twice
+        self.assertEqual(self.node.methods, ["eth_blockNumber", "eth_getBalance"])
+    
+    def test_head_is_refreshed_only_when_out_of_date(self):
+        """Reads at recent blocks fetch the head at most once per HEAD_REFRESH_BLOCKS block times"""
+        network = network_registry.get_client().network
+        self.cache.observe_head(network, 10 ** 18)
+        recent = 10 ** 18 - 1  # Above the finalized block
+        
+        alchemy_api_debug.get_eth_balance(ADDRESS, block=recent)
+        self.assertNotIn("eth_blockNumber", self.node.methods)
+        
+        self.clock.advance(HEAD_REFRESH_BLOCKS * self.cache.block_times[network] + 1)
+        alchemy_api_debug.get_eth_balance(ADDRESS, block=recent)
+        self.assertEqual(self.node.methods.count("eth_blockNumber"), 1)
+
+if __name__ == "__main__":
+    unittest.main()
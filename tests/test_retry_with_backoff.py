@@ -0,0 +1,62 @@
+# File: tests/test_retry_with_backoff.py
+# Purpose: Regression tests for deadlines applied by retry_with_backoff
+
+import os
+import sys
+import asyncio
+import unittest
+
+from requests.exceptions import RequestException
+
+# Add parent directory to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from clock import VirtualClock
+from deadline import request_timeout
+from retry_policy import RetryPolicy
+from retry_with_backoff import retry_with_backoff
+
+class RetryDeadlineTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.policy = RetryPolicy(max_retries=5, base_delay=1, max_delay=1)
+        self.start = self.clock.time()
+    
+    def test_attempt_timeout_shrinks_to_the_deadline(self):
+        """A 30s request timeout must shrink to the time left before the decorator's deadline"""
+        timeouts = []
+        
+        @retry_with_backoff(clock=self.clock, budget=False, policy=self.policy, deadline=10)
+        def fetch():
+            timeouts.append((request_timeout(30), self.clock.time() - self.start))
+            self.clock.advance(2)
+            if len(timeouts) < 3:
+                raise RequestException("Simulated failure")
+            return "ok"
+        
+        self.assertEqual(fetch(), "ok")
+        self.assertEqual(timeouts[0], (10, 0))
+        for timeout, elapsed in timeouts[1:]:
+            # Each failed attempt takes 2s and backs off about 1s
+            self.assertGreater(elapsed, 2)
+            self.assertAlmostEqual(timeout, 10 - elapsed)
+    
+    def test_async_attempt_timeout_shrinks_to_the_deadline(self):
+        """The coroutine wrapper applies the deadline to each attempt too"""
+        timeouts = []
+        
+        @retry_with_backoff(clock=self.clock, budget=False, policy=self.policy, deadline=10)
+        async def fetch():
+            timeouts.append((request_timeout(30), self.clock.time() - self.start))
+            self.clock.advance(2)
+            if len(timeouts) < 2:
+                raise RequestException("Simulated failure")
+            return "ok"
+        
+        self.assertEqual(asyncio.run(fetch()), "ok")
+        timeout, elapsed = timeouts[1]
+        self.assertGreater(elapsed, 2)
+        self.assertAlmostEqual(timeout, 10 - elapsed)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,134 @@
+# File: transport.py
+# Purpose: Shared pooled HTTP transport so requests reuse keep-alive connections
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Hosts whose connection pools are kept (one pool per host)
+DEFAULT_POOL_CONNECTIONS = 10
+
+# Keep-alive connections kept per host
+DEFAULT_POOL_MAXSIZE = 32
+
+class Transport:
+    """
+    requests.Session with a keep-alive connection pool per host
+    
+    Connections (and so their TCP and TLS handshakes) are reused across
+    calls and threads. By default a pool only limits how many idle
+    connections are kept; hosts given a cap in `host_limits` never open
+    more than that many connections at once, and extra requests wait for
+    a free one.
+    """
+    def __init__(self, pool_connections=DEFAULT_POOL_CONNECTIONS, pool_maxsize=DEFAULT_POOL_MAXSIZE,
+                 host_limits=None, headers=None):
+        """
+        Initialize the transport
+        
+        Args:
+            pool_connections (int): Number of per-host pools to keep
+            pool_maxsize (int): Keep-alive connections kept per host
+            host_limits (dict): Host (e.g. "ipfs.io") -> maximum concurrent connections
+            headers (dict): Headers sent with every request
+        """
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.session = requests.Session()
+        if headers:
+            self.session.headers.update(headers)
+        
+        # Retries are handled by the toolkit's own retry policies
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.host_limits = {}
+        for host, max_connections in (host_limits or {}).items():
+            self.limit_host(host, max_connections)
+    
+    def limit_host(self, host, max_connections):
+        """
+        Cap the number of concurrent connections to one host
+        
+        Args:
+            host (str): Host name, optionally with a port
+            max_connections (int): Maximum open connections; further requests block until one is free
+        """
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_connections, max_retries=0, pool_block=True)
+        # The longest matching prefix wins, so this overrides the default adapter for the host
+        self.session.mount(f"https://{host}/", adapter)
+        self.session.mount(f"http://{host}/", adapter)
+        self.host_limits[host] = max_connections
+    
+    def request(self, method, url, **kwargs):
+        """
+        Send a request over the pooled session
+        
+        Args:
+            method (str): HTTP method
+            url (str): Request URL
+            **kwargs: Passed to requests.Session.request (params, json, timeout, ...)
+        
+        Returns:
+            requests.Response: The response
+        """
+        return self.session.request(method, url, **kwargs)
+    
+    def get(self, url, **kwargs):
+        """Send a GET request over the pooled session"""
+        return self.session.get(url, **kwargs)
+    
+    def post(self, url, **kwargs):
+        """Send a POST request over the pooled session"""
+        return self.session.post(url, **kwargs)
+    
+    def close(self):
+        """Close every pooled connection"""
+        self.session.close()
+
+_transport = None
+_transport_lock = threading.Lock()
+
+def get_transport():
+    """
+    Return the shared transport, creating it on first use
+    
+    Returns:
+        Transport: The transport used by the toolkit's request functions
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
+
+def configure_transport(**kwargs):
+    """
+    Replace the shared transport with one using different settings
+    
+    Sessions handed out before (e.g. to a Web3 provider) keep working
+    until they are closed by their owner.
+    
+    Args:
+        **kwargs: Transport settings (pool_connections, pool_maxsize, host_limits, headers)
+    
+    Returns:
+        Transport: The new shared transport
+    """
+    global _transport
+    with _transport_lock:
+        _transport = Transport(**kwargs)
+        return _transport
+
+def get_session():
+    """Return the shared transport's requests.Session (e.g. for Web3.HTTPProvider)"""
+    return get_transport().session
+
+def http_get(url, **kwargs):
+    """Send a GET request over the shared transport"""
+    return get_transport().get(url, **kwargs)
+
+def http_post(url, **kwargs):
+    """Send a POST request over the shared transport"""
+    return get_transport().post(url, **kwargs)